@@ -42,7 +42,7 @@ class VehicleAdmin(admin.ModelAdmin):
         'price_display', 'origin', 'status', 'is_featured'
     )
     list_filter = ('vehicle_type', 'listing_type', 'status', 'origin', 'condition', 'fuel', 'is_featured')
-    search_fields = ('title', 'brand__name', 'model__name', 'description')
+    search_fields = ('title', 'external_ref', 'brand__name', 'model__name', 'description')
     list_editable = ('status', 'is_featured')
     ordering = ('-is_featured', '-created_at')
     readonly_fields = ('created_at', 'updated_at')
@@ -69,6 +69,10 @@ class VehicleAdmin(admin.ModelAdmin):
         ('Description & Statut', {
             'fields': ('description', 'status', 'is_featured')
         }),
+        ('Import', {
+            'fields': ('external_ref',),
+            'classes': ('collapse',)
+        }),
         ('Dates', {
             'fields': ('created_at', 'updated_at'),
             'classes': ('collapse',)
@@ -87,7 +91,7 @@ class SparePartAdmin(admin.ModelAdmin):
         'price_display', 'stock_quantity', 'status', 'is_local', 'is_featured'
     )
     list_filter = ('condition', 'status', 'is_local', 'is_featured')
-    search_fields = ('title', 'reference', 'description')
+    search_fields = ('title', 'reference', 'external_ref', 'description')
     list_editable = ('status', 'stock_quantity', 'is_featured')
     filter_horizontal = ('compatible_brands', 'compatible_models')
     readonly_fields = ('created_at', 'updated_at')
@@ -105,6 +109,10 @@ class SparePartAdmin(admin.ModelAdmin):
         ('Mise en avant', {
             'fields': ('is_featured',)
         }),
+        ('Import', {
+            'fields': ('external_ref',),
+            'classes': ('collapse',)
+        }),
     )
 
     def price_display(self, obj):
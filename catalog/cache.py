@@ -0,0 +1,109 @@
+"""
+Cache des réponses publiques du catalogue.
+
+Chaque réponse est stockée sous une clé : version du catalogue + URL normalisée
+(hôte, chemin, paramètres triés). Toute écriture sur le catalogue incrémente la
+version (signaux, voir catalog.signals) : les anciennes entrées ne sont plus
+jamais lues et expirent d'elles-mêmes.
+
+Backend choisi par settings.CATALOG_CACHE_BACKEND ('file' ou 'locmem') : il doit
+être partagé entre les workers, sinon chaque processus garde sa propre version
+(voir catalog.checks).
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+CACHE_ALIAS = 'catalog'
+VERSION_KEY = 'catalog:version'
+HITS_KEY = 'catalog:stats:hits'
+MISSES_KEY = 'catalog:stats:misses'
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def get_version():
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        #----Valeur initiale horodatee : ne retombe jamais sur une version deja utilisee apres eviction
+        cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    cache = get_cache()
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        get_version()
+        return cache.incr(VERSION_KEY)
+
+
+def _count(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_stats():
+    cache = get_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    lookups = hits + misses
+    return {
+        'backend': settings.CATALOG_CACHE_BACKEND,
+        'version': get_version(),
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / lookups, 4) if lookups else None,
+    }
+
+
+def response_cache_key(request, ignored_params=()):
+    params = sorted(
+        (key, sorted(values))
+        for key, values in request.query_params.lists()
+        if key not in ignored_params
+    )
+    raw = json.dumps([request.scheme, request.get_host(), request.path, params])
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f'catalog:response:{get_version()}:{digest}'
+
+
+class CachedResponseMixin:
+    """
+    Met en cache les réponses 200 d'une vue en lecture seule (GET).
+    En-tête X-Cache: HIT / MISS sur chaque réponse.
+    """
+    cache_timeout = None
+    cache_ignored_params = ()
+
+    def get(self, request, *args, **kwargs):
+        cache = get_cache()
+        key = response_cache_key(request, self.cache_ignored_params)
+
+        data = cache.get(key)
+        if data is not None:
+            _count(HITS_KEY)
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        _count(MISSES_KEY)
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = self.cache_timeout or settings.CATALOG_CACHE_TIMEOUT
+            cache.set(key, response.data, timeout)
+        response['X-Cache'] = 'MISS'
+        return response
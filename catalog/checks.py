@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+from .cache import get_cache
+
+
+@register(Tags.caches, deploy=True)
+def check_catalog_cache(app_configs, **kwargs):
+    #----Cache par processus hors DEBUG : la version du catalogue n'est pas partagee entre workers
+    if settings.DEBUG or not isinstance(get_cache(), LocMemCache):
+        return []
+    return [
+        Warning(
+            "Le cache catalogue est en mémoire locale (locmem) hors DEBUG : avec plusieurs workers, "
+            "une modification du catalogue n'invalide que le cache du processus qui l'a faite.",
+            hint="CATALOG_CACHE_BACKEND=file (ou un cache partagé) en production.",
+            id='catalog.W001',
+        )
+    ]
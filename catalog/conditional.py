@@ -0,0 +1,73 @@
+"""
+GET conditionnels (ETag / If-None-Match, Last-Modified / If-Modified-Since)
+pour les vues du catalogue : un client qui a deja la bonne version recoit un
+304 vide, calcule sans passer par les serializers.
+"""
+import hashlib
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import response_cache_key
+
+
+def make_etag(*parts):
+    digest = hashlib.md5(repr(parts).encode('utf-8')).hexdigest()
+    return quote_etag(digest)
+
+
+class ConditionalGetMixin:
+    """
+    A placer avant CachedResponseMixin : le 304 est renvoye avant toute lecture du cache.
+    Les vues fournissent get_validators() -> (etag, last_modified).
+    """
+
+    def get_validators(self):
+        return None, None
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is not None:
+            return response
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            if etag:
+                response['ETag'] = etag
+            if timestamp:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+
+class DetailConditionalMixin(ConditionalGetMixin):
+    #-----ETag = updated_at de l'annonce + liste de ses medias
+    media_model = None
+    media_lookup = None
+    media_fields = ('pk', 'file', 'is_cover', 'order')
+
+    def get_validators(self):
+        pk = self.kwargs['pk']
+        updated_at = self.get_queryset().filter(pk=pk).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return None, None
+        media = list(
+            self.media_model.objects.filter(**{self.media_lookup: pk})
+            .order_by('pk')
+            .values_list(*self.media_fields)
+        )
+        return make_etag(updated_at.isoformat(), media), updated_at
+
+
+class ListConditionalMixin(ConditionalGetMixin):
+    """
+    ETag = version du catalogue + URL normalisée (la clé du cache de réponses) :
+    aucune requête SQL, ni COUNT ni recherche, avant le 304 ou la lecture du cache.
+    Toute écriture sur le catalogue (annonces, médias, réservations) change la version.
+    """
+    def get_validators(self):
+        #----Pas de Last-Modified : la version ne dit pas quand la liste a change
+        return make_etag(response_cache_key(self.request)), None
@@ -0,0 +1,101 @@
+from decimal import Decimal
+
+from django.db import models
+from django.db.models import Count, Q
+
+from .models import Vehicle
+
+#-----Champs a choix comptes par valeur
+FACET_FIELDS = ('vehicle_type', 'listing_type', 'fuel', 'transmission', 'condition', 'origin')
+
+#-----Tranches (libelle, min inclus, max exclu) ; bornes renvoyees au client inclusives, voir _bounds()
+YEAR_BUCKETS = [
+    ('avant 2010', None, 2010),
+    ('2010-2014', 2010, 2015),
+    ('2015-2019', 2015, 2020),
+    ('2020 et plus', 2020, None),
+]
+PRICE_BUCKETS = [
+    ('moins de 2 M', None, 2000000),
+    ('2 M - 5 M', 2000000, 5000000),
+    ('5 M - 10 M', 5000000, 10000000),
+    ('10 M - 20 M', 10000000, 20000000),
+    ('20 M et plus', 20000000, None),
+]
+
+#-----Parametres sans effet sur les comptes (pagination, tri) : exclus de la cle de cache
+IGNORED_PARAMS = {'page', 'page_size', 'cursor', 'pagination', 'ordering'}
+
+
+def _range_q(field, low, high):
+    q = Q()
+    if low is not None:
+        q &= Q(**{f'{field}__gte': low})
+    if high is not None:
+        q &= Q(**{f'{field}__lt': high})
+    return q
+
+
+def _bounds(field, low, high):
+    #----Bornes inclusives, a renvoyer telles quelles dans year_min / year_max, min_price / max_price (filtres lte)
+    if high is None:
+        return low, None
+    model_field = Vehicle._meta.get_field(field)
+    if isinstance(model_field, models.DecimalField):
+        step = Decimal(1).scaleb(-model_field.decimal_places)
+    else:
+        step = 1
+    return low, high - step
+
+
+def _bucket_facets(field, buckets, total):
+    facets = []
+    for index, (label, low, high) in enumerate(buckets):
+        low, high = _bounds(field, low, high)
+        facets.append({'value': label, 'min': low, 'max': high, 'count': total(f'{field}__{index}')})
+    return facets
+
+
+def _annotations():
+    annotations = {'total': Count('pk')}
+    for field in FACET_FIELDS:
+        for value, _ in Vehicle._meta.get_field(field).choices:
+            annotations[f'{field}__{value}'] = Count('pk', filter=Q(**{field: value}))
+    for index, (_, low, high) in enumerate(YEAR_BUCKETS):
+        annotations[f'year__{index}'] = Count('pk', filter=_range_q('year', low, high))
+    for index, (_, low, high) in enumerate(PRICE_BUCKETS):
+        annotations[f'price__{index}'] = Count('pk', filter=_range_q('price', low, high))
+    return annotations
+
+
+def compute_vehicle_facets(queryset):
+    """
+    Compte des resultats par valeur de filtre, en une seule requete :
+    GROUP BY marque + comptes conditionnels (COUNT ... FILTER) pour les autres facettes,
+    sommes ensuite sur les marques.
+    """
+    rows = list(
+        queryset.order_by()
+        .values('brand_id', 'brand__name')
+        .annotate(**_annotations())
+        .order_by('brand__name')
+    )
+
+    def total(key):
+        return sum(row[key] for row in rows)
+
+    facets = {
+        field: [
+            {'value': value, 'label': label, 'count': total(f'{field}__{value}')}
+            for value, label in Vehicle._meta.get_field(field).choices
+        ]
+        for field in FACET_FIELDS
+    }
+    facets['brand'] = [
+        {'value': row['brand_id'], 'label': row['brand__name'], 'count': row['total']}
+        for row in rows
+    ]
+    facets['year'] = _bucket_facets('year', YEAR_BUCKETS, total)
+    facets['price'] = _bucket_facets('price', PRICE_BUCKETS, total)
+    return {'total': total('total'), 'facets': facets}
+
@@ -0,0 +1,33 @@
+from rest_framework import filters
+
+from . import search
+
+
+class CatalogSearchFilter(filters.SearchFilter):
+    """
+    ?search= servi par l'index plein texte du catalogue (catalog.search) au lieu
+    des icontains de SearchFilter. Sans ?ordering=, les resultats sont classes par
+    pertinence. Repli sur le SearchFilter de DRF si le SGBD n'a pas d'index.
+
+    A placer apres OrderingFilter dans filter_backends pour que le classement par
+    pertinence ne soit pas ecrase par l'ordre par defaut de la vue. Le rang est
+    annote (search_rank) : la pagination keyset s'en sert comme premiere cle.
+    """
+    rank_annotation = 'search_rank'
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+
+        expressions = search.search_expressions(queryset.model, ' '.join(terms))
+        if expressions is None:
+            return super().filter_queryset(request, queryset, view)
+
+        #----Toutes les correspondances, croisees avec les filtres deja appliques (statut, prix...)
+        matches, rank = expressions
+        queryset = queryset.filter(pk__in=matches)
+        if not request.query_params.get(filters.OrderingFilter.ordering_param):
+            ordering = queryset.query.order_by or queryset.model._meta.ordering
+            queryset = queryset.annotate(**{self.rank_annotation: rank}).order_by(self.rank_annotation, *ordering)
+        return queryset
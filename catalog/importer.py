@@ -0,0 +1,510 @@
+"""
+Import en masse du catalogue (véhicules, pièces détachées) depuis un fichier
+CSV ou JSONL, lu en flux et écrit par paquets de CHUNK_SIZE lignes.
+
+Pour chaque paquet :
+- chaque ligne est convertie et validée (clean_fields du modèle) ; une ligne
+  invalide est signalée (numéro de ligne + message) sans interrompre l'import ;
+- marques et modèles sont résolus par nom replié depuis une table en mémoire
+  (créés à la volée s'ils n'existent pas) ;
+- upsert en un bulk_create(update_conflicts=True) sur external_ref : une
+  annonce déjà importée est mise à jour, seules les colonnes présentes dans le
+  fichier sont écrasées ;
+- les médias sont copiés depuis le dossier source pour les annonces qui n'en
+  ont pas encore (un ré-import ne les duplique pas) ;
+- index plein texte et photos principales sont mis à jour pour le paquet.
+
+bulk_create n'envoie pas post_save : clés de localisation, photo principale,
+index et version du cache catalogue sont donc tenus ici plutôt que par
+catalog.signals.
+
+Colonnes multi-valeurs (media, compatible_brands, compatible_models) : liste
+JSON en JSONL, valeurs séparées par « | » en CSV. Un modèle compatible s'écrit
+« Marque/Modèle ».
+"""
+import csv
+import json
+import os
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import DatabaseError, models, transaction
+
+from . import search
+from .cache import bump_version
+from .models import Brand, SparePart, SparePartMedia, Vehicle, VehicleMedia, VehicleModel
+from .text import fold
+
+CHUNK_SIZE = 1000
+
+#-----Nombre max d'erreurs detaillees gardees dans le rapport (les compteurs restent exacts)
+MAX_REPORTED_ERRORS = 1000
+
+LIST_SEPARATOR = '|'
+VIDEO_EXTENSIONS = {'.mp4', '.mov', '.webm', '.avi', '.mkv'}
+TRUE_VALUES = {'1', 'true', 'vrai', 'oui', 'yes', 'o', 'y'}
+FALSE_VALUES = {'0', 'false', 'faux', 'non', 'no', 'n'}
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+
+# ─── Lecture ──────────────────────────────────────────────────────────────────
+
+def detect_format(filename):
+    return FORMATS.get(os.path.splitext(filename or '')[1].lower())
+
+
+def read_rows(stream, fmt):
+    """
+    (numéro de ligne, ligne, erreur) pour chaque ligne de données du fichier.
+    `stream` est un flux texte ; CSV avec en-tête, JSONL = un objet JSON par ligne.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+    elif fmt == 'jsonl':
+        for number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield number, None, f"JSON invalide : {e}"
+                continue
+            if isinstance(row, dict):
+                yield number, row, None
+            else:
+                yield number, None, "Objet JSON attendu."
+    else:
+        raise ValueError(f"Format d'import inconnu : {fmt}")
+
+
+def _text(value):
+    return value.strip() if isinstance(value, str) else value
+
+
+def _list(value):
+    if value in (None, ''):
+        return []
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(LIST_SEPARATOR) if item.strip()]
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def _message(error):
+    if hasattr(error, 'message_dict'):
+        return ' ; '.join(f"{field} : {' '.join(messages)}" for field, messages in error.message_dict.items())
+    return ' '.join(error.messages)
+
+
+# ─── Rapport ──────────────────────────────────────────────────────────────────
+
+class ImportReport:
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.rejected = 0
+        self.errors = []
+        self.warnings = []
+
+    def error(self, line, ref, message):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'external_ref': ref, 'error': message})
+
+    def warning(self, line, ref, message):
+        if len(self.warnings) < MAX_REPORTED_ERRORS:
+            self.warnings.append({'line': line, 'external_ref': ref, 'warning': message})
+
+    def as_dict(self):
+        seconds = time.monotonic() - self.started
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'updated': self.updated,
+            'rejected': self.rejected,
+            'seconds': round(seconds, 2),
+            'rows_per_second': round(self.rows / seconds) if seconds else None,
+            'errors': self.errors,
+            'warnings': self.warnings,
+        }
+
+
+# ─── Marques & modèles ────────────────────────────────────────────────────────
+
+class NameMap:
+    #----Marques / modeles indexes par nom replie, charges une fois : "TOYOTA" = "Toyota"
+    def __init__(self, create_missing=True):
+        self.create_missing = create_missing
+        self.brands = {fold(brand.name): brand for brand in Brand.objects.all()}
+        self.models = {(model.brand_id, fold(model.name)): model for model in VehicleModel.objects.all()}
+        self.raw_brands = {}
+        self.raw_models = {}
+
+    def brand(self, name, field='brand'):
+        #----Memo par nom brut : la plupart des lignes repetent les memes marques
+        name = '' if name is None else str(name)
+        if name in self.raw_brands:
+            return self.raw_brands[name]
+        key = fold(name)
+        if not key:
+            raise ValidationError({field: ["Ce champ est obligatoire."]})
+        brand = self.brands.get(key)
+        if brand is None:
+            if not self.create_missing:
+                raise ValidationError({field: [f"Marque inconnue : {name}."]})
+            brand, _ = Brand.objects.get_or_create(name=' '.join(name.split()))
+            self.brands[key] = brand
+        self.raw_brands[name] = brand
+        return brand
+
+    def model(self, brand, name, field='model'):
+        name = '' if name is None else str(name)
+        if (brand.pk, name) in self.raw_models:
+            return self.raw_models[brand.pk, name]
+        key = fold(name)
+        if not key:
+            raise ValidationError({field: ["Ce champ est obligatoire."]})
+        model = self.models.get((brand.pk, key))
+        if model is None:
+            if not self.create_missing:
+                raise ValidationError({field: [f"Modèle inconnu : {brand.name} {name}."]})
+            model, _ = VehicleModel.objects.get_or_create(brand=brand, name=' '.join(name.split()))
+            self.models[(brand.pk, key)] = model
+        model.brand = brand
+        self.raw_models[brand.pk, name] = model
+        return model
+
+
+# ─── Import ───────────────────────────────────────────────────────────────────
+
+class BaseImporter:
+    model = None
+    #-----Colonnes simples copiees sur le modele (hors external_ref et colonnes speciales)
+    fields = ()
+    media_model = None
+    media_owner = None
+    #-----Champs non valides par clean_fields (renseignes par l'import lui-meme)
+    clean_exclude = ('cover_media',)
+
+    def __init__(self, media_dir=None, chunk_size=CHUNK_SIZE, create_missing=True):
+        self.media_dir = os.path.realpath(media_dir) if media_dir else None
+        self.chunk_size = chunk_size
+        self.names = NameMap(create_missing)
+        self.report = ImportReport()
+
+    def run(self, rows):
+        chunk = []
+        for line, row, error in rows:
+            self.report.rows += 1
+            if error:
+                self.report.error(line, None, error)
+                continue
+            chunk.append((line, row))
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(chunk)
+                chunk = []
+        if chunk:
+            self._import_chunk(chunk)
+        if self.report.created or self.report.updated:
+            transaction.on_commit(bump_version)
+        return self.report
+
+    # ── Construction d'une ligne ──────────────────────────────────────────────
+
+    def field_values(self, row):
+        values = {}
+        for name in self.fields:
+            if name not in row:
+                continue
+            field = self.model._meta.get_field(name)
+            value = _text(row[name])
+            if value in (None, ''):
+                if field.null:
+                    values[name] = None
+                elif field.has_default():
+                    values[name] = field.get_default()
+                else:
+                    values[name] = ''
+                continue
+            if isinstance(field, models.BooleanField) and isinstance(value, str):
+                lowered = value.lower()
+                if lowered in TRUE_VALUES:
+                    value = True
+                elif lowered in FALSE_VALUES:
+                    value = False
+                else:
+                    raise ValidationError({name: ["Valeur attendue : oui / non."]})
+            values[name] = value
+        return values
+
+    def build(self, ref, row):
+        """Retourne (instance validée, relations) ; lève ValidationError si la ligne est invalide."""
+        raise NotImplementedError
+
+    def update_fields(self, provided):
+        return sorted(provided) + ['updated_at']
+
+    # ── Paquet ────────────────────────────────────────────────────────────────
+
+    def _import_chunk(self, rows):
+        entries = {}
+        missing = {}
+        for line, row in rows:
+            ref = _text(row.get('external_ref'))
+            if not ref:
+                self.report.error(line, None, "external_ref : Ce champ est obligatoire.")
+                continue
+            ref = str(ref)
+            try:
+                obj, relations = self.build(ref, row)
+            except ValidationError as e:
+                self.report.error(line, ref, _message(e))
+                continue
+            if ref in entries:
+                self.report.error(entries[ref][0], ref, f"Référence en double : remplacée par la ligne {line}.")
+            entries[ref] = (line, obj, relations)
+            missing[ref] = self.absent(row)
+        existing = self.complete(entries, missing)
+        if not entries:
+            return
+        provided = set(self.fields).difference(*(missing[ref] for ref in entries))
+
+        try:
+            with transaction.atomic():
+                warnings = self.save(entries, provided)
+        except DatabaseError as e:
+            for ref, (line, _, _) in entries.items():
+                self.report.error(line, ref, f"Erreur base de données : {e}")
+            return
+        self.report.created += len(entries) - existing
+        self.report.updated += existing
+        for warning in warnings:
+            self.report.warning(*warning)
+
+    def absent(self, row):
+        return {name for name in self.fields if name not in row}
+
+    def validate(self, obj, row):
+        #----Les colonnes absentes de la ligne sont validees par complete(), une fois connu l'etat en base
+        obj.clean_fields(exclude=[*self.clean_exclude, *self.absent(row)])
+
+    def complete(self, entries, missing):
+        """
+        Colonnes absentes d'une ligne : reprises de l'annonce existante (l'INSERT de
+        l'upsert doit rester valide, l'UPDATE ne les touche pas), validées
+        (obligatoires, valeurs par défaut) pour une nouvelle annonce.
+        Retourne le nombre d'annonces déjà en base.
+        """
+        absent = set().union(*missing.values())
+        current = {
+            row['external_ref']: row
+            for row in self.model.objects.filter(external_ref__in=list(entries)).values('external_ref', *absent)
+        }
+        for ref, (line, obj, _) in list(entries.items()):
+            if ref in current:
+                for name in missing[ref]:
+                    setattr(obj, name, current[ref][name])
+            elif missing[ref]:
+                checked = missing[ref]
+                try:
+                    obj.clean_fields(exclude=[f.name for f in self.model._meta.fields if f.name not in checked])
+                except ValidationError as e:
+                    self.report.error(line, ref, _message(e))
+                    del entries[ref]
+        return len(current)
+
+    def save(self, entries, provided):
+        refs = list(entries)
+        objs = [obj for _, obj, _ in entries.values()]
+        self.model.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=['external_ref'],
+            update_fields=self.update_fields(provided),
+        )
+        #----bulk_create(update_conflicts=True) ne renvoie pas les cles : relues par external_ref
+        pks = dict(self.model.objects.filter(external_ref__in=refs).values_list('external_ref', 'pk'))
+        for ref, (_, obj, _) in entries.items():
+            obj.pk = pks[ref]
+
+        self.save_relations(entries)
+        warnings = self.attach_media(entries)
+        search.index_objects(self.model, objs)
+        return warnings
+
+    def save_relations(self, entries):
+        pass
+
+    # ── Médias ────────────────────────────────────────────────────────────────
+
+    def media_path(self, name):
+        #----Chemin dans le dossier source uniquement (pas de "../")
+        path = os.path.realpath(os.path.join(self.media_dir, name))
+        if os.path.commonpath([path, self.media_dir]) != self.media_dir or not os.path.isfile(path):
+            return None
+        return path
+
+    def make_media(self, owner_id, name, order):
+        raise NotImplementedError
+
+    def attach_media(self, entries):
+        warnings = []
+        wanted = {
+            obj.pk: (line, ref, relations['media'])
+            for ref, (line, obj, relations) in entries.items()
+            if relations.get('media')
+        }
+        if not wanted:
+            return warnings
+        if self.media_dir is None:
+            for line, ref, _ in wanted.values():
+                warnings.append((line, ref, "Médias ignorés : aucun dossier source fourni."))
+            return warnings
+
+        owner = self.media_owner
+        has_media = set(
+            self.media_model.objects.filter(**{f'{owner}__in': list(wanted)})
+            .values_list(owner, flat=True).distinct()
+        )
+        medias = []
+        for owner_id, (line, ref, names) in wanted.items():
+            if owner_id in has_media:
+                continue
+            for order, name in enumerate(names):
+                path = self.media_path(name)
+                if path is None:
+                    warnings.append((line, ref, f"Média introuvable : {name}."))
+                    continue
+                media = self.make_media(owner_id, name, order)
+                with open(path, 'rb') as handle:
+                    media.file.save(os.path.basename(path), File(handle), save=False)
+                medias.append(media)
+        if medias:
+            self.media_model.objects.bulk_create(medias)
+            self.refresh_covers({getattr(media, owner) for media in medias})
+        return warnings
+
+    def cover_candidates(self, owner_ids):
+        return self.media_model.objects.filter(**{f'{self.media_owner}__in': list(owner_ids)})
+
+    def refresh_covers(self, owner_ids):
+        #----Meme regle que refresh_cover_media(), pour tout le paquet en une lecture + un bulk_update
+        covers = {}
+        rows = self.cover_candidates(owner_ids).order_by(self.media_owner, '-is_cover', 'order', 'pk')
+        for owner_id, media_id in rows.values_list(self.media_owner, 'pk'):
+            covers.setdefault(owner_id, media_id)
+        self.model.objects.bulk_update(
+            [self.model(pk=pk, cover_media_id=covers.get(pk)) for pk in owner_ids],
+            ['cover_media'],
+        )
+
+
+class VehicleImporter(BaseImporter):
+    model = Vehicle
+    fields = (
+        'title', 'vehicle_type', 'listing_type', 'year', 'mileage', 'fuel', 'transmission', 'color',
+        'condition', 'price', 'rental_price_per_day', 'origin', 'city', 'country',
+        'transport_included', 'transport_estimate', 'description', 'status', 'is_featured',
+    )
+    media_model = VehicleMedia
+    media_owner = 'vehicle_id'
+    clean_exclude = ('cover_media', 'brand', 'model', 'city_key', 'country_key')
+
+    def build(self, ref, row):
+        brand = self.names.brand(row.get('brand'))
+        model = self.names.model(brand, row.get('model'))
+        vehicle = Vehicle(external_ref=ref, brand=brand, model=model, **self.field_values(row))
+        self.validate(vehicle, row)
+        #----save() n'est pas appele par bulk_create : cles de localisation calculees ici
+        vehicle.city_key = fold(vehicle.city)
+        vehicle.country_key = fold(vehicle.country)
+        return vehicle, {'media': _list(row.get('media'))}
+
+    def update_fields(self, provided):
+        derived = {'brand', 'model'}
+        if 'city' in provided:
+            derived.add('city_key')
+        if 'country' in provided:
+            derived.add('country_key')
+        return super().update_fields(provided | derived)
+
+    def make_media(self, owner_id, name, order):
+        is_video = os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS
+        return VehicleMedia(vehicle_id=owner_id, media_type='video' if is_video else 'photo', order=order)
+
+    def cover_candidates(self, owner_ids):
+        return super().cover_candidates(owner_ids).filter(media_type='photo')
+
+
+class SparePartImporter(BaseImporter):
+    model = SparePart
+    fields = (
+        'title', 'reference', 'condition', 'price', 'stock_quantity', 'status', 'is_local',
+        'description', 'is_featured',
+    )
+    media_model = SparePartMedia
+    media_owner = 'part_id'
+
+    def build(self, ref, row):
+        part = SparePart(external_ref=ref, **self.field_values(row))
+        self.validate(part, row)
+        if 'stock_quantity' in row and not _text(row.get('status')):
+            #----Statut deduit du stock, comme catalog.stock.reserve()
+            part.status = 'in_stock' if part.stock_quantity > 0 else 'out_of_stock'
+
+        relations = {'media': _list(row.get('media'))}
+        if 'compatible_brands' in row:
+            relations['compatible_brands'] = [
+                self.names.brand(name, 'compatible_brands').pk for name in _list(row['compatible_brands'])
+            ]
+        if 'compatible_models' in row:
+            relations['compatible_models'] = []
+            for value in _list(row['compatible_models']):
+                brand_name, _, model_name = value.partition('/')
+                brand = self.names.brand(brand_name, 'compatible_models')
+                relations['compatible_models'].append(self.names.model(brand, model_name, 'compatible_models').pk)
+        return part, relations
+
+    def absent(self, row):
+        absent = super().absent(row)
+        if 'stock_quantity' in row:
+            absent.discard('status')
+        return absent
+
+    def save_relations(self, entries):
+        #----Compatibilites remplacees pour les lignes qui les fournissent (DELETE + INSERT en masse)
+        for name, target in (('compatible_brands', 'brand_id'), ('compatible_models', 'vehiclemodel_id')):
+            through = getattr(SparePart, name).through
+            owners = {obj.pk: relations[name] for _, obj, relations in entries.values() if name in relations}
+            if not owners:
+                continue
+            through.objects.filter(sparepart_id__in=list(owners)).delete()
+            through.objects.bulk_create([
+                through(sparepart_id=owner_id, **{target: target_id})
+                for owner_id, target_ids in owners.items()
+                for target_id in dict.fromkeys(target_ids)
+            ])
+
+    def make_media(self, owner_id, name, order):
+        return SparePartMedia(part_id=owner_id, order=order)
+
+
+IMPORTERS = {
+    'vehicles': VehicleImporter,
+    'parts': SparePartImporter,
+}
+
+
+def import_catalog(kind, stream, fmt, **options):
+    """
+    Importe un flux texte CSV / JSONL d'annonces `kind` ('vehicles' ou 'parts').
+    Retourne l'ImportReport.
+    """
+    importer = IMPORTERS[kind](**options)
+    return importer.run(read_rows(stream, fmt))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from catalog.models import Vehicle
+from catalog.text import fold
+
+
+class Command(BaseCommand):
+    help = "Recalcule city_key / country_key des véhicules (après un import ou une mise à jour en masse)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        batch = []
+        updated = 0
+        for vehicle in Vehicle.objects.only('pk', 'city', 'country', 'city_key', 'country_key').iterator(chunk_size=batch_size):
+            city_key, country_key = fold(vehicle.city), fold(vehicle.country)
+            if (city_key, country_key) == (vehicle.city_key, vehicle.country_key):
+                continue
+            vehicle.city_key, vehicle.country_key = city_key, country_key
+            batch.append(vehicle)
+            if len(batch) >= batch_size:
+                Vehicle.objects.bulk_update(batch, ['city_key', 'country_key'])
+                updated += len(batch)
+                batch = []
+        if batch:
+            Vehicle.objects.bulk_update(batch, ['city_key', 'country_key'])
+            updated += len(batch)
+        self.stdout.write(self.style.SUCCESS(f"{updated} véhicule(s) mis à jour."))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from catalog import importer
+
+#-----Nombre d'erreurs / avertissements affiches en fin d'import
+SHOWN_ERRORS = 20
+
+
+class Command(BaseCommand):
+    help = "Importe des véhicules ou des pièces détachées depuis un fichier CSV / JSONL (mise à jour par external_ref)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(importer.IMPORTERS))
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Par défaut : déduit de l'extension.")
+        parser.add_argument('--media-dir', help="Dossier contenant les fichiers cités dans la colonne media.")
+        parser.add_argument('--chunk-size', type=int, default=importer.CHUNK_SIZE)
+        parser.add_argument('--no-create-brands', action='store_true',
+                            help="Rejette les lignes dont la marque / le modèle n'existe pas.")
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or importer.detect_format(options['path'])
+        if fmt is None:
+            raise CommandError("Format inconnu : préciser --format csv ou --format jsonl.")
+        try:
+            stream = open(options['path'], encoding='utf-8-sig', newline='')
+        except OSError as e:
+            raise CommandError(str(e))
+
+        with stream:
+            report = importer.import_catalog(
+                options['kind'], stream, fmt,
+                media_dir=options['media_dir'],
+                chunk_size=options['chunk_size'],
+                create_missing=not options['no_create_brands'],
+            )
+
+        summary = report.as_dict()
+        for error in summary['errors'][:SHOWN_ERRORS]:
+            self.stdout.write(self.style.WARNING(
+                f"Ligne {error['line']} ({error['external_ref'] or '-'}) : {error['error']}"
+            ))
+        for warning in summary['warnings'][:SHOWN_ERRORS]:
+            self.stdout.write(f"Ligne {warning['line']} ({warning['external_ref']}) : {warning['warning']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{summary['rows']} ligne(s) lue(s) : {summary['created']} créée(s), {summary['updated']} mise(s) à jour, "
+            f"{summary['rejected']} rejetée(s) — {summary['rows_per_second']} lignes/s."
+        ))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from catalog import search
+from catalog.models import Vehicle, SparePart
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index plein texte des véhicules et des pièces détachées."
+
+    def handle(self, *args, **options):
+        if search.get_backend() is None:
+            self.stdout.write(self.style.WARNING("Aucun moteur plein texte pour cette base : recherche par SearchFilter."))
+            return
+        for model in (Vehicle, SparePart):
+            count = search.rebuild(model)
+            self.stdout.write(self.style.SUCCESS(f"{count} {model._meta.verbose_name_plural} indexé(e)s."))
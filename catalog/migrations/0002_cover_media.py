@@ -0,0 +1,44 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_cover_media(apps, schema_editor):
+    Vehicle = apps.get_model('catalog', 'Vehicle')
+    VehicleMedia = apps.get_model('catalog', 'VehicleMedia')
+    SparePart = apps.get_model('catalog', 'SparePart')
+    SparePartMedia = apps.get_model('catalog', 'SparePartMedia')
+
+    covers = {}
+    for media in VehicleMedia.objects.filter(media_type='photo').order_by('-is_cover', 'order', 'pk'):
+        covers.setdefault(media.vehicle_id, media.pk)
+    for vehicle_id, media_id in covers.items():
+        Vehicle.objects.filter(pk=vehicle_id).update(cover_media_id=media_id)
+
+    covers = {}
+    for media in SparePartMedia.objects.order_by('-is_cover', 'order', 'pk'):
+        covers.setdefault(media.part_id, media.pk)
+    for part_id, media_id in covers.items():
+        SparePart.objects.filter(pk=part_id).update(cover_media_id=media_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sparepart',
+            name='cover_media',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.sparepartmedia', verbose_name='Photo principale'),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='cover_media',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='catalog.vehiclemedia', verbose_name='Photo principale'),
+        ),
+        migrations.RunPython(backfill_cover_media, migrations.RunPython.noop),
+    ]
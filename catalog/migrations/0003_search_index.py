@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from catalog import search
+
+
+def create_search_index(apps, schema_editor):
+    search.create_indexes(schema_editor.connection)
+    for model_name in ('Vehicle', 'SparePart'):
+        search.rebuild(apps.get_model('catalog', model_name), schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    search.drop_indexes(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_cover_media'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['status', '-is_featured', '-created_at', '-id'], name='vehicle_list_default_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['status', 'listing_type', 'vehicle_type', '-is_featured', '-created_at'], name='vehicle_list_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['status', 'brand', 'model'], name='vehicle_list_brand_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['status', 'price'], name='vehicle_list_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['status', 'year'], name='vehicle_list_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['status', 'created_at'], name='vehicle_list_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(condition=models.Q(('is_featured', True), ('status', 'available')), fields=['-created_at'], name='vehicle_featured_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:40
+
+from django.db import migrations, models
+
+from catalog.text import fold
+
+
+def backfill_location_keys(apps, schema_editor):
+    Vehicle = apps.get_model('catalog', 'Vehicle')
+    vehicles = list(Vehicle.objects.only('pk', 'city', 'country'))
+    for vehicle in vehicles:
+        vehicle.city_key = fold(vehicle.city)
+        vehicle.country_key = fold(vehicle.country)
+    Vehicle.objects.bulk_update(vehicles, ['city_key', 'country_key'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_vehicle_list_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vehicle',
+            name='city_key',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='country_key',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['status', 'country_key', 'city_key'], name='vehicle_list_location_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vehicle',
+            index=models.Index(fields=['status', 'city_key'], name='vehicle_list_city_idx'),
+        ),
+        migrations.RunPython(backfill_location_keys, migrations.RunPython.noop),
+    ]
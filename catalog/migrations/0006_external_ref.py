@@ -0,0 +1,23 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_vehicle_location_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sparepart',
+            name='external_ref',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True, verbose_name='Référence externe'),
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='external_ref',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True, verbose_name='Référence externe'),
+        ),
+    ]
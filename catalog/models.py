@@ -1,4 +1,7 @@
 from django.db import models
+from django.utils import timezone
+
+from .text import fold
 
 
 class Brand(models.Model):
@@ -68,6 +71,12 @@ class Vehicle(models.Model):
 
     #----Informations de base
 
+    #----Reference du vendeur / de l'import (catalog.importer) : cle de mise a jour des imports successifs
+    external_ref = models.CharField(
+        max_length=100, unique=True,
+        null=True, blank=True,
+        verbose_name="Référence externe"
+    )
     title = models.CharField(max_length=200, verbose_name="Titre de l'annonce")
     vehicle_type = models.CharField(max_length=10, choices=TYPE_CHOICES, verbose_name="Type")
     listing_type = models.CharField(max_length=10, choices=LISTING_TYPE_CHOICES, verbose_name="Type d'annonce")
@@ -90,6 +99,9 @@ class Vehicle(models.Model):
     origin = models.CharField(max_length=15, choices=ORIGIN_CHOICES, default='local', verbose_name="Origine")
     city = models.CharField(max_length=100, verbose_name="Ville")
     country = models.CharField(max_length=100, default="Togo", verbose_name="Pays")
+    #----Versions normalisees (minuscules, sans accents) pour les filtres : "Lomé" = "LOME" = "lome"
+    city_key = models.CharField(max_length=100, blank=True, editable=False)
+    country_key = models.CharField(max_length=100, blank=True, editable=False)
 
     #---Transport international
     transport_included = models.BooleanField(default=False, verbose_name="Frais de transport inclus")
@@ -104,6 +116,16 @@ class Vehicle(models.Model):
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='available', verbose_name="Statut")
     is_featured = models.BooleanField(default=False, verbose_name="Mise en avant")
 
+    #----Photo principale denormalisee (tenue a jour par les signaux de VehicleMedia)
+    cover_media = models.ForeignKey(
+        'VehicleMedia',
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name="Photo principale"
+    )
+
     #----Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -112,10 +134,50 @@ class Vehicle(models.Model):
         verbose_name = "Véhicule"
         verbose_name_plural = "Véhicules"
         ordering = ['-is_featured', '-created_at']
+        #----Index calques sur les filtres de VehicleListView (toujours status='available' en tete)
+        indexes = [
+            models.Index(fields=['status', '-is_featured', '-created_at', '-id'], name='vehicle_list_default_idx'),
+            models.Index(
+                fields=['status', 'listing_type', 'vehicle_type', '-is_featured', '-created_at'],
+                name='vehicle_list_type_idx',
+            ),
+            models.Index(fields=['status', 'brand', 'model'], name='vehicle_list_brand_idx'),
+            models.Index(fields=['status', 'price'], name='vehicle_list_price_idx'),
+            models.Index(fields=['status', 'year'], name='vehicle_list_year_idx'),
+            models.Index(fields=['status', 'created_at'], name='vehicle_list_created_idx'),
+            models.Index(fields=['status', 'country_key', 'city_key'], name='vehicle_list_location_idx'),
+            models.Index(fields=['status', 'city_key'], name='vehicle_list_city_idx'),
+            models.Index(
+                fields=['-created_at'],
+                condition=models.Q(status='available', is_featured=True),
+                name='vehicle_featured_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.title} — {self.get_listing_type_display()}"
 
+    def save(self, *args, **kwargs):
+        self.city_key = fold(self.city)
+        self.country_key = fold(self.country)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if 'city' in update_fields:
+                update_fields.add('city_key')
+            if 'country' in update_fields:
+                update_fields.add('country_key')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+    def refresh_cover_media(self):
+        #----Photo marquee is_cover en priorite, sinon la premiere photo dans l'ordre d'affichage
+        cover = self.media.filter(media_type='photo').order_by('-is_cover', 'order', 'pk').first()
+        #----updated_at avance aussi : les medias font partie de l'annonce (ETag, cache client)
+        Vehicle.objects.filter(pk=self.pk).update(cover_media=cover, updated_at=timezone.now())
+        self.cover_media = cover
+        return cover
+
 
  #----Photos et videos associes a un vehicule
 class VehicleMedia(models.Model):
@@ -152,6 +214,11 @@ class SparePart(models.Model):
         ('out_of_stock', 'Rupture de stock'),
     ]
 
+    external_ref = models.CharField(
+        max_length=100, unique=True,
+        null=True, blank=True,
+        verbose_name="Référence externe"
+    )
     title = models.CharField(max_length=200, verbose_name="Nom de la pièce")
     reference = models.CharField(max_length=100, blank=True, verbose_name="Référence")
     compatible_brands = models.ManyToManyField(Brand, blank=True, verbose_name="Marques compatibles")
@@ -163,6 +230,14 @@ class SparePart(models.Model):
     is_local = models.BooleanField(default=True, verbose_name="Disponible au Togo (livraison rapide)")
     description = models.TextField(blank=True, verbose_name="Description")
     is_featured = models.BooleanField(default=False, verbose_name="Mise en avant")
+    cover_media = models.ForeignKey(
+        'SparePartMedia',
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name="Photo principale"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -174,6 +249,12 @@ class SparePart(models.Model):
     def __str__(self):
         return f"{self.title} ({self.reference})"
 
+    def refresh_cover_media(self):
+        cover = self.media.order_by('-is_cover', 'order', 'pk').first()
+        SparePart.objects.filter(pk=self.pk).update(cover_media=cover, updated_at=timezone.now())
+        self.cover_media = cover
+        return cover
+
 
 class SparePartMedia(models.Model):
     #-----Photos de piece détache
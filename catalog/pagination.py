@@ -0,0 +1,213 @@
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination par curseur (keyset) sur toutes les colonnes de tri de la vue.
+
+    Le curseur encode les valeurs de tri de la derniere ligne renvoyee : la page
+    suivante est un simple WHERE (is_featured, created_at, id) < (...) sans OFFSET
+    ni COUNT(*), donc la page 500 coute autant que la page 1.
+    L'id sert de departage pour que l'ordre soit total. Avec ?search= sans ?ordering=,
+    le rang de pertinence (annotation search_rank) est la premiere cle.
+    """
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = "Curseur invalide."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.keys = self.get_keys(request, queryset, view)
+
+        cursor = self.decode_cursor(request)
+        backwards = cursor is not None and cursor['d'] == 'prev'
+
+        queryset = queryset.order_by(*(self._order_by(key, backwards) for key in self.keys))
+        if cursor is not None:
+            queryset = queryset.filter(self._cursor_filter(cursor['v'], backwards))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+
+        if backwards:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    # ── Ordre de tri ─────────────────────────────────────────────────────────
+
+    def get_keys(self, request, queryset, view):
+        #----Reprend l'ordre final du queryset, filtres compris (?ordering=, rang de pertinence de ?search=)
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+
+        opts = queryset.model._meta
+        annotations = queryset.query.annotations
+        keys = []
+        self.fields = {}
+        for item in ordering:
+            name = item.lstrip('-')
+            if name in annotations:
+                #----Annotation de tri (ex: search_rank) : jamais NULL pour les lignes retenues
+                self.fields[name] = annotations[name].output_field
+                keys.append((name, item.startswith('-'), False))
+                continue
+            if name == 'pk':
+                name = opts.pk.name
+            field = opts.get_field(name)
+            self.fields[field.attname] = field
+            keys.append((field.attname, item.startswith('-'), field.null))
+
+        if not any(attname == opts.pk.attname for attname, _, _ in keys):
+            descending = keys[-1][1] if keys else False
+            self.fields[opts.pk.attname] = opts.pk
+            keys.append((opts.pk.attname, descending, False))
+        return keys
+
+    def _order_by(self, key, backwards):
+        #----Les NULL (ex: mileage) sont toujours en fin de liste, quel que soit le SGBD
+        name, descending, nullable = key
+        expression = F(name).desc if descending != backwards else F(name).asc
+        if not nullable:
+            return expression()
+        return expression(nulls_first=True) if backwards else expression(nulls_last=True)
+
+    def _cursor_filter(self, values, backwards):
+        #----Comparaison lexicographique : (a apres va) OU (a = va ET b apres vb) OU ...
+        condition = None
+        equal = Q()
+        for (name, descending, nullable), value in zip(self.keys, values):
+            strict = self._strictly_after(name, descending, nullable, value, backwards)
+            if strict is not None:
+                term = equal & strict
+                condition = term if condition is None else condition | term
+            if value is None:
+                equal &= Q(**{f'{name}__isnull': True})
+            else:
+                equal &= Q(**{name: value})
+        if condition is None:
+            return Q(pk__in=[])
+        return condition
+
+    def _strictly_after(self, name, descending, nullable, value, backwards):
+        if not backwards:
+            if value is None:
+                return None
+            strict = Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            if nullable:
+                strict |= Q(**{f'{name}__isnull': True})
+            return strict
+        if value is None:
+            return Q(**{f'{name}__isnull': False})
+        return Q(**{f"{name}__{'gt' if descending else 'lt'}": value})
+
+    # ── Curseurs ─────────────────────────────────────────────────────────────
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(cursor, dict)
+            or cursor.get('d') not in ('next', 'prev')
+            or not isinstance(cursor.get('v'), list)
+            or len(cursor['v']) != len(self.keys)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        #----Valeurs converties par les champs de tri : un curseur modifie a la main donne un 404, pas une 500
+        try:
+            cursor['v'] = [
+                None if value is None else self.fields[name].to_python(value)
+                for (name, _, _), value in zip(self.keys, cursor['v'])
+            ]
+        except (ValidationError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, obj, direction):
+        values = [self._dump(getattr(obj, name)) for name, _, _ in self.keys]
+        payload = json.dumps({'d': direction, 'v': values}, separators=(',', ':'))
+        encoded = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        url = remove_query_param(self.request.build_absolute_uri(), 'page')
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def _dump(self, value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], 'next')
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], 'prev')
+
+
+class CatalogPagination(PageNumberPagination):
+    """
+    Pagination des catalogues : pages numerotees par defaut.
+    Mode keyset sur demande avec ?pagination=cursor (ou des qu'un ?cursor= est fourni),
+    pour le scroll infini : pas de COUNT(*) ni d'OFFSET.
+    """
+    mode_query_param = 'pagination'
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def use_keyset(self, request):
+        params = request.query_params
+        return params.get(self.mode_query_param) == 'cursor' or self.keyset_class.cursor_query_param in params
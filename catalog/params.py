@@ -0,0 +1,16 @@
+from django.utils.dateparse import parse_date
+from rest_framework.exceptions import ValidationError
+
+
+def date_param(params, name, default=None):
+    #----Parametre de requete AAAA-MM-JJ ; absent -> default, invalide -> 400
+    value = params.get(name)
+    if not value:
+        return default
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValidationError({name: "Date invalide (format attendu : AAAA-MM-JJ)."})
+    return parsed
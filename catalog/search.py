@@ -0,0 +1,215 @@
+"""
+Moteur de recherche plein texte du catalogue.
+
+Un index inverse par type d'annonce (véhicules, pièces), tenu à jour par les
+signaux post_save / post_delete :
+- SQLite : table virtuelle FTS5 (rowid = id de l'annonce), classement bm25 ;
+- PostgreSQL : table tsvector + index GIN, classement ts_rank.
+
+Le texte est replié (minuscules, sans accents) avant indexation comme avant
+recherche : "electrique" trouve "Électrique". Chaque mot saisi est cherché en
+préfixe ("toyo cor" trouve "Toyota Corolla").
+"""
+from django.db import connection as default_connection
+from django.db.models import FloatField
+from django.db.models.expressions import RawSQL
+
+from .text import fold, tokenize
+
+#-----Poids relatif du titre par rapport a la description dans le classement
+TITLE_WEIGHT = 5.0
+
+
+def vehicle_document(vehicle):
+    return (
+        f"{vehicle.title} {vehicle.brand.name} {vehicle.model.name}",
+        vehicle.description,
+    )
+
+
+def part_document(part):
+    return (f"{part.title} {part.reference}", part.description)
+
+
+#-----label du modele -> (table d'index, fonction (titre, corps), relations a charger)
+INDEXES = {
+    'catalog.vehicle': ('catalog_vehicle_search', vehicle_document, ('brand', 'model')),
+    'catalog.sparepart': ('catalog_sparepart_search', part_document, ()),
+}
+
+
+class SqliteBackend:
+    def create(self, cursor, table):
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5("
+            f"title, body, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+
+    def drop(self, cursor, table):
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def upsert(self, cursor, table, rows):
+        cursor.executemany(f"DELETE FROM {table} WHERE rowid = %s", [(pk,) for pk, _, _ in rows])
+        cursor.executemany(f"INSERT INTO {table} (rowid, title, body) VALUES (%s, %s, %s)", rows)
+
+    def delete(self, cursor, table, pks):
+        cursor.executemany(f"DELETE FROM {table} WHERE rowid = %s", [(pk,) for pk in pks])
+
+    def match(self, table, tokens):
+        return f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [self._query(tokens)]
+
+    def rank(self, table, tokens, column):
+        #----bm25 : plus petit = plus pertinent ; MATCH + rowid = ... est un acces direct dans l'index
+        return (
+            f"SELECT bm25({table}, %s, 1.0) FROM {table} WHERE {table} MATCH %s AND rowid = {column}",
+            [TITLE_WEIGHT, self._query(tokens)],
+        )
+
+    def _query(self, tokens):
+        return ' AND '.join(f'"{token}"*' for token in tokens)
+
+
+class PostgresBackend:
+    #-----Le texte est deja replie en Python : la configuration 'simple' suffit (pas d'extension unaccent)
+    def create(self, cursor, table):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            f"object_id bigint PRIMARY KEY, document tsvector NOT NULL)"
+        )
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {table}_gin ON {table} USING GIN (document)")
+
+    def drop(self, cursor, table):
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+    def upsert(self, cursor, table, rows):
+        cursor.executemany(
+            f"INSERT INTO {table} (object_id, document) VALUES (%s, "
+            f"setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B')) "
+            f"ON CONFLICT (object_id) DO UPDATE SET document = EXCLUDED.document",
+            rows,
+        )
+
+    def delete(self, cursor, table, pks):
+        cursor.execute(f"DELETE FROM {table} WHERE object_id = ANY(%s)", [list(pks)])
+
+    def match(self, table, tokens):
+        return f"SELECT object_id FROM {table} WHERE document @@ to_tsquery('simple', %s)", [self._query(tokens)]
+
+    def rank(self, table, tokens, column):
+        #----Rang negatif : tri croissant comme bm25
+        return (
+            f"SELECT -ts_rank(document, to_tsquery('simple', %s)) FROM {table} WHERE object_id = {column}",
+            [self._query(tokens)],
+        )
+
+    def _query(self, tokens):
+        return ' & '.join(f'{token}:*' for token in tokens)
+
+
+BACKENDS = {
+    'sqlite': SqliteBackend(),
+    'postgresql': PostgresBackend(),
+}
+
+
+def get_backend(connection=None):
+    #----None si le SGBD n'a pas de moteur plein texte supporte (repli sur SearchFilter)
+    return BACKENDS.get((connection or default_connection).vendor)
+
+
+def _index_for(model):
+    return INDEXES.get(model._meta.label_lower)
+
+
+def create_indexes(connection=None):
+    connection = connection or default_connection
+    backend = get_backend(connection)
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        for table, _, _ in INDEXES.values():
+            backend.create(cursor, table)
+
+
+def drop_indexes(connection=None):
+    connection = connection or default_connection
+    backend = get_backend(connection)
+    if backend is None:
+        return
+    with connection.cursor() as cursor:
+        for table, _, _ in INDEXES.values():
+            backend.drop(cursor, table)
+
+
+def index_objects(model, objects, connection=None):
+    #----Indexe (ou reindexe) une liste d'annonces d'un meme modele
+    connection = connection or default_connection
+    backend = get_backend(connection)
+    index = _index_for(model)
+    if backend is None or index is None:
+        return
+    table, document, _ = index
+    rows = []
+    for obj in objects:
+        title, body = document(obj)
+        rows.append((obj.pk, fold(title), fold(body)))
+    if rows:
+        with connection.cursor() as cursor:
+            backend.upsert(cursor, table, rows)
+
+
+def unindex_objects(model, pks, connection=None):
+    connection = connection or default_connection
+    backend = get_backend(connection)
+    index = _index_for(model)
+    pks = list(pks)
+    if backend is None or index is None or not pks:
+        return
+    with connection.cursor() as cursor:
+        backend.delete(cursor, index[0], pks)
+
+
+def rebuild(model, connection=None, chunk_size=1000):
+    #----Reconstruit tout l'index d'un modele (migration, commande rebuild_search_index)
+    connection = connection or default_connection
+    backend = get_backend(connection)
+    index = _index_for(model)
+    if backend is None or index is None:
+        return 0
+    table, _, related = index
+    with connection.cursor() as cursor:
+        backend.drop(cursor, table)
+        backend.create(cursor, table)
+
+    total = 0
+    chunk = []
+    for obj in model._default_manager.select_related(*related).order_by('pk').iterator(chunk_size=chunk_size):
+        chunk.append(obj)
+        if len(chunk) >= chunk_size:
+            index_objects(model, chunk, connection)
+            total += len(chunk)
+            chunk = []
+    index_objects(model, chunk, connection)
+    return total + len(chunk)
+
+
+def search_expressions(model, query, connection=None):
+    """
+    Recherche sous forme d'expressions SQL, à combiner avec les autres filtres de
+    la liste : (sous-requête des ids correspondants, rang de pertinence de la
+    ligne courante — plus petit = plus pertinent).
+    Aucune limite : le rang n'est calculé que pour les lignes retenues par les filtres.
+    None si aucun moteur n'est disponible pour ce SGBD ou si la recherche est vide.
+    """
+    connection = connection or default_connection
+    backend = get_backend(connection)
+    index = _index_for(model)
+    if backend is None or index is None:
+        return None
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    table = index[0]
+    quote = connection.ops.quote_name
+    column = f"{quote(model._meta.db_table)}.{quote(model._meta.pk.column)}"
+    return RawSQL(*backend.match(table, tokens)), RawSQL(*backend.rank(table, tokens, column), output_field=FloatField())
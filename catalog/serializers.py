@@ -42,9 +42,8 @@ class VehicleListSerializer(serializers.ModelSerializer):
         )
 
     def get_cover_photo(self, obj):
-        cover = obj.media.filter(is_cover=True, media_type='photo').first()
-        if not cover:
-            cover = obj.media.filter(media_type='photo').first()
+        #---cover_media est denormalise sur le vehicule : aucune requete par ligne
+        cover = obj.cover_media
         if cover:
             request = self.context.get('request')
             return request.build_absolute_uri(cover.file.url) if request else cover.file.url
@@ -93,9 +92,7 @@ class SparePartListSerializer(serializers.ModelSerializer):
         )
 
     def get_cover_photo(self, obj):
-        cover = obj.media.filter(is_cover=True).first()
-        if not cover:
-            cover = obj.media.first()
+        cover = obj.cover_media
         if cover:
             request = self.context.get('request')
             return request.build_absolute_uri(cover.file.url) if request else cover.file.url
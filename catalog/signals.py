@@ -0,0 +1,78 @@
+from django.db import transaction
+from django.utils import timezone
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from . import search
+from .cache import bump_version
+from .models import Brand, VehicleModel, Vehicle, VehicleMedia, SparePart, SparePartMedia
+
+
+#-----Photo principale : recalculee a chaque ajout, suppression ou changement de is_cover d'un media
+
+@receiver([post_save, post_delete], sender=VehicleMedia)
+def refresh_vehicle_cover(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    Vehicle(pk=instance.vehicle_id).refresh_cover_media()
+
+
+@receiver([post_save, post_delete], sender=SparePartMedia)
+def refresh_part_cover(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    SparePart(pk=instance.part_id).refresh_cover_media()
+
+
+#-----Index plein texte (catalog.search) : mis a jour a chaque enregistrement / suppression
+
+@receiver(post_save, sender=Vehicle)
+@receiver(post_save, sender=SparePart)
+def index_listing(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_objects(sender, [instance])
+
+
+@receiver(post_delete, sender=Vehicle)
+@receiver(post_delete, sender=SparePart)
+def unindex_listing(sender, instance, **kwargs):
+    search.unindex_objects(sender, [instance.pk])
+
+
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender=VehicleModel)
+def reindex_vehicles_of(sender, instance, created=False, raw=False, **kwargs):
+    #----Le nom de la marque / du modele fait partie du texte indexe des vehicules
+    if raw or created:
+        return
+    lookup = 'brand' if sender is Brand else 'model'
+    vehicles = Vehicle.objects.filter(**{lookup: instance}).select_related('brand', 'model')
+    search.index_objects(Vehicle, vehicles)
+
+
+@receiver(m2m_changed, sender=SparePart.compatible_brands.through)
+@receiver(m2m_changed, sender=SparePart.compatible_models.through)
+def touch_part_compatibility(sender, instance, action, reverse, pk_set, **kwargs):
+    #----La compatibilite fait partie de la fiche piece : updated_at avance (ETag de la fiche)
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        SparePart.objects.filter(pk=instance.pk).update(updated_at=timezone.now())
+    elif pk_set:
+        SparePart.objects.filter(pk__in=pk_set).update(updated_at=timezone.now())
+
+
+#-----Cache des reponses (catalog.cache) : toute ecriture invalide via la version du catalogue
+
+@receiver([post_save, post_delete], sender=Vehicle)
+@receiver([post_save, post_delete], sender=VehicleMedia)
+@receiver([post_save, post_delete], sender=SparePart)
+@receiver([post_save, post_delete], sender=SparePartMedia)
+@receiver([post_save, post_delete], sender=Brand)
+@receiver([post_save, post_delete], sender=VehicleModel)
+@receiver(m2m_changed, sender=SparePart.compatible_brands.through)
+@receiver(m2m_changed, sender=SparePart.compatible_models.through)
+def invalidate_catalog_cache(sender, **kwargs):
+    #----Apres le commit : une requete concurrente ne peut pas remettre en cache l'ancien etat
+    transaction.on_commit(bump_version)
@@ -0,0 +1,31 @@
+"""
+Reservation du stock des pieces detachees.
+
+Une seule requete UPDATE conditionnelle par reservation :
+    stock_quantity = stock_quantity - n, status = 'out_of_stock' si on tombe a 0
+    WHERE id = ... AND stock_quantity >= n
+La base serialise les ecritures concurrentes sur la ligne : deux commandes ne
+peuvent pas prendre la meme derniere unite, sans verrou applicatif ni relecture.
+"""
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .cache import bump_version
+from .models import SparePart
+
+
+def reserve(part_id, quantity):
+    #----True si le stock a ete decremente, False si le stock restant est insuffisant
+    updated = SparePart.objects.filter(pk=part_id, stock_quantity__gte=quantity).update(
+        stock_quantity=F('stock_quantity') - quantity,
+        status=Case(
+            When(stock_quantity=quantity, then=Value('out_of_stock')),
+            default=F('status'),
+        ),
+        updated_at=timezone.now(),
+    )
+    if updated:
+        #----update() ne declenche pas post_save : invalidation du cache catalogue a la main
+        transaction.on_commit(bump_version)
+    return bool(updated)
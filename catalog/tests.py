@@ -1,3 +1,95 @@
+import re
+from unittest import skipUnless
+
+from django.db import connection
 from django.test import TestCase
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from .models import Brand, Vehicle, VehicleModel
+from .views import VehicleListView
+
+
+@skipUnless(connection.vendor == 'sqlite', "Plans d'execution lus au format EXPLAIN QUERY PLAN de SQLite")
+class VehicleListQueryPlanTests(TestCase):
+    """
+    Garde-fou des index composites vehicle_list_*_idx : la requete de la liste
+    (filtres + tri de la vue) doit chercher dans un de ces index, jamais parcourir
+    toute la table catalog_vehicle.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        brand = Brand.objects.create(name='Toyota')
+        model = VehicleModel.objects.create(brand=brand, name='Corolla')
+        for i in range(20):
+            Vehicle.objects.create(
+                title=f'Corolla {i}', vehicle_type='car', listing_type='sale', brand=brand, model=model,
+                year=2010 + i % 10, fuel='petrol', transmission='manual', condition='used',
+                price=1000000 * (i + 1), city='Lomé', country='Togo', description='Occasion',
+            )
+        cls.brand = brand
+
+    def vehicle_plan(self, params):
+        view = VehicleListView()
+        view.request = Request(APIRequestFactory().get('/api/catalog/vehicles/', params))
+        view.format_kwarg = None
+        view.args, view.kwargs = (), {}
+        plan = view.filter_queryset(view.get_queryset()).explain()
+        return [line for line in plan.splitlines() if re.search(r'\bcatalog_vehicle\b', line)]
+
+    def assertUsesListIndex(self, params, index=r'vehicle_list_\w+_idx'):
+        lines = self.vehicle_plan(params)
+        self.assertTrue(lines, lines)
+        for line in lines:
+            self.assertNotIn('SCAN catalog_vehicle', line)
+            self.assertRegex(line, rf'SEARCH catalog_vehicle USING (COVERING )?INDEX {index}')
+
+    def test_default_ordering(self):
+        self.assertUsesListIndex({}, 'vehicle_list_default_idx')
+
+    def test_brand_filter(self):
+        self.assertUsesListIndex({'brand': self.brand.pk})
+
+    def test_brand_and_model_filter(self):
+        self.assertUsesListIndex({'brand': self.brand.pk, 'model': self.brand.models.get().pk})
+
+    def test_price_filter(self):
+        self.assertUsesListIndex({'min_price': 2000000, 'max_price': 5000000}, 'vehicle_list_price_idx')
+
+    def test_price_ordering(self):
+        self.assertUsesListIndex({'ordering': 'price'}, 'vehicle_list_price_idx')
+
+
+class KeysetSearchTests(TestCase):
+    """
+    ?search= + ?pagination=cursor : les pages suivent le rang de pertinence,
+    comme la pagination numérotée.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        brand = Brand.objects.create(name='Toyota')
+        model = VehicleModel.objects.create(brand=brand, name='Corolla')
+        for i in range(30):
+            #----Le mot cherche repete de 1 a 5 fois dans le titre : cinq niveaux de pertinence
+            Vehicle.objects.create(
+                title=' '.join(['hybride'] * (1 + i % 5) + [f'Auto {i}']), vehicle_type='car', listing_type='sale',
+                brand=brand, model=model, year=2018, fuel='petrol', transmission='manual', condition='used',
+                price=1000000 + i, city='Lomé', country='Togo', description='Occasion',
+            )
+
+    def ids(self, url):
+        return [row['id'] for row in self.client.get(url).json()['results']]
+
+    def test_cursor_pages_follow_relevance(self):
+        client = APIClient()
+        numbered = self.ids('/api/catalog/vehicles/?search=hybride&page=1') + self.ids('/api/catalog/vehicles/?search=hybride&page=2')
+
+        first = client.get('/api/catalog/vehicles/?search=hybride&pagination=cursor').json()
+        second = client.get(first['next']).json()
+        previous = client.get(second['previous']).json()
 
-# Create your tests here.
+        self.assertEqual(len(numbered), 30)
+        self.assertEqual([row['id'] for row in first['results'] + second['results']], numbered)
+        self.assertEqual(previous['results'], first['results'])
@@ -0,0 +1,18 @@
+import re
+import unicodedata
+
+_TOKEN_RE = re.compile(r'[^\W_]+')
+
+
+def fold(value):
+    #----"Électrique  Modèle" -> "electrique modele" : minuscules, sans accents, espaces normalises
+    if not value:
+        return ''
+    value = unicodedata.normalize('NFKD', str(value))
+    value = ''.join(c for c in value if not unicodedata.combining(c))
+    return ' '.join(value.casefold().split())
+
+
+def tokenize(value):
+    #----Mots (lettres/chiffres) du texte replie, sans ponctuation
+    return _TOKEN_RE.findall(fold(value))
@@ -1,14 +1,19 @@
 from django.urls import path
 from .views import (
     BrandListView,
-    VehicleListView, VehicleDetailView,
-    SparePartListView, SparePartDetailView
+    VehicleListView, VehicleFacetView, VehicleDetailView, VehicleAvailabilityView,
+    SparePartListView, SparePartDetailView,
+    CatalogCacheStatsView, CatalogImportView
 )
 
 urlpatterns = [
     path('brands/', BrandListView.as_view(), name='brands'),
     path('vehicles/', VehicleListView.as_view(), name='vehicles'),
+    path('vehicles/facets/', VehicleFacetView.as_view(), name='vehicle_facets'),
     path('vehicles/<int:pk>/', VehicleDetailView.as_view(), name='vehicle_detail'),
+    path('vehicles/<int:pk>/availability/', VehicleAvailabilityView.as_view(), name='vehicle_availability'),
     path('parts/', SparePartListView.as_view(), name='parts'),
     path('parts/<int:pk>/', SparePartDetailView.as_view(), name='part_detail'),
+    path('cache/stats/', CatalogCacheStatsView.as_view(), name='catalog_cache_stats'),
+    path('import/', CatalogImportView.as_view(), name='catalog_import'),
 ]
\ No newline at end of file
@@ -1,5 +1,24 @@
+import io
+from datetime import timedelta
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import generics, permissions, filters
-from .models import Brand, VehicleModel, Vehicle, SparePart
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from orders.availability import filter_available, free_ranges
+from . import importer
+from .cache import CachedResponseMixin, get_stats
+from .conditional import DetailConditionalMixin, ListConditionalMixin
+from .facets import IGNORED_PARAMS, compute_vehicle_facets
+from .filters import CatalogSearchFilter
+from .params import date_param
+from .models import Brand, VehicleModel, Vehicle, VehicleMedia, SparePart, SparePartMedia
+from .pagination import CatalogPagination
+from .text import fold
 from .serializers import (
     BrandSerializer,
     VehicleListSerializer, VehicleDetailSerializer,
@@ -7,24 +26,19 @@ from .serializers import (
 )
 
 
-class BrandListView(generics.ListAPIView):
+class BrandListView(CachedResponseMixin, generics.ListAPIView):
     #----GET /api/v1/catalog/brands/ — Liste des marques
     queryset = Brand.objects.all()
     serializer_class = BrandSerializer
     permission_classes = [permissions.AllowAny]
 
 
-class VehicleListView(generics.ListAPIView):
-    #-----GET /api/v1/catalog/vehicles/
-    serializer_class = VehicleListSerializer
-    permission_classes = [permissions.AllowAny]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+class VehicleFilterMixin:
+    #-----Filtres communs a la liste des vehicules et a ses facettes
     search_fields = ['title', 'brand__name', 'model__name', 'description']
-    ordering_fields = ['price', 'created_at', 'year', 'mileage']
-    ordering = ['-is_featured', '-created_at']
 
     def get_queryset(self):
-        qs = Vehicle.objects.filter(status='available').select_related('brand', 'model')
+        qs = Vehicle.objects.filter(status='available').select_related('brand', 'model', 'cover_media')
         params = self.request.query_params
 
         #-----Filtres
@@ -53,34 +67,94 @@ class VehicleListView(generics.ListAPIView):
         if origin := params.get('origin'):
             qs = qs.filter(origin=origin)
         if country := params.get('country'):
-            qs = qs.filter(country__icontains=country)
+            qs = qs.filter(country_key=fold(country))
         if city := params.get('city'):
-            qs = qs.filter(city__icontains=city)
+            qs = qs.filter(city_key=fold(city))
         if featured := params.get('featured'):
             qs = qs.filter(is_featured=True)
 
+        #-----Disponibilite a la location sur la periode demandee (orders.availability)
+        if params.get('available_from') or params.get('available_to'):
+            start = date_param(params, 'available_from', timezone.now().date())
+            end = date_param(params, 'available_to', start + timedelta(days=1))
+            if end <= start:
+                raise ValidationError({"available_to": "La date de fin doit être après la date de début."})
+            qs = filter_available(qs.filter(listing_type='rental'), start, end)
+
         return qs
 
 
-class VehicleDetailView(generics.RetrieveAPIView):
+class VehicleListView(ListConditionalMixin, CachedResponseMixin, VehicleFilterMixin, generics.ListAPIView):
+    #-----GET /api/v1/catalog/vehicles/  (?pagination=cursor pour le scroll infini)
+    serializer_class = VehicleListSerializer
+    permission_classes = [permissions.AllowAny]
+    pagination_class = CatalogPagination
+    filter_backends = [filters.OrderingFilter, CatalogSearchFilter]
+    ordering_fields = ['price', 'created_at', 'year', 'mileage']
+    ordering = ['-is_featured', '-created_at']
+
+
+class VehicleFacetView(CachedResponseMixin, VehicleFilterMixin, generics.ListAPIView):
+    #-----GET /api/v1/catalog/vehicles/facets/ — Nombre de resultats par valeur de filtre
+    #-----Memes parametres que la liste ; reponse mise en cache par ensemble de filtres normalise
+    permission_classes = [permissions.AllowAny]
+    filter_backends = [CatalogSearchFilter]
+    pagination_class = None
+    cache_ignored_params = IGNORED_PARAMS
+
+    def list(self, request, *args, **kwargs):
+        return Response(compute_vehicle_facets(self.filter_queryset(self.get_queryset())))
+
+
+class VehicleDetailView(DetailConditionalMixin, CachedResponseMixin, generics.RetrieveAPIView):
     #------GET /api/v1/catalog/vehicles/<id>/ — Fiche detail véhicule
     queryset = Vehicle.objects.select_related('brand', 'model').prefetch_related('media')
     serializer_class = VehicleDetailSerializer
     permission_classes = [permissions.AllowAny]
+    media_model = VehicleMedia
+    media_lookup = 'vehicle_id'
 
 
-class SparePartListView(generics.ListAPIView):
-
-    #----GET /api/v1/catalog/parts/
+class VehicleAvailabilityView(APIView):
+    #------GET /api/v1/catalog/vehicles/<id>/availability/?from=&to= — Plages libres d'un véhicule de location
+    permission_classes = [permissions.AllowAny]
+    default_days = 90
+    max_days = 366
+
+    def get(self, request, pk, *args, **kwargs):
+        vehicle = get_object_or_404(Vehicle, pk=pk, listing_type='rental')
+        params = request.query_params
+        start = date_param(params, 'from', timezone.now().date())
+        end = date_param(params, 'to', start + timedelta(days=self.default_days))
+        if end <= start:
+            raise ValidationError({"to": "La date de fin doit être après la date de début."})
+        if (end - start).days > self.max_days:
+            raise ValidationError({"to": f"La période ne peut pas dépasser {self.max_days} jours."})
+
+        return Response({
+            'vehicle': vehicle.pk,
+            'from': start,
+            'to': end,
+            'free': [
+                {'start': free_start, 'end': free_end}
+                for free_start, free_end in free_ranges(vehicle.pk, start, end)
+            ],
+        })
+
+
+class SparePartListView(ListConditionalMixin, CachedResponseMixin, generics.ListAPIView):
+
+    #----GET /api/v1/catalog/parts/  (?pagination=cursor pour le scroll infini)
     serializer_class = SparePartListSerializer
     permission_classes = [permissions.AllowAny]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = CatalogPagination
+    filter_backends = [filters.OrderingFilter, CatalogSearchFilter]
     search_fields = ['title', 'reference', 'description']
     ordering_fields = ['price', 'created_at']
     ordering = ['-is_featured', '-created_at']
 
     def get_queryset(self):
-        qs = SparePart.objects.prefetch_related('compatible_brands', 'media')
+        qs = SparePart.objects.select_related('cover_media').prefetch_related('compatible_brands')
         params = self.request.query_params
 
         if condition := params.get('condition'):
@@ -99,8 +173,53 @@ class SparePartListView(generics.ListAPIView):
         return qs
 
 
-class SparePartDetailView(generics.RetrieveAPIView):
+class SparePartDetailView(DetailConditionalMixin, CachedResponseMixin, generics.RetrieveAPIView):
     #---GET /api/v1/catalog/parts/<id>/ — Fiche détail piece
     queryset = SparePart.objects.prefetch_related('compatible_brands', 'compatible_models', 'media')
     serializer_class = SparePartDetailSerializer
-    permission_classes = [permissions.AllowAny]
\ No newline at end of file
+    permission_classes = [permissions.AllowAny]
+    media_model = SparePartMedia
+    media_lookup = 'part_id'
+
+
+class CatalogCacheStatsView(APIView):
+    #---GET /api/v1/catalog/cache/stats/ — Compteurs hit/miss du cache catalogue (admin)
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(get_stats())
+
+
+class CatalogImportView(APIView):
+    """
+    POST /api/v1/catalog/import/ — Import en masse (admin), multipart :
+    file = fichier CSV / JSONL, kind = vehicles | parts, format (optionnel, sinon l'extension).
+    Les médias cités sont lus dans settings.CATALOG_IMPORT_MEDIA_DIR.
+    Les lignes invalides sont rapportées sans interrompre l'import.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise ValidationError({'file': "Fichier requis."})
+        kind = request.data.get('kind')
+        if kind not in importer.IMPORTERS:
+            raise ValidationError({'kind': f"Valeurs possibles : {', '.join(importer.IMPORTERS)}."})
+        fmt = request.data.get('format') or importer.detect_format(upload.name)
+        if fmt not in ('csv', 'jsonl'):
+            raise ValidationError({'format': "Format attendu : csv ou jsonl."})
+
+        #----Lecture en flux du fichier televerse ; utf-8-sig absorbe le BOM des exports Excel
+        stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            report = importer.import_catalog(
+                kind, stream, fmt,
+                media_dir=settings.CATALOG_IMPORT_MEDIA_DIR or None,
+            )
+        except UnicodeDecodeError:
+            raise ValidationError({'file': "Encodage attendu : UTF-8."})
+        finally:
+            stream.detach()
+        return Response(report.as_dict())
@@ -39,6 +39,39 @@ STRIPE_PUBLIC_KEY = os.getenv('STRIPE_PUBLIC_KEY', '')
 STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY', '')
 STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET', '')
 
+# ─── MOBILE MONEY (TMoney / Flooz) ───────────────────────────────────────────
+# Passerelles opérateur appelées en arrière-plan (payments.operators)
+MOBILE_MONEY_OPERATORS = {
+    'tmoney': {
+        'url': os.getenv('TMONEY_API_URL', ''),
+        'api_key': os.getenv('TMONEY_API_KEY', ''),
+        'connect_timeout': float(os.getenv('TMONEY_CONNECT_TIMEOUT', 3)),
+        'read_timeout': float(os.getenv('TMONEY_READ_TIMEOUT', 15)),
+    },
+    'flooz': {
+        'url': os.getenv('FLOOZ_API_URL', ''),
+        'api_key': os.getenv('FLOOZ_API_KEY', ''),
+        'connect_timeout': float(os.getenv('FLOOZ_CONNECT_TIMEOUT', 3)),
+        'read_timeout': float(os.getenv('FLOOZ_READ_TIMEOUT', 15)),
+    },
+}
+MOBILE_MONEY_WORKERS = int(os.getenv('MOBILE_MONEY_WORKERS', 8))
+
+# ─── FICHES PDF TRANSPORT ────────────────────────────────────────────────────
+# Rendu en arrière-plan à chaque nouvelle étape de suivi (logistics.pdf)
+TRANSPORT_PDF_WORKERS = int(os.getenv('TRANSPORT_PDF_WORKERS', 2))
+
+# ─── CACHE CATALOGUE ─────────────────────────────────────────────────────────
+# 'file' : partagé entre workers — 'locmem' : mémoire du processus, par défaut seulement en DEBUG.
+# La version du catalogue vit dans ce cache : en locmem, un incrément (admin, stock) reste invisible
+# aux autres workers, qui servent l'ancienne version (304, pages en cache) jusqu'à expiration.
+CATALOG_CACHE_BACKEND = os.getenv('CATALOG_CACHE_BACKEND', 'locmem' if DEBUG else 'file')
+CATALOG_CACHE_TIMEOUT = int(os.getenv('CATALOG_CACHE_TIMEOUT', 600))
+
+# ─── IMPORT CATALOGUE ────────────────────────────────────────────────────────
+# Dossier serveur où l'API d'import (catalog.importer) va chercher les médias cités dans le fichier
+CATALOG_IMPORT_MEDIA_DIR = os.getenv('CATALOG_IMPORT_MEDIA_DIR', '')
+
 
 # Application definition
 
@@ -59,6 +92,8 @@ INSTALLED_APPS = [
     "orders",
     "payments",
     "logistics",
+    "workflow",
+    "reporting",
 
 
     'drf_spectacular',
@@ -106,12 +141,37 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # Attente du verrou d'écriture (s) avant "database is locked" quand plusieurs requêtes écrivent en même temps
+        "OPTIONS": {"timeout": 20},
+        # Base de test sur fichier (et non en mémoire) : les tests de concurrence y accèdent depuis plusieurs threads / processus
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
 AUTH_USER_MODEL = 'accounts.User'
 
 
+CATALOG_CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'catalog',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv('CATALOG_CACHE_DIR', str(BASE_DIR / 'cache' / 'catalog')),
+        'OPTIONS': {'MAX_ENTRIES': 20000},
+    },
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': CATALOG_CACHE_BACKENDS[CATALOG_CACHE_BACKEND],
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -20,6 +20,7 @@ urlpatterns = [
     path('api/orders/', include('orders.urls')),
     path('api/payments/', include('payments.urls')),
     path('api/logistics/', include('logistics.urls')),
+    path('api/reporting/', include('reporting.urls')),
 
 
     #-----les documentations
@@ -1,6 +1,10 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.utils import timezone
+from workflow.admin import TransitionAdminMixin
+
+from . import tracking
+from .states import TRANSPORT_MACHINE
 from .models import TransportZone, Transporter, TransportRequest, TransportStep
 
 
@@ -73,8 +77,9 @@ class TransportStepInline(admin.TabularInline):
 
 
 @admin.register(TransportRequest)
-class TransportRequestAdmin(admin.ModelAdmin):
+class TransportRequestAdmin(TransitionAdminMixin, admin.ModelAdmin):
     inlines = [TransportStepInline]
+    state_machine = TRANSPORT_MACHINE
 
     # list_display = (
     #     'id', 'vehicle', 'client_name',
@@ -199,19 +204,12 @@ class TransportRequestAdmin(admin.ModelAdmin):
     status_badge.short_description = "Statut"
 
     # ── Actions ───────────────────────────────────────────────────────────────
+    def transition(self, queryset, status, actor):
+        #----Etapes de suivi creees avec le changement de statut
+        return tracking.transition(queryset, status, actor=actor)
+
     def _change_status(self, request, queryset, new_status, message):
-        labels = dict(TransportRequest.STATUS_CHOICES)
-        for obj in queryset:
-            old = obj.status
-            if old != new_status:
-                obj.status = new_status
-                obj.save()
-                TransportStep.objects.create(
-                    request=obj,
-                    status=new_status,
-                    title=labels.get(new_status, new_status),
-                )
-        self.message_user(request, f"{queryset.count()} demande(s) : {message}")
+        self.apply_transition(request, queryset, new_status, f"{{count}} demande(s) : {message}")
 
     @admin.action(description="📧 Devis envoyé au client")
     def action_send_quote(self, request, queryset):
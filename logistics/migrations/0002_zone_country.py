@@ -0,0 +1,49 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from catalog.text import fold
+
+
+def backfill_zone_countries(apps, schema_editor):
+    TransportZone = apps.get_model('logistics', 'TransportZone')
+    ZoneCountry = apps.get_model('logistics', 'ZoneCountry')
+    entries = {}
+    #----Meme priorite que l'ancienne detection : premiere zone active par nom
+    for zone in TransportZone.objects.order_by('-is_active', 'name'):
+        for line in zone.countries.splitlines():
+            names = [name.strip() for name in line.split('|') if name.strip()]
+            for name in names:
+                entries.setdefault(fold(name), ZoneCountry(zone=zone, country_key=fold(name), name=names[0]))
+    ZoneCountry.objects.bulk_create(entries.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logistics', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='transportzone',
+            name='countries',
+            field=models.TextField(help_text='Ex: France\nAllemagne | Deutschland | Germany\nBelgique — variantes séparées par |', verbose_name='Pays inclus (un par ligne)'),
+        ),
+        migrations.CreateModel(
+            name='ZoneCountry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('country_key', models.CharField(max_length=100, unique=True, verbose_name='Clé pays (normalisée)')),
+                ('name', models.CharField(max_length=100, verbose_name='Pays')),
+                ('zone', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='country_entries', to='logistics.transportzone', verbose_name='Zone tarifaire')),
+            ],
+            options={
+                'verbose_name': 'Pays de zone',
+                'verbose_name_plural': 'Pays de zone',
+                'ordering': ['country_key'],
+            },
+        ),
+        migrations.RunPython(backfill_zone_countries, migrations.RunPython.noop),
+    ]
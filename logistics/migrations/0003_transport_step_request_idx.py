@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logistics', '0002_zone_country'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transportstep',
+            index=models.Index(fields=['request', 'reached_at'], name='transport_step_request_idx'),
+        ),
+    ]
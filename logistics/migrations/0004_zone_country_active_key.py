@@ -0,0 +1,47 @@
+# Generated by Django 4.2.16 on 2026-10-17 22:05
+
+from django.db import migrations, models
+
+from catalog.text import fold
+
+
+def backfill_zone_active(apps, schema_editor):
+    TransportZone = apps.get_model('logistics', 'TransportZone')
+    ZoneCountry = apps.get_model('logistics', 'ZoneCountry')
+    ZoneCountry.objects.filter(zone__is_active=False).update(zone_active=False)
+    #----Les zones inactives recuperent les pays ecartes par l'ancien index unique global
+    entries = []
+    for zone in TransportZone.objects.filter(is_active=False):
+        held = set(ZoneCountry.objects.filter(zone=zone).values_list('country_key', flat=True))
+        for line in zone.countries.splitlines():
+            names = [name.strip() for name in line.split('|') if name.strip()]
+            for name in names:
+                if fold(name) not in held:
+                    held.add(fold(name))
+                    entries.append(ZoneCountry(zone=zone, zone_active=False, country_key=fold(name), name=names[0]))
+    ZoneCountry.objects.bulk_create(entries)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('logistics', '0003_transport_step_request_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='zonecountry',
+            name='zone_active',
+            field=models.BooleanField(default=True, verbose_name='Zone active'),
+        ),
+        migrations.AlterField(
+            model_name='zonecountry',
+            name='country_key',
+            field=models.CharField(db_index=True, max_length=100, verbose_name='Clé pays (normalisée)'),
+        ),
+        migrations.AddConstraint(
+            model_name='zonecountry',
+            constraint=models.UniqueConstraint(condition=models.Q(('zone_active', True)), fields=('country_key',), name='zone_country_active_key'),
+        ),
+        migrations.RunPython(backfill_zone_active, migrations.RunPython.noop),
+    ]
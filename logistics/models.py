@@ -1,5 +1,7 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from catalog.models import Vehicle
+from catalog.text import fold
 
 
 class TransportZone(models.Model):
@@ -10,7 +12,7 @@ class TransportZone(models.Model):
     name = models.CharField(max_length=100, verbose_name="Nom de la zone")
     countries = models.TextField(
         verbose_name="Pays inclus (un par ligne)",
-        help_text="Ex: France\nAllemagne\nBelgique"
+        help_text="Ex: France\nAllemagne | Deutschland | Germany\nBelgique — variantes séparées par |"
     )
     base_price = models.DecimalField(
         max_digits=12, decimal_places=2,
@@ -35,11 +37,75 @@ class TransportZone(models.Model):
         return f"{self.name} — {self.base_price:,.0f} FCFA"
 
     def get_countries_list(self):
-        return [c.strip() for c in self.countries.splitlines() if c.strip()]
+        #-----Nom principal de chaque pays (premiere variante de la ligne)
+        return [line.split('|')[0].strip() for line in self.countries.splitlines() if line.split('|')[0].strip()]
+
+    def get_country_keys(self):
+        #-----Toutes les variantes, repliees (minuscules, sans accents) : cle -> nom principal
+        keys = {}
+        for line in self.countries.splitlines():
+            names = [name.strip() for name in line.split('|') if name.strip()]
+            for name in names:
+                keys.setdefault(fold(name), names[0])
+        return keys
 
     def country_belongs(self, country_name):
-        country_lower = country_name.lower()
-        return any(c.lower() == country_lower for c in self.get_countries_list())
+        return fold(country_name) in self.get_country_keys()
+
+    def clean(self):
+        #-----Un pays ne peut appartenir qu'a une zone active ; une zone inactive garde sa liste sans bloquer
+        if not self.is_active:
+            return
+        taken = (
+            ZoneCountry.objects.filter(country_key__in=list(self.get_country_keys()), zone_active=True)
+            .exclude(zone_id=self.pk)
+            .select_related('zone')
+        )
+        conflicts = [f"{entry.name} ({entry.zone.name})" for entry in taken]
+        if conflicts:
+            raise ValidationError({'countries': f"Pays déjà rattachés à une autre zone : {', '.join(conflicts)}"})
+
+    def sync_countries(self):
+        #-----Reconstruit la table ZoneCountry de la zone a partir du texte saisi dans l'admin.
+        #-----Un pays deja tenu par une autre zone active leve IntegrityError (contrainte zone_country_active_key)
+        ZoneCountry.objects.filter(zone=self).delete()
+        ZoneCountry.objects.bulk_create([
+            ZoneCountry(zone=self, zone_active=self.is_active, country_key=key, name=name)
+            for key, name in self.get_country_keys().items()
+        ])
+
+
+class ZoneCountry(models.Model):
+    """
+    Pays (ou variante de nom) -> zone tarifaire. Tenue à jour depuis
+    TransportZone.countries à chaque enregistrement de la zone ; zone_active
+    recopie TransportZone.is_active pour la contrainte d'unicité.
+    """
+    zone = models.ForeignKey(
+        TransportZone,
+        on_delete=models.CASCADE,
+        related_name='country_entries',
+        verbose_name="Zone tarifaire"
+    )
+    zone_active = models.BooleanField(default=True, verbose_name="Zone active")
+    country_key = models.CharField(max_length=100, db_index=True, verbose_name="Clé pays (normalisée)")
+    name = models.CharField(max_length=100, verbose_name="Pays")
+
+    class Meta:
+        verbose_name = "Pays de zone"
+        verbose_name_plural = "Pays de zone"
+        ordering = ['country_key']
+        constraints = [
+            #-----Unicite limitee aux zones actives : une zone desactivee ne retient pas ses pays
+            models.UniqueConstraint(
+                fields=['country_key'],
+                condition=models.Q(zone_active=True),
+                name='zone_country_active_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} → {self.zone.name}"
 
 
 class Transporter(models.Model):
@@ -216,6 +282,10 @@ class TransportStep(models.Model):
         verbose_name = "Étape de transport"
         verbose_name_plural = "Étapes de transport"
         ordering = ['reached_at']
+        indexes = [
+            #----Suivi incremental : etapes d'une demande apres un curseur (?since=)
+            models.Index(fields=['request', 'reached_at'], name='transport_step_request_idx'),
+        ]
 
     def __str__(self):
         return f"Étape [{self.get_status_display()}] — Transport #{self.request_id}"
\ No newline at end of file
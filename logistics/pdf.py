@@ -0,0 +1,343 @@
+"""
+Fiche récapitulative PDF des demandes de transport.
+
+Le PDF rendu est conservé sur disque (MEDIA_ROOT/transport_pdfs/) sous la clé
+« id de la demande + empreinte du contenu » : champs affichés, véhicule, zone,
+transporteur et étapes de suivi. Tant que rien de tout cela ne change, les
+téléchargements suivants servent le fichier existant ; l'empreinte sert aussi
+d'ETag.
+
+Chaque nouvelle étape de suivi relance le rendu dans un pool de threads : le
+client qui télécharge ensuite sa fiche trouve en général le fichier déjà prêt.
+Un PDF absent est de toute façon rendu à la demande.
+"""
+import functools
+import glob
+import hashlib
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from .models import TransportRequest, TransportStep
+
+logger = logging.getLogger(__name__)
+
+PDF_DIR = 'transport_pdfs'
+
+#-----A incrementer a chaque modification de la mise en page : invalide tous les PDF deja rendus
+LAYOUT_VERSION = 1
+
+PLACEHOLDER_PDF = b"%PDF-1.4\n1 0 obj<</Type/Catalog/Pages 2 0 R>>endobj 2 0 obj<</Type/Pages/Kids[3 0 R]/Count 1>>endobj 3 0 obj<</Type/Page/MediaBox[0 0 595 842]/Parent 2 0 R/Resources<<>>>>endobj\nxref\n0 4\n0000000000 65535 f\n0000000009 00000 n\n0000000058 00000 n\n0000000115 00000 n\ntrailer<</Size 4/Root 1 0 R>>\nstartxref\n190\n%%EOF"
+
+
+# ─── Empreinte & fichiers ─────────────────────────────────────────────────────
+
+def load(pk):
+    return (
+        TransportRequest.objects
+        .select_related('zone', 'transporter', 'vehicle', 'vehicle__brand', 'vehicle__model')
+        .prefetch_related(Prefetch('steps', queryset=TransportStep.objects.order_by('reached_at', 'pk')))
+        .filter(pk=pk)
+        .first()
+    )
+
+
+def content_hash(transport):
+    """
+    Empreinte de tout ce qui est imprimé sur la fiche (hors date de génération).
+    `transport` doit venir de load() : véhicule, zone, transporteur et étapes déjà chargés.
+    """
+    vehicle = transport.vehicle
+    zone = transport.zone
+    parts = (
+        LAYOUT_VERSION,
+        transport.pk, transport.created_at.isoformat(), transport.status,
+        vehicle.title, vehicle.brand.name, vehicle.model.name, vehicle.year, vehicle.fuel, vehicle.transmission,
+        transport.vehicle_weight_kg,
+        transport.client_name, transport.client_email, transport.client_phone, transport.destination_city,
+        transport.origin_city, transport.origin_country,
+        (zone.name, zone.delay_days_min, zone.delay_days_max) if zone else None,
+        transport.estimated_cost, transport.final_cost, transport.advance_required, transport.advance_paid,
+        transport.transporter.name if transport.transporter else None,
+        transport.customs_note,
+        [(s.pk, s.status, s.description, s.location, s.reached_at.isoformat()) for s in transport.steps.all()],
+    )
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:32]
+
+
+def pdf_path(transport_id, digest):
+    return os.path.join(settings.MEDIA_ROOT, PDF_DIR, f'{transport_id}-{digest}.pdf')
+
+
+def _write(path, content):
+    #----Ecriture dans un fichier temporaire puis renommage : un lecteur ne voit jamais un PDF tronque
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _purge(transport_id, keep):
+    for path in glob.glob(pdf_path(transport_id, '*')):
+        if path != keep:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def get_or_render(transport, digest=None):
+    """
+    Chemin du PDF à jour de la demande, rendu s'il n'existe pas encore.
+    Chaque rendu supprime les versions précédentes de la fiche.
+    """
+    digest = digest or content_hash(transport)
+    path = pdf_path(transport.pk, digest)
+    if not os.path.exists(path):
+        content = render(transport)
+        if content is PLACEHOLDER_PDF:
+            return None
+        _write(path, content)
+        _purge(transport.pk, keep=path)
+    return path
+
+
+# ─── Rendu en arrière-plan ────────────────────────────────────────────────────
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.TRANSPORT_PDF_WORKERS,
+                thread_name_prefix='transport-pdf',
+            )
+        return _executor
+
+
+def schedule_render(*transport_ids):
+    #----Apres commit : le thread doit voir les nouvelles etapes en base
+    def submit():
+        for transport_id in transport_ids:
+            get_executor().submit(render_in_background, transport_id)
+    transaction.on_commit(submit)
+
+
+def render_in_background(transport_id):
+    """
+    Rend la fiche à jour et supprime les anciennes versions.
+    Exécuté dans le pool de threads : ne lève jamais d'exception.
+    """
+    close_old_connections()
+    try:
+        transport = load(transport_id)
+        if transport is not None:
+            get_or_render(transport)
+    except Exception:
+        logger.exception(f"Rendu PDF impossible pour la demande de transport #{transport_id}")
+    finally:
+        close_old_connections()
+
+
+# ─── Mise en page (ReportLab) ─────────────────────────────────────────────────
+
+@functools.lru_cache(maxsize=None)
+def _styles():
+    #----Construits une seule fois par processus
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER
+
+    styles = getSampleStyleSheet()
+    normal = styles['Normal']
+    return {
+        'title': ParagraphStyle('Title', parent=styles['Title'],
+                                fontSize=20, textColor=colors.HexColor('#1F4E79'),
+                                spaceAfter=6, alignment=TA_CENTER),
+        'subtitle': ParagraphStyle('Subtitle', parent=normal,
+                                   fontSize=11, textColor=colors.HexColor('#2E75B6'),
+                                   spaceAfter=4, alignment=TA_CENTER),
+        'section': ParagraphStyle('Section', parent=normal,
+                                  fontSize=12, textColor=colors.white,
+                                  backColor=colors.HexColor('#1F4E79'),
+                                  spaceAfter=2, spaceBefore=8,
+                                  leftIndent=6),
+        'warning': ParagraphStyle('Warning', parent=normal,
+                                  fontSize=9, textColor=colors.HexColor('#B45309'),
+                                  borderColor=colors.HexColor('#F59E0B'),
+                                  borderWidth=1, borderPadding=6,
+                                  backColor=colors.HexColor('#FFFBEB')),
+        'footer': ParagraphStyle('Footer', parent=normal, fontSize=8,
+                                 textColor=colors.gray, alignment=TA_CENTER),
+    }
+
+
+def render(transport):
+    """
+    Génère le PDF avec ReportLab.
+    Installe avec : pip install reportlab
+    """
+    try:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib import colors
+        from reportlab.lib.units import cm
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, HRFlowable
+
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=A4,
+                                topMargin=2*cm, bottomMargin=2*cm,
+                                leftMargin=2*cm, rightMargin=2*cm)
+
+        styles = _styles()
+        title_style = styles['title']
+        subtitle_style = styles['subtitle']
+        section_style = styles['section']
+
+        elements = []
+
+        # ── En-tête ───────────────────────────────────────────────────────
+        elements.append(Paragraph("FICHE RÉCAPITULATIVE DE TRANSPORT", title_style))
+        elements.append(Paragraph("Plateforme Véhicules & Pièces — Lomé, Togo", subtitle_style))
+        elements.append(Spacer(1, 0.3*cm))
+        elements.append(HRFlowable(width="100%", thickness=2, color=colors.HexColor('#1F4E79')))
+        elements.append(Spacer(1, 0.4*cm))
+
+        # ── Référence ─────────────────────────────────────────────────────
+        ref_data = [
+            ['Référence dossier', f'TRANSPORT-{transport.pk:04d}'],
+            ['Date de création', transport.created_at.strftime('%d/%m/%Y')],
+            ['Statut actuel', transport.get_status_display()],
+        ]
+        ref_table = Table(ref_data, colWidths=[5*cm, 13*cm])
+        ref_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#D5E8F0')),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#CCCCCC')),
+            ('PADDING', (0, 0), (-1, -1), 6),
+        ]))
+        elements.append(ref_table)
+        elements.append(Spacer(1, 0.5*cm))
+
+        # ── Véhicule ──────────────────────────────────────────────────────
+        elements.append(Paragraph("  VÉHICULE", section_style))
+        elements.append(Spacer(1, 0.2*cm))
+        v = transport.vehicle
+        vehicle_data = [
+            ['Titre', v.title],
+            ['Marque / Modèle', f"{v.brand.name} {v.model.name}"],
+            ['Année', str(v.year)],
+            ['Carburant', v.get_fuel_display()],
+            ['Transmission', v.get_transmission_display()],
+            ['Poids estimé', f"{transport.vehicle_weight_kg} kg" if transport.vehicle_weight_kg else "Non renseigné"],
+        ]
+        v_table = Table(vehicle_data, colWidths=[5*cm, 13*cm])
+        v_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#EEF4FF')),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#CCCCCC')),
+            ('PADDING', (0, 0), (-1, -1), 6),
+        ]))
+        elements.append(v_table)
+        elements.append(Spacer(1, 0.5*cm))
+
+        # ── Client ────────────────────────────────────────────────────────
+        elements.append(Paragraph("  CLIENT", section_style))
+        elements.append(Spacer(1, 0.2*cm))
+        client_data = [
+            ['Nom', transport.client_name],
+            ['Email', transport.client_email],
+            ['Téléphone', transport.client_phone or '—'],
+            ['Destination', transport.destination_city],
+        ]
+        c_table = Table(client_data, colWidths=[5*cm, 13*cm])
+        c_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#EEF4FF')),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#CCCCCC')),
+            ('PADDING', (0, 0), (-1, -1), 6),
+        ]))
+        elements.append(c_table)
+        elements.append(Spacer(1, 0.5*cm))
+
+        # ── Transport & Tarification ───────────────────────────────────────
+        elements.append(Paragraph("  TRANSPORT & TARIFICATION", section_style))
+        elements.append(Spacer(1, 0.2*cm))
+        cost_data = [
+            ['Pays d\'origine', f"{transport.origin_city or ''} {transport.origin_country}".strip()],
+            ['Zone tarifaire', transport.zone.name if transport.zone else '—'],
+            ['Délai estimé', f"{transport.zone.delay_days_min}–{transport.zone.delay_days_max} jours" if transport.zone else '—'],
+            ['Coût estimé', f"{transport.estimated_cost:,.0f} FCFA" if transport.estimated_cost else '—'],
+            ['Coût final', f"{transport.final_cost:,.0f} FCFA" if transport.final_cost else 'À confirmer'],
+            ['Avance requise (30%)', f"{transport.advance_required:,.0f} FCFA" if transport.advance_required else '—'],
+            ['Avance payée', f"{transport.advance_paid:,.0f} FCFA"],
+            ['Transporteur', transport.transporter.name if transport.transporter else 'À assigner'],
+        ]
+        cost_table = Table(cost_data, colWidths=[5*cm, 13*cm])
+        cost_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#EEF4FF')),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#CCCCCC')),
+            ('PADDING', (0, 0), (-1, -1), 6),
+            ('BACKGROUND', (0, 4), (-1, 4), colors.HexColor('#D5F0D5')),  # Coût final en vert
+        ]))
+        elements.append(cost_table)
+        elements.append(Spacer(1, 0.5*cm))
+
+        # ── Étapes de suivi ───────────────────────────────────────────────
+        steps = transport.steps.all()
+        if steps:
+            elements.append(Paragraph("  SUIVI DU TRANSPORT", section_style))
+            elements.append(Spacer(1, 0.2*cm))
+            step_data = [['Date', 'Statut', 'Détails', 'Lieu']]
+            for step in steps:
+                step_data.append([
+                    step.reached_at.strftime('%d/%m/%Y %H:%M'),
+                    step.get_status_display(),
+                    step.description or '—',
+                    step.location or '—',
+                ])
+            step_table = Table(step_data, colWidths=[3.5*cm, 4*cm, 7*cm, 3.5*cm])
+            step_table.setStyle(TableStyle([
+                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E75B6')),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 9),
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#CCCCCC')),
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#F5F9FF')]),
+                ('PADDING', (0, 0), (-1, -1), 5),
+            ]))
+            elements.append(step_table)
+            elements.append(Spacer(1, 0.5*cm))
+
+        # ── Mention dédouanement ──────────────────────────────────────────
+        elements.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor('#CCCCCC')))
+        elements.append(Spacer(1, 0.3*cm))
+        elements.append(Paragraph(f"⚠️  {transport.customs_note}", styles['warning']))
+        elements.append(Spacer(1, 0.3*cm))
+        elements.append(Paragraph(
+            f"Document généré le {timezone.now().strftime('%d/%m/%Y à %H:%M')} — Plateforme Véhicules & Pièces",
+            styles['footer'],
+        ))
+
+        doc.build(elements)
+        return buffer.getvalue()
+
+    except ImportError:
+        # ReportLab non installé — retourner un PDF minimal d'erreur
+        return PLACEHOLDER_PDF
@@ -1,5 +1,9 @@
+from decimal import Decimal
+
 from rest_framework import serializers
+from catalog.models import Vehicle
 from .models import TransportZone, Transporter, TransportRequest, TransportStep
+from .zones import find_zone, quote
 
 
 class TransportZoneSerializer(serializers.ModelSerializer):
@@ -67,7 +71,7 @@ class TransportRequestCreateSerializer(serializers.ModelSerializer):
         origin_country = validated_data.get('origin_country', '')
 
         # Détection automatique de la zone tarifaire
-        zone = self._detect_zone(origin_country)
+        zone = find_zone(origin_country)
 
         instance = TransportRequest(**validated_data)
         instance.zone = zone
@@ -89,13 +93,6 @@ class TransportRequestCreateSerializer(serializers.ModelSerializer):
 
         return instance
 
-    def _detect_zone(self, country_name):
-        """Cherche la zone tarifaire correspondant au pays d'origine."""
-        for zone in TransportZone.objects.filter(is_active=True):
-            if zone.country_belongs(country_name):
-                return zone
-        return None
-
 
 class TransportRequestDetailSerializer(serializers.ModelSerializer):
     """
@@ -147,24 +144,82 @@ class TransportEstimateSerializer(serializers.Serializer):
         country = self.validated_data['origin_country']
         weight = self.validated_data.get('vehicle_weight_kg', 0)
 
-        for zone in TransportZone.objects.filter(is_active=True):
-            if zone.country_belongs(country):
-                cost = zone.base_price
-                if weight and zone.price_per_kg:
-                    cost += weight * zone.price_per_kg
-                return {
-                    'zone': zone.name,
-                    'base_price': zone.base_price,
-                    'weight_supplement': weight * zone.price_per_kg if weight else 0,
-                    'total_estimate': cost,
-                    'advance_required': cost * 30 / 100,
-                    'delay': f"{zone.delay_days_min}–{zone.delay_days_max} jours",
-                    'customs_note': "Le dédouanement n'est pas inclus dans ce devis.",
-                    'notes': zone.notes,
-                }
+        zone = find_zone(country)
+        if zone:
+            return {
+                'zone': zone.name,
+                **quote(zone, weight),
+                'delay': f"{zone.delay_days_min}–{zone.delay_days_max} jours",
+                'customs_note': "Le dédouanement n'est pas inclus dans ce devis.",
+                'notes': zone.notes,
+            }
 
         return {
             'zone': None,
             'total_estimate': None,
             'message': f"Aucune zone tarifaire trouvée pour '{country}'. Contactez-nous pour un devis personnalisé.",
-        }
\ No newline at end of file
+        }
+
+
+class TransportEstimateRowSerializer(serializers.Serializer):
+    origin_country = serializers.CharField(required=False, allow_blank=True, default='')
+    vehicle_weight_kg = serializers.IntegerField(required=False, default=0, min_value=0)
+    vehicle_id = serializers.IntegerField(required=False, allow_null=True, default=None)
+
+    def validate(self, attrs):
+        if not attrs['origin_country'] and not attrs['vehicle_id']:
+            raise serializers.ValidationError("Pays d'origine ou véhicule requis.")
+        return attrs
+
+
+class TransportBatchEstimateSerializer(serializers.Serializer):
+    """
+    Estimation d'un manifeste complet : une ligne par véhicule.
+    Sans pays d'origine, on prend le pays du véhicule indiqué.
+    """
+    MAX_ROWS = 2000
+
+    rows = TransportEstimateRowSerializer(many=True, allow_empty=False, max_length=MAX_ROWS)
+
+    def get_estimates(self):
+        rows = self.validated_data['rows']
+
+        #-----Pays des vehicules references : une seule requete pour tout le manifeste
+        vehicle_ids = {row['vehicle_id'] for row in rows if row['vehicle_id']}
+        vehicle_countries = dict(
+            Vehicle.objects.filter(pk__in=vehicle_ids).values_list('pk', 'country')
+        ) if vehicle_ids else {}
+
+        #-----Un calcul par couple (zone, poids) distinct
+        quotes = {}
+        results = []
+        totals = {'total_estimate': Decimal(0), 'advance_required': Decimal(0), 'priced': 0, 'unpriced': 0}
+        for index, row in enumerate(rows):
+            country = row['origin_country'] or vehicle_countries.get(row['vehicle_id'], '')
+            weight = row['vehicle_weight_kg']
+            zone = find_zone(country)
+            result = {
+                'row': index,
+                'vehicle_id': row['vehicle_id'],
+                'origin_country': country,
+                'vehicle_weight_kg': weight,
+                'zone': zone.name if zone else None,
+                'total_estimate': None,
+            }
+            if zone:
+                key = (zone.pk, weight)
+                if key not in quotes:
+                    quotes[key] = quote(zone, weight)
+                result.update(quotes[key])
+                totals['total_estimate'] += result['total_estimate']
+                totals['advance_required'] += result['advance_required']
+                totals['priced'] += 1
+            else:
+                totals['unpriced'] += 1
+            results.append(result)
+
+        return {
+            'rows': results,
+            'totals': totals,
+            'customs_note': "Le dédouanement n'est pas inclus dans ce devis.",
+        }
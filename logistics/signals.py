@@ -0,0 +1,29 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import pdf, zones
+from .tracking import transport_bus
+from .models import TransportStep, TransportZone
+
+
+@receiver(post_save, sender=TransportZone)
+def sync_zone_countries(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    instance.sync_countries()
+    transaction.on_commit(zones.clear_cache)
+
+
+@receiver(post_delete, sender=TransportZone)
+def clear_zone_cache(sender, **kwargs):
+    transaction.on_commit(zones.clear_cache)
+
+
+@receiver(post_save, sender=TransportStep)
+def transport_step_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    pdf.schedule_render(instance.request_id)
+    if created:
+        transport_bus.publish_on_commit([instance.request_id])
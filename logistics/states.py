@@ -0,0 +1,18 @@
+"""
+Transitions autorisées des demandes de transport
+(statut d'arrivée -> statuts de départ), voir workflow.machines.
+"""
+from workflow.machines import StateMachine
+
+from .models import TransportRequest
+
+TRANSPORT_MACHINE = StateMachine(TransportRequest, {
+    'quote_sent': ('quote_requested',),
+    'advance_paid': ('quote_requested', 'quote_sent'),
+    'loading': ('advance_paid',),
+    'in_transit': ('advance_paid', 'loading'),
+    'arrived_port': ('in_transit',),
+    'customs': ('arrived_port',),
+    'delivered': ('arrived_port', 'customs'),
+    'cancelled': ('quote_requested', 'quote_sent', 'advance_paid', 'loading'),
+})
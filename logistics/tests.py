@@ -1,3 +1,50 @@
 from django.test import TestCase
 
-# Create your tests here.
+from catalog.models import Brand, Vehicle, VehicleModel
+from logistics.models import TransportRequest, TransportStep
+
+
+class TrackingPollTests(TestCase):
+    """
+    Suivi incrémental : le client renvoie le last_step_id de la réponse
+    précédente, y compris quand elle ne contenait aucune nouvelle étape.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        brand = Brand.objects.create(name='Toyota')
+        model = VehicleModel.objects.create(brand=brand, name='Corolla')
+        vehicle = Vehicle.objects.create(
+            title='Corolla', vehicle_type='car', listing_type='sale', brand=brand, model=model,
+            year=2018, fuel='petrol', transmission='manual', condition='used', price=1000000,
+            city='Lomé', country='Togo',
+        )
+        cls.transport = TransportRequest.objects.create(
+            vehicle=vehicle, client_name='Kossi', client_email='kossi@example.com', origin_country='France',
+        )
+
+    def poll(self, since=None):
+        params = {} if since is None else {'since': since}
+        response = self.client.get(f'/api/logistics/track/{self.transport.pk}/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cursor_echoed_when_no_new_steps(self):
+        first = self.poll()
+        self.assertEqual(first['steps'], [])
+
+        empty = self.poll(first['last_step_id'])
+        self.assertEqual(empty['steps'], [])
+
+        step = TransportStep.objects.create(request=self.transport, status='in_transit', title='En route')
+        update = self.poll(empty['last_step_id'])
+        self.assertEqual([row['id'] for row in update['steps']], [step.pk])
+        self.assertEqual(update['last_step_id'], step.pk)
+
+        again = self.poll(update['last_step_id'])
+        self.assertEqual(again['steps'], [])
+        self.assertEqual(again['last_step_id'], step.pk)
+
+    def test_date_cursor_echoed(self):
+        since = '2030-01-01T00:00:00+00:00'
+        self.assertEqual(self.poll(since)['last_step_id'], since)
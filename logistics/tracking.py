@@ -0,0 +1,159 @@
+"""
+Suivi incrémental des demandes de transport.
+
+Le client garde l'id de la dernière étape reçue et ne demande que la suite
+(?since=<id d'étape> ou ?since=<date ISO 8601>) : une seule requête — la
+demande et ses nouvelles étapes en LEFT JOIN filtré, servie par l'index
+(request, reached_at).
+
+Le flux SSE pousse les nouvelles étapes dès leur création : les signaux
+publient sur transport_bus après commit. Comme pour les paiements, le bus est
+propre au processus : un flux servi par un autre worker relit la base à chaque
+keep-alive, une étape n'est jamais perdue, seulement livrée plus tard.
+"""
+import json
+import time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import FilteredRelation, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from payments.notifications import NotificationBus
+
+from . import pdf
+from .models import TransportRequest, TransportStep
+from .states import TRANSPORT_MACHINE
+
+STEP_FIELDS = ('id', 'status', 'title', 'description', 'location', 'reached_at')
+
+#-----Plus aucune etape attendue : le flux se ferme
+TERMINAL_STATUSES = ('delivered', 'cancelled')
+
+#-----Flux SSE : duree max d'une connexion (le navigateur se reconnecte avec Last-Event-ID), keep-alive, delai de reconnexion
+STREAM_MAX_DURATION = 60
+STREAM_KEEPALIVE = 15
+STREAM_RETRY_MS = 3000
+
+#-----Bus des demandes de transport, indexe par id de demande
+transport_bus = NotificationBus()
+
+STATUS_LABELS = dict(TransportRequest.STATUS_CHOICES)
+
+
+def parse_since(value):
+    """
+    Curseur ?since= -> condition sur les étapes.
+    Id d'étape (entier) ou date ISO 8601 ; None si illisible.
+    """
+    value = (value or '').strip()
+    if value.isdigit():
+        return Q(steps__pk__gt=int(value))
+    try:
+        moment = parse_datetime(value)
+    except ValueError:
+        return None
+    if moment is None:
+        return None
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return Q(steps__reached_at__gt=moment)
+
+
+def fetch_since(transport_id, since):
+    """
+    Statut de la demande + étapes satisfaisant `since`, en une requête.
+    Retourne (None, []) si la demande n'existe pas.
+    """
+    rows = list(
+        TransportRequest.objects.filter(pk=transport_id)
+        .annotate(new_steps=FilteredRelation('steps', condition=since))
+        .order_by('new_steps__reached_at', 'new_steps__id')
+        .values('status', *[f'new_steps__{field}' for field in STEP_FIELDS])
+    )
+    if not rows:
+        return None, []
+    steps = [
+        TransportStep(request_id=transport_id, **{field: row[f'new_steps__{field}'] for field in STEP_FIELDS})
+        for row in rows
+        if row['new_steps__id'] is not None
+    ]
+    return rows[0]['status'], steps
+
+
+def step_data(step, current_status):
+    return {
+        'id': step.pk,
+        'status': step.status,
+        'status_display': step.get_status_display(),
+        'title': step.title,
+        'description': step.description,
+        'location': step.location,
+        'reached_at': step.reached_at,
+        'is_current': step.status == current_status,
+    }
+
+
+def timeline(transport_id, current_status, steps, cursor=0):
+    #----Sans nouvelle etape, last_step_id renvoie le curseur recu : le client peut toujours le renvoyer tel quel
+    return {
+        'id': transport_id,
+        'status': current_status,
+        'status_display': STATUS_LABELS.get(current_status, current_status),
+        'steps': [step_data(step, current_status) for step in steps],
+        'last_step_id': steps[-1].pk if steps else cursor,
+    }
+
+
+def steps_created(transport_ids):
+    #----Etapes creees en masse (bulk_create, sans post_save) : memes effets que le signal
+    pdf.schedule_render(*transport_ids)
+    transport_bus.publish_on_commit(transport_ids)
+
+
+def transition(queryset, status, actor=None, **step_fields):
+    """
+    Change le statut de plusieurs demandes (transitions gardées, voir logistics.states)
+    et crée l'étape de suivi correspondante. Retourne un TransitionResult.
+    """
+    title = STATUS_LABELS.get(status, status)
+    return TRANSPORT_MACHINE.apply(
+        queryset, status, actor=actor,
+        steps=lambda pks: [TransportStep(request_id=pk, status=status, title=title, **step_fields) for pk in pks],
+        on_changed=steps_created,
+    )
+
+
+# ─── Flux SSE ─────────────────────────────────────────────────────────────────
+
+def _event(name, data, event_id=None):
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines += [f'event: {name}', f'data: {json.dumps(data, cls=DjangoJSONEncoder)}']
+    return '\n'.join(lines) + '\n\n'
+
+
+def event_stream(transport_id, since, max_duration=STREAM_MAX_DURATION, keepalive=STREAM_KEEPALIVE):
+    """
+    Générateur text/event-stream : un événement 'step' par nouvelle étape
+    (id SSE = id de l'étape), 'end' quand la demande est livrée ou annulée.
+    """
+    deadline = time.monotonic() + max_duration
+    yield f'retry: {STREAM_RETRY_MS}\n\n'
+    while True:
+        with transport_bus.listen(transport_id) as event:
+            current_status, steps = fetch_since(transport_id, since)
+            if current_status is None:
+                yield _event('end', {'id': transport_id, 'status': None})
+                return
+            for step in steps:
+                yield _event('step', step_data(step, current_status), event_id=step.pk)
+            if steps:
+                since = Q(steps__pk__gt=steps[-1].pk)
+            if current_status in TERMINAL_STATUSES:
+                yield _event('end', {'id': transport_id, 'status': current_status})
+                return
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if not event.wait(min(keepalive, remaining)):
+                yield ': keep-alive\n\n'
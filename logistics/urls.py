@@ -4,9 +4,11 @@ from django.urls import path
 from .views import (
     TransportZoneListView,
     TransportEstimateView,
+    TransportBatchEstimateView,
     TransportRequestCreateView,
     TransportRequestDetailView,
     TransportRequestTrackView,
+    TransportRequestTrackStreamView,
     TransportRequestPDFView,
 )
 
@@ -16,6 +18,7 @@ urlpatterns = [
 
     # Simulateur de coût (sans créer de demande)
     path('estimate/', TransportEstimateView.as_view(), name='transport_estimate'),
+    path('estimate/batch/', TransportBatchEstimateView.as_view(), name='transport_estimate_batch'),
 
     # Demandes de transport
     path('requests/', TransportRequestCreateView.as_view(), name='transport_create'),
@@ -23,6 +26,7 @@ urlpatterns = [
 
     # Suivi public par ID
     path('track/<int:pk>/', TransportRequestTrackView.as_view(), name='transport_track'),
+    path('track/<int:pk>/stream/', TransportRequestTrackStreamView.as_view(), name='transport_track_stream'),
 
     # Fiche PDF récapitulative
     path('requests/<int:pk>/pdf/', TransportRequestPDFView.as_view(), name='transport_pdf'),
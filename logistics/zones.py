@@ -0,0 +1,61 @@
+"""
+Détection de la zone tarifaire d'un pays d'origine.
+
+Table ZoneCountry (clé pays normalisée, unique parmi les zones actives) chargée une fois en
+mémoire : la détection est une simple lecture de dictionnaire. Le cache est
+vidé à chaque enregistrement / suppression de zone (voir logistics.signals)
+et rechargé au plus tard après ZONE_CACHE_TTL secondes dans les autres
+processus.
+"""
+import threading
+import time
+
+from catalog.text import fold
+
+from .models import TransportZone, ZoneCountry
+
+ZONE_CACHE_TTL = 300
+
+_lock = threading.Lock()
+_cache = {'zones': None, 'loaded_at': 0.0}
+
+
+def _load():
+    zones = {zone.pk: zone for zone in TransportZone.objects.filter(is_active=True)}
+    return {
+        country_key: zones[zone_id]
+        for country_key, zone_id in ZoneCountry.objects.filter(zone_active=True).values_list('country_key', 'zone_id')
+        if zone_id in zones
+    }
+
+
+def get_zone_map():
+    with _lock:
+        if _cache['zones'] is None or time.monotonic() - _cache['loaded_at'] > ZONE_CACHE_TTL:
+            _cache['zones'] = _load()
+            _cache['loaded_at'] = time.monotonic()
+        return _cache['zones']
+
+
+def clear_cache():
+    with _lock:
+        _cache['zones'] = None
+
+
+def find_zone(country_name):
+    #----Zone active du pays (toutes variantes de nom, accents et casse ignores), ou None
+    if not country_name:
+        return None
+    return get_zone_map().get(fold(country_name))
+
+
+def quote(zone, weight):
+    #----Estimation pour une zone et un poids : prix de base + supplement au kg, avance de 30 %
+    supplement = weight * zone.price_per_kg if weight else 0
+    total = zone.base_price + supplement
+    return {
+        'base_price': zone.base_price,
+        'weight_supplement': supplement,
+        'total_estimate': total,
+        'advance_required': total * 30 / 100,
+    }
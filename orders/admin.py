@@ -1,10 +1,15 @@
 from django.contrib import admin
+from django.db import transaction
 from django.utils.html import format_html
+from catalog.cache import bump_version
+from workflow.admin import TransitionAdminMixin
 from .models import Rental, SparePartOrder, ContactMessage
+from .states import ORDER_MACHINE, RENTAL_MACHINE
 
 
 @admin.register(Rental)
-class RentalAdmin(admin.ModelAdmin):
+class RentalAdmin(TransitionAdminMixin, admin.ModelAdmin):
+    state_machine = RENTAL_MACHINE
     list_display = (
         'id', 'client', 'vehicle',
         'start_date', 'end_date', 'duration_days',
@@ -58,27 +63,28 @@ class RentalAdmin(admin.ModelAdmin):
 
     @admin.action(description="✅ Confirmer les réservations sélectionnées")
     def confirm_rental(self, request, queryset):
-        count = queryset.update(status='confirmed')
-        self.message_user(request, f"{count} réservation(s) confirmée(s).")
+        self.apply_transition(request, queryset, 'confirmed', "{count} réservation(s) confirmée(s).")
 
     @admin.action(description="🚗 Marquer comme en cours")
     def mark_active(self, request, queryset):
-        count = queryset.update(status='active')
-        self.message_user(request, f"{count} réservation(s) marquée(s) en cours.")
+        self.apply_transition(request, queryset, 'active', "{count} réservation(s) marquée(s) en cours.")
 
     @admin.action(description="🏁 Marquer comme terminée")
     def mark_completed(self, request, queryset):
-        count = queryset.update(status='completed')
-        self.message_user(request, f"{count} réservation(s) terminée(s).")
+        self.apply_transition(request, queryset, 'completed', "{count} réservation(s) terminée(s).")
+        #----Changement en masse sans post_save : les dates liberees doivent apparaitre au catalogue
+        transaction.on_commit(bump_version)
 
     @admin.action(description="❌ Annuler les réservations sélectionnées")
     def cancel_rental(self, request, queryset):
-        count = queryset.update(status='cancelled')
-        self.message_user(request, f"{count} réservation(s) annulée(s).")
+        self.apply_transition(request, queryset, 'cancelled', "{count} réservation(s) annulée(s).")
+        #----Changement en masse sans post_save : les dates liberees doivent apparaitre au catalogue
+        transaction.on_commit(bump_version)
 
 
 @admin.register(SparePartOrder)
-class SparePartOrderAdmin(admin.ModelAdmin):
+class SparePartOrderAdmin(TransitionAdminMixin, admin.ModelAdmin):
+    state_machine = ORDER_MACHINE
     list_display = (
         'id', 'client_display', 'part',
         'quantity', 'total_price_display',
@@ -121,23 +127,19 @@ class SparePartOrderAdmin(admin.ModelAdmin):
 
     @admin.action(description="✅ Confirmer les commandes")
     def confirm_order(self, request, queryset):
-        count = queryset.update(status='confirmed')
-        self.message_user(request, f"{count} commande(s) confirmée(s).")
+        self.apply_transition(request, queryset, 'confirmed', "{count} commande(s) confirmée(s).")
 
     @admin.action(description="📦 Marquer en préparation")
     def mark_preparing(self, request, queryset):
-        count = queryset.update(status='preparing')
-        self.message_user(request, f"{count} commande(s) en préparation.")
+        self.apply_transition(request, queryset, 'preparing', "{count} commande(s) en préparation.")
 
     @admin.action(description="🚚 Marquer en livraison")
     def mark_out_for_delivery(self, request, queryset):
-        count = queryset.update(status='out_for_delivery')
-        self.message_user(request, f"{count} commande(s) en cours de livraison.")
+        self.apply_transition(request, queryset, 'out_for_delivery', "{count} commande(s) en cours de livraison.")
 
     @admin.action(description="🏠 Marquer comme livrée")
     def mark_delivered(self, request, queryset):
-        count = queryset.update(status='delivered')
-        self.message_user(request, f"{count} commande(s) livrée(s).")
+        self.apply_transition(request, queryset, 'delivered', "{count} commande(s) livrée(s).")
 
 
 @admin.register(ContactMessage)
@@ -0,0 +1,79 @@
+"""
+Disponibilite des vehicules de location.
+
+Une reservation occupe l'intervalle semi-ouvert [start_date, end_date) : le
+vehicule rendu le jour J peut repartir le jour J.
+
+[debut, fin) est libre si aucune reservation bloquante du vehicule ne commence
+avant `fin` et ne finit apres `debut`. La recherche descend dans l'index partiel
+rental_availability_idx, qui ne contient que les reservations bloquantes : elle
+ne lit que les reservations en cours ou a venir du vehicule, jamais son
+historique termine ou annule. Elle ne suppose pas que ces reservations sont
+disjointes (reservations anterieures, saisies admin) ; Rental.clean() et la
+creation par l'API refusent quand meme tout nouveau chevauchement. Le filtre de
+disponibilite du catalogue applique la meme recherche a chaque vehicule, en
+sous-requete correlee.
+"""
+from django.db.models import BooleanField, Exists, F, Func, OuterRef
+
+from .models import BLOCKING_STATUSES, Rental
+
+
+class IsBlocking(Func):
+    """
+    status IN ('pending_kyc', ...) avec les valeurs écrites en clair, comme dans la
+    condition de rental_availability_idx : SQLite n'utilise un index partiel que si
+    la requête reprend cette condition telle quelle, sans paramètres liés.
+    """
+    output_field = BooleanField()
+
+    def __init__(self):
+        super().__init__(F('status'))
+
+    def as_sql(self, compiler, connection, **extra_context):
+        column, params = compiler.compile(self.source_expressions[0])
+        statuses = ', '.join(f"'{status}'" for status in BLOCKING_STATUSES)
+        return f'{column} IN ({statuses})', params
+
+
+def blocking_rentals(vehicle):
+    return Rental.objects.filter(IsBlocking(), vehicle=vehicle)
+
+
+def overlapping(vehicle, start, end):
+    #----Reservations bloquantes qui chevauchent [start, end)
+    return blocking_rentals(vehicle).filter(start_date__lt=end, end_date__gt=start)
+
+
+def filter_available(queryset, start, end):
+    """
+    Restreint un queryset de vehicules a ceux libres sur [start, end) :
+    NOT EXISTS correle sur l'index partiel des reservations bloquantes.
+    """
+    return queryset.filter(~Exists(overlapping(OuterRef('pk'), start, end)))
+
+
+def is_available(vehicle_id, start, end):
+    return not overlapping(vehicle_id, start, end).exists()
+
+
+def busy_ranges(vehicle_id, start, end):
+    #----Reservations qui touchent [start, end), par date de debut (elles peuvent se chevaucher)
+    return list(overlapping(vehicle_id, start, end).order_by('start_date').values_list('start_date', 'end_date'))
+
+
+def free_ranges(vehicle_id, start, end):
+    """
+    Plages libres [debut, fin) du vehicule entre start et end.
+    """
+    free = []
+    cursor = start
+    for busy_start, busy_end in busy_ranges(vehicle_id, start, end):
+        if busy_start > cursor:
+            free.append((cursor, min(busy_start, end)))
+        cursor = max(cursor, busy_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        free.append((cursor, end))
+    return free
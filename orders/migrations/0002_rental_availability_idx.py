@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-17 22:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rental',
+            index=models.Index(condition=models.Q(('status__in', ('pending_kyc', 'pending_payment', 'confirmed', 'active'))), fields=['vehicle', 'start_date', 'end_date'], name='rental_availability_idx'),
+        ),
+    ]
@@ -1,7 +1,11 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.conf import settings
 from catalog.models import Vehicle, SparePart
 
+#-----Statuts qui immobilisent le vehicule (les reservations terminees ou annulees liberent les dates)
+BLOCKING_STATUSES = ('pending_kyc', 'pending_payment', 'confirmed', 'active')
+
 
 class Rental(models.Model):
 
@@ -52,10 +56,30 @@ class Rental(models.Model):
         verbose_name = "Réservation"
         verbose_name_plural = "Réservations"
         ordering = ['-created_at']
+        indexes = [
+            #-----Controle de chevauchement et calendrier de disponibilite (orders.availability).
+            #-----Index partiel : l'historique termine ou annule n'y entre pas, la recherche ne le parcourt jamais
+            models.Index(
+                fields=['vehicle', 'start_date', 'end_date'],
+                condition=models.Q(status__in=BLOCKING_STATUSES),
+                name='rental_availability_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"Réservation #{self.pk} — {self.client.get_full_name()} / {self.vehicle.title}"
 
+    def clean(self):
+        #-----Saisie admin : memes regles de dates que la reservation par l'API
+        if not (self.vehicle_id and self.start_date and self.end_date):
+            return
+        if self.start_date >= self.end_date:
+            raise ValidationError({'end_date': "La date de fin doit être après la date de début."})
+        if self.status in BLOCKING_STATUSES:
+            from .availability import overlapping
+            if overlapping(self.vehicle_id, self.start_date, self.end_date).exclude(pk=self.pk).exists():
+                raise ValidationError("Ce véhicule est déjà réservé sur tout ou partie de ces dates.")
+
     @property
     def duration_days(self):
         if self.start_date and self.end_date:
@@ -1,6 +1,10 @@
 from rest_framework import serializers
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
+from .availability import is_available
 from .models import Rental, SparePartOrder, ContactMessage
+from catalog import stock
 from catalog.models import Vehicle, SparePart
 
 
@@ -41,6 +45,10 @@ class RentalCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError(
                 {"vehicle": "Ce véhicule n'est pas proposé à la location."}
             )
+        if not is_available(vehicle.pk, start, end):
+            raise serializers.ValidationError(
+                {"vehicle": "Ce véhicule est déjà réservé sur tout ou partie de ces dates."}
+            )
 
         if attrs['delivery_mode'] == 'delivery' and not attrs.get('delivery_address'):
             raise serializers.ValidationError(
@@ -56,13 +64,22 @@ class RentalCreateSerializer(serializers.ModelSerializer):
         days = (end - start).days
         price_per_day = vehicle.rental_price_per_day
 
-        rental = Rental.objects.create(
-            client=self.context['request'].user,
-            price_per_day=price_per_day,
-            total_price=price_per_day * days,
-            status='pending_payment',
-            **validated_data
-        )
+        #-----Verrou sur le vehicule : deux reservations concurrentes ne peuvent pas passer le controle ensemble.
+        #-----UPDATE sans effet plutot que select_for_update, ignore par SQLite : en premiere instruction de la
+        #-----transaction il prend le verrou de la ligne sur PostgreSQL, le verrou d'ecriture de la base sur SQLite
+        with transaction.atomic():
+            Vehicle.objects.filter(pk=vehicle.pk).update(status=F('status'))
+            if not is_available(vehicle.pk, start, end):
+                raise serializers.ValidationError(
+                    {"vehicle": "Ce véhicule est déjà réservé sur tout ou partie de ces dates."}
+                )
+            rental = Rental.objects.create(
+                client=self.context['request'].user,
+                price_per_day=price_per_day,
+                total_price=price_per_day * days,
+                status='pending_payment',
+                **validated_data
+            )
         return rental
 
 
@@ -134,17 +151,18 @@ class SparePartOrderCreateSerializer(serializers.ModelSerializer):
 
         estimated_delivery = "1h" if part.is_local else "24-48h"
 
-        order = SparePartOrder.objects.create(
-            client=request.user if request.user.is_authenticated else None,
-            unit_price=part.price,
-            estimated_delivery=estimated_delivery,
-            **validated_data
-        )
-
-        part.stock_quantity -= quantity
-        if part.stock_quantity == 0:
-            part.status = 'out_of_stock'
-        part.save()
+        #-----Decrement conditionnel du stock et creation de la commande dans la meme transaction
+        with transaction.atomic():
+            if not stock.reserve(part.pk, quantity):
+                raise serializers.ValidationError(
+                    {"quantity": "Stock insuffisant pour cette commande."}
+                )
+            order = SparePartOrder.objects.create(
+                client=request.user if request.user.is_authenticated else None,
+                unit_price=part.price,
+                estimated_delivery=estimated_delivery,
+                **validated_data
+            )
 
         return order
 
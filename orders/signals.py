@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from catalog.cache import bump_version
+from .models import Rental
+
+
+@receiver(post_save, sender=Rental)
+@receiver(post_delete, sender=Rental)
+def invalidate_catalog_cache(sender, **kwargs):
+    #-----Les reservations changent le resultat des filtres de disponibilite du catalogue
+    transaction.on_commit(bump_version)
@@ -0,0 +1,23 @@
+"""
+Transitions autorisées des réservations et des commandes de pièces
+(statut d'arrivée -> statuts de départ), voir workflow.machines.
+"""
+from workflow.machines import StateMachine
+
+from .models import Rental, SparePartOrder
+
+RENTAL_MACHINE = StateMachine(Rental, {
+    'pending_payment': ('pending_kyc',),
+    'confirmed': ('pending_kyc', 'pending_payment'),
+    'active': ('confirmed',),
+    'completed': ('confirmed', 'active'),
+    'cancelled': ('pending_kyc', 'pending_payment', 'confirmed'),
+})
+
+ORDER_MACHINE = StateMachine(SparePartOrder, {
+    'confirmed': ('pending',),
+    'preparing': ('confirmed',),
+    'out_for_delivery': ('preparing',),
+    'delivered': ('out_for_delivery',),
+    'cancelled': ('pending', 'confirmed', 'preparing'),
+})
@@ -1,3 +1,205 @@
-from django.test import TestCase
+import threading
+from datetime import date
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import Client, TestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from catalog.models import Brand, SparePart, Vehicle, VehicleModel
+from orders.availability import is_available
+from orders.models import Rental, SparePartOrder
+
+
+def run_concurrently(target, count):
+    #----Lance `count` threads ensemble (barriere) ; chacun ferme sa connexion a la base en sortant
+    barrier = threading.Barrier(count)
+    results = []
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            barrier.wait()
+            result = target()
+            with lock:
+                results.append(result)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class SparePartOversellTests(TransactionTestCase):
+    """
+    Commandes simultanées de la même pièce : le décrément conditionnel du stock
+    (catalog.stock.reserve) ne doit jamais vendre plus que le stock.
+    """
+
+    def setUp(self):
+        self.part = SparePart.objects.create(title='Filtre à huile', reference='FH-1', price=5000, stock_quantity=10)
+
+    def order(self, quantity=1):
+        response = Client().post('/api/orders/parts/create/', {
+            'part': self.part.pk,
+            'quantity': quantity,
+            'delivery_mode': 'pickup',
+            'guest_name': 'Client',
+            'guest_phone': '90000000',
+        }, content_type='application/json')
+        return response.status_code
+
+    def test_concurrent_orders_never_oversell(self):
+        codes = run_concurrently(self.order, 30)
+
+        self.part.refresh_from_db()
+        self.assertEqual(codes.count(201), 10)
+        self.assertEqual(codes.count(400), 20)
+        self.assertEqual(self.part.stock_quantity, 0)
+        self.assertEqual(self.part.status, 'out_of_stock')
+        self.assertEqual(SparePartOrder.objects.filter(part=self.part).count(), 10)
+
+    def test_concurrent_multi_unit_orders_never_oversell(self):
+        codes = run_concurrently(lambda: self.order(quantity=3), 12)
+
+        self.part.refresh_from_db()
+        self.assertEqual(codes.count(201), 3)
+        self.assertEqual(self.part.stock_quantity, 1)
+        self.assertEqual(self.part.status, 'in_stock')
+        self.assertEqual(sum(SparePartOrder.objects.filter(part=self.part).values_list('quantity', flat=True)), 9)
+
+
+def make_rental_vehicle():
+    brand = Brand.objects.create(name='Toyota')
+    model = VehicleModel.objects.create(brand=brand, name='Corolla')
+    return Vehicle.objects.create(
+        title='Corolla', vehicle_type='car', listing_type='rental', brand=brand, model=model,
+        year=2018, fuel='petrol', transmission='manual', condition='used', price=1000000,
+        rental_price_per_day=10000, city='Lomé', country='Togo',
+    )
+
+
+class RentalAvailabilityTests(TestCase):
+    """
+    Réservations sur [start_date, end_date) : une réservation bloquante qui chevauche
+    refuse la demande, une réservation terminée ou annulée ne bloque rien.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.vehicle = make_rental_vehicle()
+        cls.client_user = User.objects.create_user(
+            username='client', email='client@example.com', password='x', is_kyc_verified=True,
+        )
+
+    def setUp(self):
+        self.api = APIClient()
+        self.api.force_authenticate(self.client_user)
+
+    def rent(self, start, end, status='confirmed'):
+        return Rental.objects.create(
+            client=self.client_user, vehicle=self.vehicle, start_date=start, end_date=end,
+            price_per_day=10000, total_price=10000 * (end - start).days, status=status,
+        )
+
+    def book(self, start, end):
+        return self.api.post('/api/orders/rentals/create/', {
+            'vehicle': self.vehicle.pk, 'start_date': start, 'end_date': end, 'delivery_mode': 'pickup',
+        }, format='json')
+
+    def test_overlapping_booking_rejected(self):
+        self.rent(date(2030, 1, 10), date(2030, 1, 15))
+
+        for start, end in [
+            (date(2030, 1, 8), date(2030, 1, 11)),
+            (date(2030, 1, 14), date(2030, 1, 20)),
+            (date(2030, 1, 11), date(2030, 1, 12)),
+            (date(2030, 1, 1), date(2030, 1, 31)),
+        ]:
+            response = self.book(start, end)
+            self.assertEqual(response.status_code, 400, (start, end))
+            self.assertIn('vehicle', response.json())
+        self.assertEqual(Rental.objects.count(), 1)
+
+    def test_booking_touching_a_boundary_accepted(self):
+        self.rent(date(2030, 1, 10), date(2030, 1, 15))
+
+        self.assertEqual(self.book(date(2030, 1, 15), date(2030, 1, 18)).status_code, 201)
+        self.assertEqual(self.book(date(2030, 1, 7), date(2030, 1, 10)).status_code, 201)
+
+    def test_finished_or_cancelled_rentals_do_not_block(self):
+        self.rent(date(2030, 1, 10), date(2030, 1, 15), status='completed')
+        self.rent(date(2030, 1, 12), date(2030, 1, 20), status='cancelled')
+
+        self.assertEqual(self.book(date(2030, 1, 11), date(2030, 1, 19)).status_code, 201)
+
+    def test_overlapping_rentals_already_in_base_still_block(self):
+        #----Chevauchement anterieur au controle : une longue reservation couvre la suivante
+        self.rent(date(2030, 1, 1), date(2030, 1, 31))
+        self.rent(date(2030, 1, 5), date(2030, 1, 8))
+
+        self.assertFalse(is_available(self.vehicle.pk, date(2030, 1, 20), date(2030, 1, 22)))
+        self.assertTrue(is_available(self.vehicle.pk, date(2030, 1, 31), date(2030, 2, 2)))
+
+    def test_admin_form_rejects_overlap(self):
+        self.rent(date(2030, 1, 10), date(2030, 1, 15))
+        rental = Rental(
+            client=self.client_user, vehicle=self.vehicle, start_date=date(2030, 1, 12), end_date=date(2030, 1, 14),
+            price_per_day=10000, total_price=20000, status='confirmed',
+        )
+        with self.assertRaises(ValidationError):
+            rental.full_clean()
+        rental.status = 'cancelled'
+        rental.full_clean()
+
+    def calendar(self, start, end):
+        response = self.client.get(f'/api/catalog/vehicles/{self.vehicle.pk}/availability/', {'from': start, 'to': end})
+        self.assertEqual(response.status_code, 200)
+        return [(free['start'], free['end']) for free in response.json()['free']]
+
+    def test_calendar_gaps_at_window_edges(self):
+        #----Reservation en cours au debut de la fenetre, une au milieu, une qui depasse la fin
+        self.rent(date(2030, 1, 1), date(2030, 1, 5))
+        self.rent(date(2030, 1, 8), date(2030, 1, 10))
+        self.rent(date(2030, 1, 18), date(2030, 2, 5))
+        self.rent(date(2030, 1, 10), date(2030, 1, 12), status='cancelled')
+
+        self.assertEqual(self.calendar('2030-01-03', '2030-01-20'), [
+            ('2030-01-05', '2030-01-08'),
+            ('2030-01-10', '2030-01-18'),
+        ])
+        self.assertEqual(self.calendar('2030-01-05', '2030-01-08'), [('2030-01-05', '2030-01-08')])
+        self.assertEqual(self.calendar('2030-01-02', '2030-01-04'), [])
+        self.assertEqual(self.calendar('2030-02-05', '2030-02-10'), [('2030-02-05', '2030-02-10')])
+
+
+class RentalDoubleBookingTests(TransactionTestCase):
+    """
+    Demandes simultanées sur les mêmes dates : le verrou du véhicule dans
+    RentalCreateSerializer.create n'en laisse passer qu'une.
+    """
+
+    def setUp(self):
+        self.vehicle = make_rental_vehicle()
+        self.user = User.objects.create_user(
+            username='client', email='client@example.com', password='x', is_kyc_verified=True,
+        )
+
+    def book(self):
+        api = APIClient()
+        api.force_authenticate(self.user)
+        return api.post('/api/orders/rentals/create/', {
+            'vehicle': self.vehicle.pk, 'start_date': '2030-01-10', 'end_date': '2030-01-15', 'delivery_mode': 'pickup',
+        }, format='json').status_code
+
+    def test_concurrent_bookings_of_the_same_dates(self):
+        codes = run_concurrently(self.book, 20)
+
+        self.assertEqual(codes.count(201), 1)
+        self.assertEqual(codes.count(400), 19)
+        self.assertEqual(Rental.objects.filter(vehicle=self.vehicle).count(), 1)
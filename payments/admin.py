@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Payment
+from .models import Payment, StripeEvent
 
 
 @admin.register(Payment)
@@ -22,7 +22,7 @@ class PaymentAdmin(admin.ModelAdmin):
         ('Transaction', {
             'fields': (
                 'invoice_number', 'payment_type',
-                'rental_id', 'order_id',
+                'rental_id', 'order_id', 'transport_request_id',
                 'amount', 'currency',
                 'method', 'transaction_id', 'status'
             )
@@ -62,6 +62,15 @@ class PaymentAdmin(admin.ModelAdmin):
 
 
 
+@admin.register(StripeEvent)
+class StripeEventAdmin(admin.ModelAdmin):
+    list_display = ('event_id', 'event_type', 'created_at')
+    list_filter = ('event_type',)
+    search_fields = ('event_id',)
+    readonly_fields = ('event_id', 'event_type', 'created_at')
+
+
+
 # from django.contrib import admin
 # from logistics.models import TransportRequest
 #
@@ -0,0 +1,60 @@
+"""
+Numéros de facture : FAC-<année>-<numéro sur 6 chiffres minimum>.
+
+Les numéros sont croissants (insertions en fin d'index) et uniques par
+construction. Chaque processus réserve des blocs de INVOICE_BLOCK_SIZE numéros
+sur la ligne InvoiceSequence de l'année, puis les distribue en mémoire : la
+ligne n'est verrouillée qu'une fois par bloc, pas une fois par paiement.
+
+Contrepartie : les numéros d'un bloc non épuisé à l'arrêt d'un processus sont
+perdus (trous dans la numérotation, jamais de doublon).
+"""
+import threading
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import InvoiceSequence
+
+INVOICE_BLOCK_SIZE = 50
+
+_blocks = {}
+_lock = threading.Lock()
+
+
+def format_invoice_number(year, value):
+    return f"FAC-{year}-{value:06d}"
+
+
+def reserve(year, count):
+    """
+    Réserve `count` numéros consécutifs pour l'année et retourne le premier.
+    La relecture dans la même transaction donne la borne du bloc obtenu.
+    """
+    sequence = InvoiceSequence.objects.filter(year=year)
+    with transaction.atomic():
+        #----UPDATE en premier : verrou d'ecriture pris d'emblee (pas de montee de verrou lecture -> ecriture)
+        if not sequence.update(last_value=F('last_value') + count):
+            #----Premier numero de l'annee
+            InvoiceSequence.objects.get_or_create(year=year)
+            sequence.update(last_value=F('last_value') + count)
+        last_value = sequence.values_list('last_value', flat=True).get()
+    return last_value - count + 1
+
+
+def next_invoice_number():
+    year = timezone.localdate().year
+
+    #----Dans une transaction de l'appelant, un bloc pourrait etre annule apres avoir ete mis en cache :
+    #----numero unique pris dans cette transaction, sans cache
+    if connection.in_atomic_block:
+        return format_invoice_number(year, reserve(year, 1))
+
+    with _lock:
+        current, end = _blocks.get(year, (0, 0))
+        if current >= end:
+            current = reserve(year, INVOICE_BLOCK_SIZE)
+            end = current + INVOICE_BLOCK_SIZE
+        _blocks[year] = (current + 1, end)
+    return format_invoice_number(year, current)
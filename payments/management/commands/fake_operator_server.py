@@ -0,0 +1,65 @@
+import json
+import random
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Passerelle mobile money factice (développement / mesures de charge). "
+        "Pointer TMONEY_API_URL / FLOOZ_API_URL sur http://127.0.0.1:<port>/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=8099)
+        parser.add_argument('--delay', type=float, default=2.0, help="Latence simulée (secondes)")
+        parser.add_argument('--error-rate', type=float, default=0.0, help="Part de réponses 503 (0-1)")
+        parser.add_argument('--reject-rate', type=float, default=0.0, help="Part de paiements refusés (0-1)")
+
+    def handle(self, *args, **options):
+        delay = options['delay']
+        error_rate = options['error_rate']
+        reject_rate = options['reject_rate']
+        stdout = self.stdout
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                time.sleep(delay)
+                if random.random() < error_rate:
+                    return self._send(503, {'success': False, 'message': "Service indisponible"})
+                if random.random() < reject_rate:
+                    return self._send(200, {'success': False, 'message': "Solde insuffisant"})
+                return self._send(200, {
+                    'success': True,
+                    'transaction_id': f"FAKE-{uuid.uuid4().hex[:12].upper()}",
+                    'reference': payload.get('reference'),
+                })
+
+            def _send(self, code, body):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                stdout.write(f"[fake-operator] {self.address_string()} {format % args}")
+
+        server = ThreadingHTTPServer(('127.0.0.1', options['port']), Handler)
+        self.stdout.write(self.style.SUCCESS(
+            f"Passerelle factice sur http://127.0.0.1:{options['port']}/ (latence {delay}s)"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
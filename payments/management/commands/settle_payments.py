@@ -0,0 +1,41 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.services import SETTLE_BATCH_SIZE, settle_batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Applique un fichier de rapprochement opérateur (CSV : reference, transaction_id, status). "
+        "reference = numéro de facture, status = success / failed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fichier CSV avec en-tête reference,transaction_id,status")
+        parser.add_argument('--batch-size', type=int, default=SETTLE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            handle = open(options['path'], newline='', encoding='utf-8')
+        except OSError as e:
+            raise CommandError(f"Fichier illisible : {e}")
+
+        started = time.monotonic()
+        with handle:
+            reader = csv.DictReader(handle)
+            missing = {'reference', 'transaction_id', 'status'} - set(reader.fieldnames or ())
+            if missing:
+                raise CommandError(f"Colonnes manquantes : {', '.join(sorted(missing))}")
+            confirmations = (
+                (row['reference'].strip(), row['transaction_id'].strip(), row['status'].strip() == 'success')
+                for row in reader
+                if row['reference'].strip()
+            )
+            stats = settle_batch(confirmations, batch_size=options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{stats['settled']} paiement(s) réglé(s), {stats['failed']} échoué(s), "
+            f"{stats['skipped']} ignoré(s) en {time.monotonic() - started:.1f} s."
+        ))
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StripeEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=255, unique=True, verbose_name='ID évènement Stripe')),
+                ('event_type', models.CharField(max_length=100, verbose_name='Type')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Évènement Stripe',
+                'verbose_name_plural': 'Évènements Stripe',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.16 on 2026-10-17 20:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0003_payment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payment',
+            name='transport_request_id',
+            field=models.IntegerField(blank=True, null=True, verbose_name='ID Demande de transport'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['payment_type', 'transport_request_id'], name='payment_transport_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0004_payment_transport_request'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField(unique=True, verbose_name='Année')),
+                ('last_value', models.PositiveBigIntegerField(default=0, verbose_name='Dernier numéro attribué')),
+            ],
+            options={
+                'verbose_name': 'Séquence de factures',
+                'verbose_name_plural': 'Séquences de factures',
+                'ordering': ['-year'],
+            },
+        ),
+    ]
@@ -35,6 +35,7 @@ class Payment(models.Model):
     payment_type = models.CharField(max_length=20, choices=TYPE_CHOICES, verbose_name="Type")
     rental_id = models.IntegerField(null=True, blank=True, verbose_name="ID Réservation")
     order_id = models.IntegerField(null=True, blank=True, verbose_name="ID Commande pièce")
+    transport_request_id = models.IntegerField(null=True, blank=True, verbose_name="ID Demande de transport")
     amount = models.DecimalField(max_digits=12, decimal_places=2, verbose_name="Montant (FCFA)")
     currency = models.CharField(max_length=5, default='XOF', verbose_name="Devise")
     method = models.CharField(max_length=20, choices=METHOD_CHOICES, verbose_name="Moyen de paiement")
@@ -49,13 +50,56 @@ class Payment(models.Model):
         verbose_name = "Paiement"
         verbose_name_plural = "Paiements"
         ordering = ['-created_at']
+        indexes = [
+            #-----Webhook Stripe / callbacks operateur : recherche par ID de transaction externe
+            models.Index(fields=['transaction_id'], name='payment_transaction_idx'),
+            #-----Historique du client (PaymentHistoryView)
+            models.Index(fields=['client', '-created_at'], name='payment_client_created_idx'),
+            #-----Paiements d'une reservation / d'une commande
+            models.Index(fields=['payment_type', 'rental_id'], name='payment_rental_idx'),
+            models.Index(fields=['payment_type', 'order_id'], name='payment_order_idx'),
+            models.Index(fields=['payment_type', 'transport_request_id'], name='payment_transport_idx'),
+        ]
 
     def __str__(self):
         return f"Paiement #{self.invoice_number} — {self.amount} {self.currency} ({self.get_status_display()})"
 
     def save(self, *args, **kwargs):
-        #-----Generer un numero de facture automatiquement
+        #-----Generer un numero de facture automatiquement (sequence annuelle, voir payments.invoices)
         if not self.invoice_number:
-            import uuid
-            self.invoice_number = f"FAC-{uuid.uuid4().hex[:8].upper()}"
-        super().save(*args, **kwargs)
\ No newline at end of file
+            from .invoices import next_invoice_number
+            self.invoice_number = next_invoice_number()
+        super().save(*args, **kwargs)
+
+
+class InvoiceSequence(models.Model):
+
+    #-----Compteur des numeros de facture, une ligne par annee (FAC-2026-000123)
+
+    year = models.PositiveIntegerField(unique=True, verbose_name="Année")
+    last_value = models.PositiveBigIntegerField(default=0, verbose_name="Dernier numéro attribué")
+
+    class Meta:
+        verbose_name = "Séquence de factures"
+        verbose_name_plural = "Séquences de factures"
+        ordering = ['-year']
+
+    def __str__(self):
+        return f"{self.year} : {self.last_value}"
+
+
+class StripeEvent(models.Model):
+
+    #-----Journal des evenements Stripe deja traites : Stripe renvoie un meme evenement tant qu'il n'a pas recu de 2xx
+
+    event_id = models.CharField(max_length=255, unique=True, verbose_name="ID évènement Stripe")
+    event_type = models.CharField(max_length=100, verbose_name="Type")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Évènement Stripe"
+        verbose_name_plural = "Évènements Stripe"
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.event_type} ({self.event_id})"
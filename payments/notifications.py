@@ -0,0 +1,51 @@
+"""
+Bus de notification en mémoire pour les changements de statut des paiements.
+
+Les vues en attente (long-poll) s'abonnent à un paiement ; le service de
+règlement publie après commit. Le bus est propre au processus : avec plusieurs
+workers, un client servi par un autre worker n'est pas réveillé mais relit
+le statut à l'expiration du délai — jamais de statut manqué, seulement une
+réponse plus tardive.
+"""
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+
+class NotificationBus:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners = {}
+
+    @contextmanager
+    def listen(self, key):
+        #----S'abonner AVANT de lire la base : une publication entre la lecture et l'attente n'est pas perdue
+        event = threading.Event()
+        with self._lock:
+            self._listeners.setdefault(key, set()).add(event)
+        try:
+            yield event
+        finally:
+            with self._lock:
+                listeners = self._listeners.get(key)
+                if listeners is not None:
+                    listeners.discard(event)
+                    if not listeners:
+                        del self._listeners[key]
+
+    def publish(self, key):
+        with self._lock:
+            listeners = list(self._listeners.get(key, ()))
+        for event in listeners:
+            event.set()
+
+    def publish_on_commit(self, keys):
+        keys = list(keys)
+        if keys:
+            transaction.on_commit(lambda: [self.publish(key) for key in keys])
+
+
+#-----Bus des paiements, indexe par numero de facture
+payment_bus = NotificationBus()
@@ -0,0 +1,204 @@
+"""
+Clients des passerelles mobile money (TMoney / Flooz).
+
+La demande de paiement (push USSD) est envoyée en arrière-plan : la vue crée
+le paiement 'pending' et rend la main immédiatement, un pool de threads se
+charge de l'appel opérateur.
+
+Chaque opérateur a son client :
+- session HTTP keep-alive partagée (pool de connexions) ;
+- délais de connexion / lecture propres à l'opérateur (settings.MOBILE_MONEY_OPERATORS) ;
+- nouvelles tentatives avec attente exponentielle sur erreur de connexion ou
+  5xx, jamais après un délai de lecture dépassé (l'opérateur a pu recevoir la
+  demande : la renvoyer déclencherait un second push USSD) ; chaque envoi porte
+  l'en-tête Idempotency-Key = numéro de facture, pour les passerelles qui
+  dédoublonnent ;
+- disjoncteur : après plusieurs échecs consécutifs, les appels échouent tout de
+  suite pendant `reset_after` secondes au lieu d'attendre une passerelle en panne.
+
+Format d'appel générique (à adapter à l'API réelle de Togocom / Moov) :
+POST <url>  {"phone", "amount", "reference"}  ->  {"success", "transaction_id", "message"}
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class OperatorError(Exception):
+    pass
+
+
+class CircuitOpenError(OperatorError):
+    pass
+
+
+class CircuitBreaker:
+
+    def __init__(self, threshold=5, reset_after=30):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if time.monotonic() - self._opened_at < self.reset_after:
+                raise CircuitOpenError("Passerelle opérateur indisponible (disjoncteur ouvert).")
+            #----Demi-ouvert : un appel d'essai passe, le prochain echec rouvre le disjoncteur
+            self._opened_at = None
+            self._failures = self.threshold - 1
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+
+
+class OperatorClient:
+
+    retries = 2
+    backoff = 0.5
+    pool_size = 20
+
+    def __init__(self, name, url, api_key='', connect_timeout=3, read_timeout=15):
+        self.name = name
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if api_key:
+            self.session.headers['Authorization'] = f"Bearer {api_key}"
+
+    def push_payment(self, phone, amount, reference):
+        if not self.url:
+            raise OperatorError(f"Passerelle {self.name} non configurée.")
+        self.breaker.before_call()
+        payload = {'phone': phone, 'amount': str(amount), 'reference': reference}
+        headers = {'Idempotency-Key': reference}
+
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.post(self.url, json=payload, headers=headers, timeout=self.timeout)
+                if response.status_code < 500:
+                    self.breaker.record_success()
+                    result = response.json()
+                    if not isinstance(result, dict):
+                        raise ValueError(result)
+                    return result
+                error = OperatorError(f"{self.name} : HTTP {response.status_code}")
+            except requests.ConnectionError as e:
+                #----Inclut ConnectTimeout : demande jamais arrivee, on peut la renvoyer
+                error = OperatorError(f"{self.name} : {e}")
+            except requests.Timeout as e:
+                #----ReadTimeout : demande peut-etre deja traitee, pas de nouvelle tentative
+                self.breaker.record_failure()
+                raise OperatorError(f"{self.name} : {e}")
+            except ValueError:
+                #----Reponse 2xx/4xx illisible ou qui n'est pas un objet JSON : inutile de reessayer
+                self.breaker.record_success()
+                raise OperatorError(f"{self.name} : réponse invalide.")
+            if attempt < self.retries:
+                time.sleep(self.backoff * 2 ** attempt)
+
+        self.breaker.record_failure()
+        raise error
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(method):
+    with _clients_lock:
+        if method not in _clients:
+            config = settings.MOBILE_MONEY_OPERATORS[method]
+            _clients[method] = OperatorClient(method, **config)
+        return _clients[method]
+
+
+# ─── Envoi en arrière-plan ────────────────────────────────────────────────────
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.MOBILE_MONEY_WORKERS,
+                thread_name_prefix='mobile-money',
+            )
+        return _executor
+
+
+def dispatch(payment, phone):
+    #----Apres commit : le thread doit voir le paiement en base
+    transaction.on_commit(lambda: get_executor().submit(send_push, payment.pk, payment.method, phone))
+
+
+def send_push(payment_id, method, phone):
+    """
+    Envoie la demande de paiement à l'opérateur et enregistre le résultat.
+    Exécuté dans le pool de threads : ne lève jamais d'exception.
+    """
+    from . import services
+    from .models import Payment
+
+    close_old_connections()
+    payment = None
+    try:
+        payment = Payment.objects.filter(pk=payment_id, status='pending').only(
+            'pk', 'invoice_number', 'amount'
+        ).first()
+        if payment is None:
+            return
+
+        try:
+            result = get_client(method).push_payment(phone, payment.amount, payment.invoice_number)
+        except OperatorError as e:
+            logger.error(f"Erreur mobile money ({method}) pour {payment.invoice_number} : {e}")
+            services.fail(payment)
+            return
+
+        if result.get('success'):
+            #----En attente de la confirmation USSD du client (callback operateur)
+            Payment.objects.filter(pk=payment.pk, status='pending').update(
+                transaction_id=str(result.get('transaction_id') or '')
+            )
+        else:
+            logger.warning(
+                f"Mobile money refusé ({method}) pour {payment.invoice_number} : {result.get('message', '')}"
+            )
+            services.fail(payment)
+    except Exception:
+        logger.exception(f"Envoi mobile money impossible pour le paiement #{payment_id}")
+        if payment is not None:
+            #----Jamais laisse 'pending' sans suite ; un callback operateur peut encore le regler depuis 'failed'
+            try:
+                services.fail(payment)
+            except Exception:
+                logger.exception(f"Échec du paiement #{payment_id} non enregistré")
+    finally:
+        close_old_connections()
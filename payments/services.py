@@ -0,0 +1,198 @@
+"""
+Règlement des paiements.
+
+Un paiement confirmé (webhook Stripe, callback opérateur, fichier de
+rapprochement) est appliqué à sa cible — réservation, commande de pièce ou
+avance de transport — dans une seule transaction :
+- le paiement passe à 'completed' une seule fois (verrou de ligne + statut) ;
+- la cible est mise à jour par UPDATE ciblés (F() pour les montants) : pas
+  de lecture-modification-écriture, pas d'écrasement des autres colonnes ;
+- les changements de statut passent par les machines à états (orders.states,
+  logistics.states) : gardés et journalisés ;
+- ceux des paiements sont annoncés, après commit, par le même signal
+  workflow.transitions.status_changed (agrégats du reporting).
+
+settle_batch() applique des milliers de confirmations par lots : quelques
+UPDATE par lot et par type de cible, au lieu d'une transaction par paiement.
+"""
+import logging
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from workflow.transitions import status_changed
+
+from .models import Payment
+from .notifications import payment_bus
+
+logger = logging.getLogger(__name__)
+
+#-----Nombre de confirmations traitees par transaction dans settle_batch()
+SETTLE_BATCH_SIZE = 500
+
+#-----Statuts depuis lesquels une confirmation regle le paiement : un echec peut etre suivi d'un succes
+#-----(nouvelle tentative sur le meme PaymentIntent Stripe, confirmation operateur apres un delai depasse) ;
+#-----jamais depuis 'completed' ni 'refunded' (double credit de la cible)
+SETTLEABLE_STATUSES = ('pending', 'failed')
+
+
+# ─── Cibles ───────────────────────────────────────────────────────────────────
+
+def _increment(queryset, field, amounts, now):
+    #----UPDATE ... SET champ = champ + montant : un par montant distinct (le plus souvent un seul par lot)
+    by_amount = defaultdict(list)
+    for pk, amount in amounts.items():
+        by_amount[amount].append(pk)
+    for amount, pks in by_amount.items():
+        queryset.filter(pk__in=pks).update(**{field: F(field) + amount}, updated_at=now)
+
+
+def _apply_to_rentals(amounts, now):
+    from orders.models import Rental
+    from orders.states import RENTAL_MACHINE
+    _increment(Rental.objects, 'amount_paid', amounts, now)
+    RENTAL_MACHINE.apply(
+        Rental.objects.filter(pk__in=list(amounts), amount_paid__gte=F('total_price')),
+        'confirmed',
+    )
+
+
+def _apply_to_orders(amounts, now):
+    from orders.models import SparePartOrder
+    from orders.states import ORDER_MACHINE
+    ORDER_MACHINE.apply(SparePartOrder.objects.filter(pk__in=list(amounts)), 'confirmed')
+
+
+def _apply_to_transports(amounts, now):
+    from logistics import tracking
+    from logistics.models import TransportRequest
+    _increment(TransportRequest.objects, 'advance_paid', amounts, now)
+
+    #----Avance complete : la demande passe a l'etape suivante, comme l'action admin "Avance payée"
+    tracking.transition(
+        TransportRequest.objects.filter(
+            pk__in=list(amounts),
+            advance_required__isnull=False,
+            advance_paid__gte=F('advance_required'),
+        ),
+        'advance_paid',
+    )
+
+
+#-----payment_type -> (champ de reference sur Payment, fonction d'application)
+TARGETS = {
+    'rental': ('rental_id', _apply_to_rentals),
+    'part_order': ('order_id', _apply_to_orders),
+    'transport_advance': ('transport_request_id', _apply_to_transports),
+}
+
+
+def _apply(payments, now):
+    #----Cumule les montants par cible : une cible payee plusieurs fois dans un lot est mise a jour une fois
+    amounts = defaultdict(lambda: defaultdict(Decimal))
+    for payment in payments:
+        target = TARGETS.get(payment.payment_type)
+        if target is None:
+            continue
+        reference = getattr(payment, target[0])
+        if reference:
+            amounts[payment.payment_type][reference] += payment.amount
+    for payment_type, per_target in amounts.items():
+        TARGETS[payment_type][1](per_target, now)
+
+
+def _announce(status, transitions):
+    #----transitions : [(pk, ancien statut), ...]
+    if transitions:
+        transaction.on_commit(lambda: status_changed.send(
+            sender=Payment, status=status, transitions=transitions, actor=None,
+        ))
+
+
+# ─── Règlement ────────────────────────────────────────────────────────────────
+
+def settle(payment, transaction_id=None):
+    """
+    Marque un paiement comme complété et l'applique à sa cible.
+    Retourne False si le paiement était déjà complété ou remboursé (renvoi, doublon).
+    """
+    with transaction.atomic():
+        locked = Payment.objects.select_for_update().filter(pk=payment.pk, status__in=SETTLEABLE_STATUSES).first()
+        if locked is None:
+            return False
+        now = timezone.now()
+        previous = locked.status
+        locked.status = 'completed'
+        if transaction_id:
+            locked.transaction_id = transaction_id
+        locked.save(update_fields=['status', 'transaction_id', 'updated_at'])
+        _apply([locked], now)
+        payment_bus.publish_on_commit([locked.invoice_number])
+        _announce('completed', [(locked.pk, previous)])
+    logger.info(f"Paiement {locked.invoice_number} réglé.")
+    return True
+
+
+def fail(payment):
+    #----Un echec tardif ne remet jamais en cause un paiement deja complete
+    updated = Payment.objects.filter(pk=payment.pk, status='pending').update(status='failed', updated_at=timezone.now())
+    if updated:
+        payment_bus.publish_on_commit([payment.invoice_number])
+        _announce('failed', [(payment.pk, 'pending')])
+    return bool(updated)
+
+
+def settle_batch(confirmations, batch_size=SETTLE_BATCH_SIZE):
+    """
+    Applique une suite de confirmations (invoice_number, transaction_id, succès)
+    — typiquement un fichier de rapprochement opérateur.
+
+    Retourne les compteurs {'settled', 'failed', 'skipped'} : 'skipped' regroupe
+    les références inconnues et les paiements déjà traités.
+    """
+    stats = {'settled': 0, 'failed': 0, 'skipped': 0}
+    batch = []
+    for confirmation in confirmations:
+        batch.append(confirmation)
+        if len(batch) >= batch_size:
+            _settle_chunk(batch, stats)
+            batch = []
+    if batch:
+        _settle_chunk(batch, stats)
+    return stats
+
+
+def _settle_chunk(confirmations, stats):
+    by_invoice = {invoice: (transaction_id, success) for invoice, transaction_id, success in confirmations}
+    with transaction.atomic():
+        now = timezone.now()
+        payments = list(
+            Payment.objects.select_for_update()
+            .filter(invoice_number__in=list(by_invoice), status__in=SETTLEABLE_STATUSES)
+            .only('pk', 'invoice_number', 'payment_type', 'rental_id', 'order_id', 'transport_request_id',
+                  'amount', 'transaction_id', 'status')
+        )
+        settled, failed, relabelled = [], [], []
+        for payment in payments:
+            transaction_id, success = by_invoice[payment.invoice_number]
+            if not success and payment.status == 'failed':
+                continue
+            (settled if success else failed).append(payment)
+            if transaction_id and transaction_id != payment.transaction_id:
+                payment.transaction_id = transaction_id
+                relabelled.append(payment)
+
+        Payment.objects.filter(pk__in=[p.pk for p in settled]).update(status='completed', updated_at=now)
+        Payment.objects.filter(pk__in=[p.pk for p in failed]).update(status='failed', updated_at=now)
+        Payment.objects.bulk_update(relabelled, ['transaction_id'])
+        _apply(settled, now)
+        payment_bus.publish_on_commit(payment.invoice_number for payment in settled + failed)
+        _announce('completed', [(p.pk, p.status) for p in settled])
+        _announce('failed', [(p.pk, 'pending') for p in failed])
+
+    stats['settled'] += len(settled)
+    stats['failed'] += len(failed)
+    stats['skipped'] += len(by_invoice) - len(settled) - len(failed)
@@ -1,3 +1,142 @@
-from django.test import TestCase
+import json
+import multiprocessing
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from django.db import connection, connections
+from django.test import Client, TransactionTestCase
+
+from accounts.models import User
+from catalog.models import Brand, Vehicle, VehicleModel
+from orders.models import Rental
+from orders.tests import run_concurrently
+from payments import operators
+from payments.invoices import next_invoice_number
+from payments.models import Payment, StripeEvent
+from workflow.models import StatusTransition
+
+
+def fake_construct_event(payload, sig_header, secret):
+    #----Signature Stripe non verifiee dans les tests : le corps est l'evenement
+    return json.loads(payload)
+
+
+@mock.patch('stripe.Webhook.construct_event', fake_construct_event)
+class StripeWebhookReplayTests(TransactionTestCase):
+    """
+    Stripe renvoie un évènement tant qu'il n'a pas reçu de 2xx, parfois en
+    parallèle : le journal StripeEvent doit faire régler le paiement une seule fois.
+    """
+
+    def setUp(self):
+        brand = Brand.objects.create(name='Toyota')
+        model = VehicleModel.objects.create(brand=brand, name='Corolla')
+        vehicle = Vehicle.objects.create(
+            title='Corolla', vehicle_type='car', listing_type='rental', brand=brand, model=model,
+            year=2018, fuel='petrol', transmission='manual', condition='used', price=1000000,
+            rental_price_per_day=10000, city='Lomé', country='Togo',
+        )
+        client = User.objects.create_user(username='client', email='client@example.com', password='x')
+        self.rental = Rental.objects.create(
+            client=client, vehicle=vehicle, start_date=date(2030, 1, 1), end_date=date(2030, 1, 3),
+            price_per_day=10000, total_price=20000, status='pending_payment',
+        )
+        self.payment = Payment.objects.create(
+            payment_type='rental', rental_id=self.rental.pk, amount=20000, method='stripe', transaction_id='pi_replay',
+        )
+        self.body = json.dumps({
+            'id': 'evt_replay',
+            'type': 'payment_intent.succeeded',
+            'data': {'object': {'id': 'pi_replay'}},
+        })
+
+    def deliver(self):
+        return Client().post('/api/payments/stripe/webhook/', self.body, content_type='application/json').status_code
+
+    def test_concurrent_replays_settle_once(self):
+        codes = run_concurrently(self.deliver, 100)
+
+        self.assertEqual(codes, [200] * 100)
+        self.assertEqual(StripeEvent.objects.filter(event_id='evt_replay').count(), 1)
+        self.payment.refresh_from_db()
+        self.rental.refresh_from_db()
+        self.assertEqual(self.payment.status, 'completed')
+        self.assertEqual(self.rental.amount_paid, 20000)
+        self.assertEqual(self.rental.status, 'confirmed')
+        self.assertEqual(StatusTransition.objects.for_model(Rental).filter(object_id=self.rental.pk).count(), 1)
+
+
+def generate_invoice_numbers(count):
+    #----Execute dans un processus fils : sa propre connexion, son propre cache de blocs
+    try:
+        return [next_invoice_number() for _ in range(count)]
+    finally:
+        connection.close()
+
+
+def create_payments(count):
+    try:
+        return [
+            Payment.objects.create(payment_type='rental', amount=1000, method='tmoney').invoice_number
+            for _ in range(count)
+        ]
+    finally:
+        connection.close()
+
+
+class InvoiceNumberConcurrencyTests(TransactionTestCase):
+    """
+    Les numéros de facture viennent de blocs réservés par processus sur
+    InvoiceSequence : plusieurs workers ne doivent jamais distribuer le même numéro.
+    """
+    processes = 4
+
+    def run_in_processes(self, target, count):
+        #----fork : les fils heritent de la configuration de la base de test
+        connections.close_all()
+        with multiprocessing.get_context('fork').Pool(self.processes) as pool:
+            results = pool.map(target, [count] * self.processes)
+        return [number for numbers in results for number in numbers]
+
+    def test_numbers_unique_across_processes(self):
+        numbers = self.run_in_processes(generate_invoice_numbers, 500)
+
+        self.assertEqual(len(numbers), 2000)
+        self.assertEqual(len(set(numbers)), 2000)
+
+    def test_payments_created_concurrently_get_distinct_numbers(self):
+        numbers = self.run_in_processes(create_payments, 50)
+
+        self.assertEqual(len(set(numbers)), 200)
+        self.assertEqual(Payment.objects.values('invoice_number').distinct().count(), 200)
+
+
+class OperatorPushTests(TransactionTestCase):
+    """
+    Réponse opérateur inattendue : le paiement passe en échec au lieu de rester
+    'pending' indéfiniment.
+    """
+
+    def setUp(self):
+        self.payment = Payment.objects.create(payment_type='rental', amount=5000, method='tmoney')
+        client = operators.OperatorClient('tmoney', 'http://operator.test/push')
+        mock.patch.dict(operators._clients, {'tmoney': client}).start()
+        self.post = mock.patch.object(client.session, 'post').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def respond(self, body):
+        self.post.return_value = mock.Mock(status_code=200, json=mock.Mock(return_value=body))
+        operators.send_push(self.payment.pk, 'tmoney', '90000000')
+        self.payment.refresh_from_db()
+
+    def test_non_object_response_fails_the_payment(self):
+        self.respond(['ok'])
+
+        self.assertEqual(self.post.call_count, 1)
+        self.assertEqual(self.payment.status, 'failed')
+
+    def test_accepted_push_keeps_the_payment_pending(self):
+        self.respond({'success': True, 'transaction_id': 12345})
+
+        self.assertEqual(self.payment.status, 'pending')
+        self.assertEqual(self.payment.transaction_id, '12345')
@@ -1,13 +1,16 @@
 import stripe
 import logging
 from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from rest_framework import generics, permissions, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from .models import Payment
+from . import operators, services
+from .models import Payment, StripeEvent
+from .notifications import payment_bus
 from .serializers import (
     PaymentSerializer,
     PaymentInitSerializer,
@@ -29,6 +32,9 @@ def get_related_objects(payment_type, reference_id):
     elif payment_type == 'part_order':
         from orders.models import SparePartOrder
         return SparePartOrder.objects.filter(pk=reference_id).first()
+    elif payment_type == 'transport_advance':
+        from logistics.models import TransportRequest
+        return TransportRequest.objects.filter(pk=reference_id).first()
     return None
 
 
@@ -41,6 +47,7 @@ def build_payment_record(request, validated_data, method, transaction_id=''):
         payment_type=validated_data['payment_type'],
         rental_id=validated_data['reference_id'] if validated_data['payment_type'] == 'rental' else None,
         order_id=validated_data['reference_id'] if validated_data['payment_type'] == 'part_order' else None,
+        transport_request_id=validated_data['reference_id'] if validated_data['payment_type'] == 'transport_advance' else None,
         amount=validated_data['amount'],
         currency='XOF',
         method=method,
@@ -156,54 +163,42 @@ class StripeWebhookView(APIView):
         except stripe.error.SignatureVerificationError:
             return Response({"error": "Signature invalide."}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Paiement réussi
-        if event['type'] == 'payment_intent.succeeded':
-            intent = event['data']['object']
-            self._handle_payment_success(intent)
+        handlers = {
+            'payment_intent.succeeded': self._handle_payment_success,
+            'payment_intent.payment_failed': self._handle_payment_failure,
+        }
+        handler = handlers.get(event['type'])
+        if handler is None:
+            return Response({"status": "ok"})
+
+        #-----Journal + traitement dans une seule transaction : un echec annule aussi l'entree du journal
+        #-----et Stripe pourra renvoyer l'evenement
+        with transaction.atomic():
+            try:
+                with transaction.atomic():
+                    StripeEvent.objects.create(event_id=event['id'], event_type=event['type'])
+            except IntegrityError:
+                #----Evenement deja traite (renvoi Stripe) : rien a faire
+                logger.info(f"Évènement Stripe {event['id']} déjà traité.")
+                return Response({"status": "ok"})
 
-        # Paiement échoué
-        elif event['type'] == 'payment_intent.payment_failed':
-            intent = event['data']['object']
-            self._handle_payment_failure(intent)
+            handler(event['data']['object'])
 
         return Response({"status": "ok"})
 
     def _handle_payment_success(self, intent):
         """Marque le paiement comme complété et met à jour la réservation/commande."""
-        try:
-            payment = Payment.objects.get(transaction_id=intent['id'])
-            payment.status = 'completed'
-            payment.save()
-
-            # Mettre à jour le statut de la réservation ou commande liée
-            if payment.payment_type == 'rental' and payment.rental_id:
-                from orders.models import Rental
-                rental = Rental.objects.get(pk=payment.rental_id)
-                rental.amount_paid += payment.amount
-                if rental.amount_paid >= rental.total_price:
-                    rental.status = 'confirmed'
-                rental.save()
-
-            elif payment.payment_type == 'part_order' and payment.order_id:
-                from orders.models import SparePartOrder
-                order = SparePartOrder.objects.get(pk=payment.order_id)
-                order.status = 'confirmed'
-                order.save()
-
-            logger.info(f"Paiement {payment.invoice_number} confirmé via Stripe.")
-
-        except Payment.DoesNotExist:
+        payment = Payment.objects.filter(transaction_id=intent['id']).only('pk', 'invoice_number').first()
+        if payment is None:
             logger.warning(f"Paiement introuvable pour transaction Stripe {intent['id']}")
+            return
+        services.settle(payment)
 
     def _handle_payment_failure(self, intent):
         """Marque le paiement comme échoué."""
-        try:
-            payment = Payment.objects.get(transaction_id=intent['id'])
-            payment.status = 'failed'
-            payment.save()
-            logger.warning(f"Paiement {payment.invoice_number} échoué.")
-        except Payment.DoesNotExist:
-            pass
+        payment = Payment.objects.filter(transaction_id=intent['id']).only('pk', 'invoice_number').first()
+        if payment is not None and services.fail(payment):
+            logger.warning(f"Paiement Stripe {intent['id']} échoué.")
 
 
 # ─── Vue 5 : Paiement Mobile Money (TMoney / Flooz) ──────────────────────────
@@ -250,67 +245,19 @@ class MobileMoneyPaymentView(APIView):
             transaction_id=''  # sera rempli après confirmation opérateur
         )
 
-        # ── Appel API opérateur (à implémenter selon doc officielle) ──────────
-        # Exemple générique — à remplacer par l'API réelle Togocom/Moov
-        try:
-            operator_response = self._call_operator_api(
-                method=data['method'],
-                phone=data['phone_number'],
-                amount=data['amount'],
-                reference=payment.invoice_number,
-            )
-
-            if operator_response.get('success'):
-                payment.transaction_id = operator_response.get('transaction_id', '')
-                payment.status = 'pending'  # En attente confirmation USSD client
-                payment.save()
-
-                return Response({
-                    'message': f"Une demande de paiement {data['method'].upper()} a été envoyée au {data['phone_number']}. Veuillez confirmer sur votre téléphone.",
-                    'payment_id': payment.id,
-                    'invoice_number': payment.invoice_number,
-                    'amount': str(data['amount']),
-                    'method': data['method'],
-                }, status=status.HTTP_201_CREATED)
-
-            else:
-                payment.status = 'failed'
-                payment.save()
-                return Response(
-                    {"error": operator_response.get('message', "Échec de l'initiation du paiement.")},
-                    status=status.HTTP_502_BAD_GATEWAY
-                )
-
-        except Exception as e:
-            logger.error(f"Erreur mobile money ({data['method']}): {e}")
-            payment.status = 'failed'
-            payment.save()
-            return Response(
-                {"error": "Erreur de connexion avec l'opérateur. Veuillez réessayer."},
-                status=status.HTTP_502_BAD_GATEWAY
-            )
+        # ── Appel API opérateur en arrière-plan (payments.operators) ──────────
+        # Le statut final arrive par le callback opérateur ; le frontend suit
+        # l'avancement via /<invoice_number>/status/?wait=...
+        operators.dispatch(payment, data['phone_number'])
 
-    def _call_operator_api(self, method, phone, amount, reference):
-        """
-        Méthode à implémenter selon la documentation officielle
-        de l'opérateur (Togocom pour TMoney, Moov pour Flooz).
-
-        Retourne un dict : {'success': bool, 'transaction_id': str, 'message': str}
-        """
-        # TODO: Remplacer par l'intégration réelle
-        # Exemple de structure d'appel :
-        # import requests
-        # if method == 'tmoney':
-        #     url = "https://api.togocom.tg/payment/push"
-        #     headers = {"Authorization": f"Bearer {settings.TMONEY_API_KEY}"}
-        #     payload = {"phone": phone, "amount": amount, "ref": reference}
-        #     resp = requests.post(url, json=payload, headers=headers)
-        #     return resp.json()
-
-        raise NotImplementedError(
-            "L'intégration TMoney/Flooz doit être implémentée "
-            "selon la documentation officielle de l'opérateur."
-        )
+        return Response({
+            'message': f"Une demande de paiement {data['method'].upper()} a été envoyée au {data['phone_number']}. Veuillez confirmer sur votre téléphone.",
+            'payment_id': payment.id,
+            'invoice_number': payment.invoice_number,
+            'amount': str(data['amount']),
+            'method': data['method'],
+            'status': payment.status,
+        }, status=status.HTTP_201_CREATED)
 
 
 # ─── Vue 6 : Confirmer un paiement mobile money (callback opérateur) ─────────
@@ -333,40 +280,18 @@ class MobileMoneyCallbackView(APIView):
         if not invoice_number:
             return Response({"error": "Référence manquante."}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            payment = Payment.objects.get(invoice_number=invoice_number)
-
-            if callback_status == 'success':
-                payment.status = 'completed'
-                payment.transaction_id = transaction_id or payment.transaction_id
-                payment.save()
-
-                # Mettre à jour la réservation/commande liée
-                if payment.payment_type == 'rental' and payment.rental_id:
-                    from orders.models import Rental
-                    rental = Rental.objects.get(pk=payment.rental_id)
-                    rental.amount_paid += payment.amount
-                    if rental.amount_paid >= rental.total_price:
-                        rental.status = 'confirmed'
-                    rental.save()
-
-                elif payment.payment_type == 'part_order' and payment.order_id:
-                    from orders.models import SparePartOrder
-                    order = SparePartOrder.objects.get(pk=payment.order_id)
-                    order.status = 'confirmed'
-                    order.save()
-
-                logger.info(f"Mobile money confirmé : {payment.invoice_number}")
-                return Response({"status": "ok"})
+        payment = Payment.objects.filter(invoice_number=invoice_number).only('pk', 'invoice_number').first()
+        if payment is None:
+            return Response({"error": "Paiement introuvable."}, status=status.HTTP_404_NOT_FOUND)
 
-            else:
-                payment.status = 'failed'
-                payment.save()
-                logger.warning(f"Mobile money échoué : {payment.invoice_number}")
-                return Response({"status": "failed"})
+        if callback_status == 'success':
+            services.settle(payment, transaction_id=transaction_id)
+            logger.info(f"Mobile money confirmé : {invoice_number}")
+            return Response({"status": "ok"})
 
-        except Payment.DoesNotExist:
-            return Response({"error": "Paiement introuvable."}, status=status.HTTP_404_NOT_FOUND)
+        services.fail(payment)
+        logger.warning(f"Mobile money échoué : {invoice_number}")
+        return Response({"status": "failed"})
 
 
 # ─── Vue 7 : Vérifier le statut d'un paiement ────────────────────────────────
@@ -375,18 +300,43 @@ class PaymentStatusView(APIView):
     """
     GET /api/v1/payments/<invoice_number>/status/
     Permet au frontend de vérifier si un paiement a été confirmé.
+
+    Long-poll avec ?wait=<secondes> : la réponse attend que le statut diffère de
+    ?status= (par défaut le statut courant), au plus `max_wait` secondes.
+    Le service de règlement réveille la requête dès la confirmation.
     """
     permission_classes = [permissions.AllowAny]
+    max_wait = 25
 
     def get(self, request, invoice_number, *args, **kwargs):
+        wait = self._wait_seconds(request)
+        if not wait:
+            payment = Payment.objects.filter(invoice_number=invoice_number).first()
+            return self._respond(payment)
+
+        with payment_bus.listen(invoice_number) as event:
+            payment = Payment.objects.filter(invoice_number=invoice_number).first()
+            known = request.query_params.get('status') or getattr(payment, 'status', None)
+            if payment is None or payment.status != known:
+                return self._respond(payment)
+            #----Relecture aussi a l'expiration : un reglement fait par un autre worker ne reveille pas ce bus
+            event.wait(wait)
+        return self._respond(Payment.objects.filter(invoice_number=invoice_number).first())
+
+    def _wait_seconds(self, request):
         try:
-            payment = Payment.objects.get(invoice_number=invoice_number)
-            return Response({
-                'invoice_number': payment.invoice_number,
-                'status': payment.status,
-                'status_display': payment.get_status_display(),
-                'amount': str(payment.amount),
-                'method': payment.get_method_display(),
-            })
-        except Payment.DoesNotExist:
-            return Response({"error": "Paiement introuvable."}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+            wait = float(request.query_params.get('wait', 0))
+        except ValueError:
+            return 0
+        return max(0, min(wait, self.max_wait))
+
+    def _respond(self, payment):
+        if payment is None:
+            return Response({"error": "Paiement introuvable."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'invoice_number': payment.invoice_number,
+            'status': payment.status,
+            'status_display': payment.get_status_display(),
+            'amount': str(payment.amount),
+            'method': payment.get_method_display(),
+        })
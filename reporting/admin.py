@@ -0,0 +1,32 @@
+from django.contrib import admin
+
+from .models import DailyPartSales, DailyRevenue, DailyVehicleRentals
+
+
+class RollupAdmin(admin.ModelAdmin):
+    #----Tables calculees (reporting.rollups) : consultation seule
+    date_hierarchy = 'day'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(DailyRevenue)
+class DailyRevenueAdmin(RollupAdmin):
+    list_display = ('day', 'method', 'payment_type', 'status', 'payments', 'amount')
+    list_filter = ('method', 'payment_type', 'status')
+
+
+@admin.register(DailyVehicleRentals)
+class DailyVehicleRentalsAdmin(RollupAdmin):
+    list_display = ('day', 'vehicle', 'rentals', 'rental_days', 'revenue')
+    list_select_related = ('vehicle',)
+
+
+@admin.register(DailyPartSales)
+class DailyPartSalesAdmin(RollupAdmin):
+    list_display = ('day', 'part', 'orders', 'quantity', 'revenue')
+    list_select_related = ('part',)
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from reporting.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les agrégats journaliers du tableau de bord (chiffre d'affaires, locations, "
+        "ventes de pièces) à partir des paiements, réservations et commandes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="Premier jour recalculé (AAAA-MM-JJ) ; tout l'historique par défaut")
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError("Date invalide (format attendu : AAAA-MM-JJ).")
+
+        started = time.monotonic()
+        counts = rebuild(since)
+        self.stdout.write(self.style.SUCCESS(
+            f"{counts['revenue']} ligne(s) chiffre d'affaires, {counts['vehicle_rentals']} ligne(s) locations, "
+            f"{counts['part_sales']} ligne(s) pièces en {time.monotonic() - started:.1f} s."
+        ))
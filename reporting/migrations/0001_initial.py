@@ -0,0 +1,81 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('catalog', '0005_vehicle_location_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyPartSales',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Jour de commande')),
+                ('orders', models.IntegerField(default=0, verbose_name='Nb commandes')),
+                ('quantity', models.IntegerField(default=0, verbose_name='Quantité')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Montant (FCFA)')),
+            ],
+            options={
+                'verbose_name': 'Ventes journalières de pièces',
+                'verbose_name_plural': 'Ventes journalières de pièces',
+                'ordering': ['-day', 'part'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRevenue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Jour')),
+                ('method', models.CharField(max_length=20, verbose_name='Moyen de paiement')),
+                ('payment_type', models.CharField(max_length=20, verbose_name='Type')),
+                ('status', models.CharField(max_length=20, verbose_name='Statut')),
+                ('payments', models.IntegerField(default=0, verbose_name='Nb paiements')),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Montant (FCFA)')),
+            ],
+            options={
+                'verbose_name': "Chiffre d'affaires journalier",
+                'verbose_name_plural': "Chiffre d'affaires journalier",
+                'ordering': ['-day', 'method', 'payment_type', 'status'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyVehicleRentals',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(verbose_name='Jour de début')),
+                ('rentals', models.IntegerField(default=0, verbose_name='Nb réservations')),
+                ('rental_days', models.IntegerField(default=0, verbose_name='Jours loués')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Montant (FCFA)')),
+                ('vehicle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.vehicle', verbose_name='Véhicule')),
+            ],
+            options={
+                'verbose_name': 'Locations journalières par véhicule',
+                'verbose_name_plural': 'Locations journalières par véhicule',
+                'ordering': ['-day', 'vehicle'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='dailyrevenue',
+            constraint=models.UniqueConstraint(fields=('day', 'method', 'payment_type', 'status'), name='daily_revenue_key'),
+        ),
+        migrations.AddField(
+            model_name='dailypartsales',
+            name='part',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.sparepart', verbose_name='Pièce'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyvehiclerentals',
+            constraint=models.UniqueConstraint(fields=('day', 'vehicle'), name='daily_vehicle_rentals_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailypartsales',
+            constraint=models.UniqueConstraint(fields=('day', 'part'), name='daily_part_sales_key'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+from django.db import models
+
+from catalog.models import SparePart, Vehicle
+
+
+class DailyRevenue(models.Model):
+    """
+    Paiements du jour (date de création) par moyen, type et statut.
+    Un paiement qui change de statut passe d'une ligne à l'autre.
+    """
+    day = models.DateField(verbose_name="Jour")
+    method = models.CharField(max_length=20, verbose_name="Moyen de paiement")
+    payment_type = models.CharField(max_length=20, verbose_name="Type")
+    status = models.CharField(max_length=20, verbose_name="Statut")
+    payments = models.IntegerField(default=0, verbose_name="Nb paiements")
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Montant (FCFA)")
+
+    class Meta:
+        verbose_name = "Chiffre d'affaires journalier"
+        verbose_name_plural = "Chiffre d'affaires journalier"
+        ordering = ['-day', 'method', 'payment_type', 'status']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'method', 'payment_type', 'status'], name='daily_revenue_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.method}/{self.payment_type}/{self.status} : {self.amount}"
+
+
+class DailyVehicleRentals(models.Model):
+    """
+    Réservations confirmées par véhicule et par jour de début de location.
+    """
+    day = models.DateField(verbose_name="Jour de début")
+    vehicle = models.ForeignKey(Vehicle, on_delete=models.CASCADE, related_name='+', verbose_name="Véhicule")
+    rentals = models.IntegerField(default=0, verbose_name="Nb réservations")
+    rental_days = models.IntegerField(default=0, verbose_name="Jours loués")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Montant (FCFA)")
+
+    class Meta:
+        verbose_name = "Locations journalières par véhicule"
+        verbose_name_plural = "Locations journalières par véhicule"
+        ordering = ['-day', 'vehicle']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'vehicle'], name='daily_vehicle_rentals_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} véhicule #{self.vehicle_id} : {self.rental_days} j"
+
+
+class DailyPartSales(models.Model):
+    """
+    Commandes de pièces confirmées par pièce et par jour de commande.
+    """
+    day = models.DateField(verbose_name="Jour de commande")
+    part = models.ForeignKey(SparePart, on_delete=models.CASCADE, related_name='+', verbose_name="Pièce")
+    orders = models.IntegerField(default=0, verbose_name="Nb commandes")
+    quantity = models.IntegerField(default=0, verbose_name="Quantité")
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Montant (FCFA)")
+
+    class Meta:
+        verbose_name = "Ventes journalières de pièces"
+        verbose_name_plural = "Ventes journalières de pièces"
+        ordering = ['-day', 'part']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'part'], name='daily_part_sales_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.day} pièce #{self.part_id} : {self.quantity}"
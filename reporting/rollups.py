@@ -0,0 +1,174 @@
+"""
+Agrégats journaliers du tableau de bord : DailyRevenue, DailyVehicleRentals,
+DailyPartSales.
+
+Tenus à jour au fil de l'eau à partir des évènements (voir reporting.signals) :
+- création d'un paiement ;
+- changements de statut (workflow.transitions.status_changed), envoyés après
+  commit par les machines à états et par payments.services.
+Chaque évènement se traduit par des deltas (F() + n) sur les lignes concernées,
+sans relire l'historique.
+
+rebuild() recalcule tout depuis les tables sources (commande rebuild_rollups) :
+initialisation, ou rattrapage après une correction manuelle d'un statut.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from orders.models import Rental, SparePartOrder
+from payments.models import Payment
+
+from .models import DailyPartSales, DailyRevenue, DailyVehicleRentals
+
+#-----Statuts comptes dans les ventes : une reservation / commande y entre a la confirmation, en sort a l'annulation
+RENTAL_COUNTED = ('confirmed', 'active', 'completed')
+ORDER_COUNTED = ('confirmed', 'preparing', 'out_for_delivery', 'delivered')
+
+REVENUE_KEY = ('day', 'method', 'payment_type', 'status')
+RENTALS_KEY = ('day', 'vehicle_id')
+PARTS_KEY = ('day', 'part_id')
+
+
+def _deltas():
+    return defaultdict(lambda: defaultdict(int))
+
+
+def _add(deltas, key, sign, **metrics):
+    for name, value in metrics.items():
+        deltas[key][name] += sign * value
+
+
+def _apply(model, key_fields, deltas):
+    #----Lignes manquantes creees a zero, puis un UPDATE ... SET x = x + delta par ligne touchee
+    deltas = {key: metrics for key, metrics in deltas.items() if any(metrics.values())}
+    if not deltas:
+        return
+    with transaction.atomic():
+        model.objects.bulk_create(
+            [model(**dict(zip(key_fields, key))) for key in deltas],
+            ignore_conflicts=True,
+        )
+        for key, metrics in deltas.items():
+            model.objects.filter(**dict(zip(key_fields, key))).update(
+                **{name: F(name) + value for name, value in metrics.items()}
+            )
+
+
+# ─── Évènements ───────────────────────────────────────────────────────────────
+
+def payment_created(payment):
+    deltas = _deltas()
+    key = (timezone.localdate(payment.created_at), payment.method, payment.payment_type, payment.status)
+    _add(deltas, key, 1, payments=1, amount=payment.amount)
+    _apply(DailyRevenue, REVENUE_KEY, deltas)
+
+
+def payments_changed(status, transitions):
+    previous = dict(transitions)
+    deltas = _deltas()
+    rows = Payment.objects.filter(pk__in=list(previous)).values_list(
+        'pk', 'created_at', 'method', 'payment_type', 'amount'
+    )
+    for pk, created_at, method, payment_type, amount in rows:
+        day = timezone.localdate(created_at)
+        _add(deltas, (day, method, payment_type, previous[pk]), -1, payments=1, amount=amount)
+        _add(deltas, (day, method, payment_type, status), 1, payments=1, amount=amount)
+    _apply(DailyRevenue, REVENUE_KEY, deltas)
+
+
+def _crossing(transitions, status, counted):
+    #----Seules comptent les lignes qui entrent dans (ou sortent de) l'ensemble des statuts comptes
+    return [pk for pk, previous in transitions if (previous in counted) != (status in counted)]
+
+
+def rentals_changed(status, transitions):
+    pks = _crossing(transitions, status, RENTAL_COUNTED)
+    if not pks:
+        return
+    sign = 1 if status in RENTAL_COUNTED else -1
+    deltas = _deltas()
+    rows = Rental.objects.filter(pk__in=pks).values_list('start_date', 'end_date', 'vehicle_id', 'total_price')
+    for start_date, end_date, vehicle_id, total_price in rows:
+        _add(deltas, (start_date, vehicle_id), sign,
+             rentals=1, rental_days=(end_date - start_date).days, revenue=total_price)
+    _apply(DailyVehicleRentals, RENTALS_KEY, deltas)
+
+
+def orders_changed(status, transitions):
+    pks = _crossing(transitions, status, ORDER_COUNTED)
+    if not pks:
+        return
+    sign = 1 if status in ORDER_COUNTED else -1
+    deltas = _deltas()
+    rows = SparePartOrder.objects.filter(pk__in=pks).values_list('created_at', 'part_id', 'quantity', 'total_price')
+    for created_at, part_id, quantity, total_price in rows:
+        _add(deltas, (timezone.localdate(created_at), part_id), sign,
+             orders=1, quantity=quantity, revenue=total_price)
+    _apply(DailyPartSales, PARTS_KEY, deltas)
+
+
+#-----Modele emetteur de status_changed -> mise a jour des agregats
+HANDLERS = {
+    'payments.Payment': payments_changed,
+    'orders.Rental': rentals_changed,
+    'orders.SparePartOrder': orders_changed,
+}
+
+
+def status_changed(model, status, transitions):
+    handler = HANDLERS.get(model._meta.label)
+    if handler is not None:
+        handler(status, transitions)
+
+
+# ─── Reconstruction ───────────────────────────────────────────────────────────
+
+def rebuild(start=None):
+    """
+    Recalcule les agrégats à partir du jour `start` inclus (tout l'historique si None),
+    par GROUP BY sur les tables sources. Retourne le nombre de lignes écrites par table.
+    """
+    payments = Payment.objects.annotate(day=TruncDate('created_at'))
+    rentals = Rental.objects.filter(status__in=RENTAL_COUNTED)
+    orders = SparePartOrder.objects.filter(status__in=ORDER_COUNTED).annotate(day=TruncDate('created_at'))
+    if start is not None:
+        payments = payments.filter(day__gte=start)
+        rentals = rentals.filter(start_date__gte=start)
+        orders = orders.filter(day__gte=start)
+
+    revenue = [
+        DailyRevenue(**row)
+        for row in payments.order_by().values(*REVENUE_KEY).annotate(payments=Count('pk'), amount=Sum('amount'))
+    ]
+    vehicle_rentals = [
+        DailyVehicleRentals(
+            day=row['start_date'], vehicle_id=row['vehicle_id'], rentals=row['rentals'],
+            rental_days=row['duration'].days, revenue=row['revenue'],
+        )
+        for row in rentals.order_by().values('start_date', 'vehicle_id').annotate(
+            rentals=Count('pk'),
+            duration=Sum(ExpressionWrapper(F('end_date') - F('start_date'), output_field=DurationField())),
+            revenue=Sum('total_price'),
+        )
+    ]
+    part_sales = [
+        DailyPartSales(**row)
+        for row in orders.order_by().values('day', 'part_id').annotate(
+            orders=Count('pk'), quantity=Sum('quantity'), revenue=Sum('total_price'),
+        )
+    ]
+
+    with transaction.atomic():
+        for model, rows in ((DailyRevenue, revenue), (DailyVehicleRentals, vehicle_rentals), (DailyPartSales, part_sales)):
+            stale = model.objects.all() if start is None else model.objects.filter(day__gte=start)
+            stale.delete()
+            model.objects.bulk_create(rows, batch_size=1000)
+    return {
+        'revenue': len(revenue),
+        'vehicle_rentals': len(vehicle_rentals),
+        'part_sales': len(part_sales),
+    }
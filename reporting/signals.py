@@ -0,0 +1,32 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from payments.models import Payment
+from workflow.transitions import status_changed
+
+from . import rollups
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=Payment)
+def count_new_payment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        transaction.on_commit(lambda: _safely(rollups.payment_created, instance))
+
+
+@receiver(status_changed)
+def update_rollups(sender, status, transitions, **kwargs):
+    #----Deja apres commit (voir workflow.transitions)
+    _safely(rollups.status_changed, sender, status, transitions)
+
+
+def _safely(func, *args):
+    #----Un agregat en erreur ne fait pas echouer la requete : rebuild_rollups rattrape l'ecart
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("Mise à jour des agrégats de reporting impossible")
@@ -0,0 +1,109 @@
+from django.db.models import Sum
+from django.utils import timezone
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from catalog.models import SparePart, Vehicle
+from catalog.params import date_param
+from payments.models import Payment
+
+from .models import DailyPartSales, DailyRevenue, DailyVehicleRentals
+
+
+class DashboardView(APIView):
+    """
+    GET /api/v1/reporting/dashboard/?from=AAAA-MM-JJ&to=AAAA-MM-JJ
+    Tableau de bord admin (bornes incluses, par défaut le mois en cours).
+    Ne lit que les agrégats journaliers (reporting.rollups), jamais les paiements ou commandes.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    top = 10
+    max_days = 366
+
+    def get(self, request, *args, **kwargs):
+        today = timezone.localdate()
+        start = date_param(request.query_params, 'from', today.replace(day=1))
+        end = date_param(request.query_params, 'to', today)
+        if end < start:
+            raise ValidationError({'to': "La date de fin doit suivre la date de début."})
+        if (end - start).days >= self.max_days:
+            raise ValidationError({'to': f"Période limitée à {self.max_days} jours."})
+
+        period = {'day__gte': start, 'day__lte': end}
+        return Response({
+            'from': start,
+            'to': end,
+            'revenue': self._revenue(DailyRevenue.objects.filter(**period)),
+            'rentals': self._rentals(DailyVehicleRentals.objects.filter(**period)),
+            'parts': self._parts(DailyPartSales.objects.filter(**period)),
+        })
+
+    def _revenue(self, rows):
+        methods = dict(Payment.METHOD_CHOICES)
+        types = dict(Payment.TYPE_CHOICES)
+        statuses = dict(Payment.STATUS_CHOICES)
+        completed = rows.filter(status='completed').order_by()
+        total = completed.aggregate(amount=Sum('amount'), payments=Sum('payments'))
+        return {
+            'total': total['amount'] or 0,
+            'payments': total['payments'] or 0,
+            'by_day': list(
+                completed.values('day', 'method')
+                .annotate(amount=Sum('amount'), payments=Sum('payments'))
+                .order_by('day', 'method')
+            ),
+            'by_method': [
+                dict(row, label=methods.get(row['method'], row['method']))
+                for row in completed.values('method').annotate(amount=Sum('amount'), payments=Sum('payments'))
+                .order_by('-amount')
+            ],
+            'by_payment_type': [
+                dict(row, label=types.get(row['payment_type'], row['payment_type']))
+                for row in completed.values('payment_type').annotate(amount=Sum('amount'), payments=Sum('payments'))
+                .order_by('-amount')
+            ],
+            'by_status': [
+                dict(row, label=statuses.get(row['status'], row['status']))
+                for row in rows.order_by().values('status').annotate(amount=Sum('amount'), payments=Sum('payments'))
+                .order_by('status')
+            ],
+        }
+
+    def _rentals(self, rows):
+        totals = rows.order_by().aggregate(rentals=Sum('rentals'), rental_days=Sum('rental_days'), revenue=Sum('revenue'))
+        return {
+            'rentals': totals['rentals'] or 0,
+            'rental_days': totals['rental_days'] or 0,
+            'revenue': totals['revenue'] or 0,
+            'top_vehicles': self._with_titles(
+                rows.values('vehicle_id')
+                .annotate(rentals=Sum('rentals'), rental_days=Sum('rental_days'), revenue=Sum('revenue'))
+                .order_by('-rental_days', 'vehicle_id')[:self.top],
+                Vehicle, 'vehicle_id', 'vehicle__title',
+            ),
+        }
+
+    def _parts(self, rows):
+        totals = rows.order_by().aggregate(orders=Sum('orders'), quantity=Sum('quantity'), revenue=Sum('revenue'))
+        return {
+            'orders': totals['orders'] or 0,
+            'quantity': totals['quantity'] or 0,
+            'revenue': totals['revenue'] or 0,
+            'top_parts': self._with_titles(
+                rows.values('part_id')
+                .annotate(orders=Sum('orders'), quantity=Sum('quantity'), revenue=Sum('revenue'))
+                .order_by('-quantity', 'part_id')[:self.top],
+                SparePart, 'part_id', 'part__title',
+            ),
+        }
+
+    def _with_titles(self, rows, model, key, label):
+        #----Titres lus a part par cle primaire (top N seulement) : l'agregat ne joint pas le catalogue
+        rows = list(rows)
+        titles = model.objects.only('title').in_bulk([row[key] for row in rows])
+        for row in rows:
+            item = titles.get(row[key])
+            row[label] = item.title if item else None
+        return rows
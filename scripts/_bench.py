@@ -0,0 +1,50 @@
+"""
+Outils communs des scripts de mesure (scripts/bench_*.py).
+
+Chaque script tourne sur une base SQLite temporaire, migrée au démarrage, et un
+MEDIA_ROOT temporaire : jamais sur db.sqlite3 ni sur les médias réels.
+Lancement depuis la racine du dépôt : python scripts/bench_<nom>.py [options]
+"""
+import atexit
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup():
+    """Configure Django sur une base temporaire migrée ; retourne le dossier de travail (supprimé en sortie)."""
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    workdir = tempfile.mkdtemp(prefix='bench-')
+    atexit.register(shutil.rmtree, workdir, True)
+
+    import django
+    from django.conf import settings
+    settings.DATABASES['default']['NAME'] = os.path.join(workdir, 'bench.sqlite3')
+    settings.MEDIA_ROOT = os.path.join(workdir, 'media')
+    settings.ALLOWED_HOSTS = ['*']
+    django.setup()
+
+    from django.core.management import call_command
+    call_command('migrate', verbosity=0)
+    return workdir
+
+
+def measure(fn, repeat=5):
+    #----Mediane en ms de `repeat` appels (apres un appel de chauffe)
+    fn()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def report(label, value, unit='ms'):
+    print(f"{label:<60} {value:>10,.1f} {unit}")
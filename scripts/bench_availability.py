@@ -0,0 +1,155 @@
+"""
+Mesure du contrôle de disponibilité (orders.availability) et du filtre du
+catalogue (?available_from=&available_to=) quand l'historique des véhicules grandit.
+
+Jeu de données réaliste : chaque véhicule a quelques réservations à venir
+(confirmées, en attente de paiement, en cours) et un historique passé qui
+grossit par paliers, presque entièrement terminé, le reste annulé. Les dates
+demandées tombent dans les semaines à venir, là où sont les réservations
+bloquantes. À chaque palier : ANALYZE, coût moyen de is_available par véhicule,
+puis page de liste filtrée (avec COUNT) et facettes, cache catalogue vidé avant
+chaque appel.
+
+    python scripts/bench_availability.py [--vehicles 2000] [--history 10,100,500]
+"""
+import argparse
+import random
+import time
+from datetime import timedelta
+
+import _bench
+
+BATCH = 100000
+UPCOMING_STATUSES = ['confirmed', 'confirmed', 'pending_payment']
+
+
+def insert_rentals(rows):
+    from django.db import connection, transaction
+    from orders.models import Rental
+
+    #----INSERT brut : bulk_create est limite a ~70 lignes par requete sur SQLite (999 parametres)
+    sql = (
+        f"INSERT INTO {Rental._meta.db_table} (client_id, vehicle_id, start_date, end_date, delivery_mode, "
+        f"delivery_address, price_per_day, total_price, amount_paid, status, admin_note, created_at, updated_at) "
+        f"VALUES (%s, %s, %s, %s, 'pickup', '', 20000, 20000, 0, %s, '', '2024-01-01', '2024-01-01')"
+    )
+    with connection.cursor() as cursor:
+        for offset in range(0, len(rows), BATCH):
+            with transaction.atomic():
+                cursor.executemany(sql, rows[offset:offset + BATCH])
+
+
+def populate(vehicles, today, rng):
+    from accounts.models import User
+    from catalog.models import Brand, Vehicle, VehicleModel
+
+    brand = Brand.objects.create(name='Toyota')
+    model = VehicleModel.objects.create(brand=brand, name='Corolla')
+    client = User.objects.create_user(username='bench', email='bench@example.com', password='bench')
+    Vehicle.objects.bulk_create([
+        Vehicle(
+            title=f'Corolla {i}', vehicle_type='car', listing_type='rental', brand=brand, model=model,
+            year=2015, fuel='petrol', transmission='manual', condition='used', price=1000000 + i,
+            rental_price_per_day=20000, city='Lomé', city_key='lome', country='Togo', country_key='togo',
+        )
+        for i in range(vehicles)
+    ], batch_size=2000)
+
+    #----Reservations a venir : une en cours pour un vehicule sur dix, puis 0 a 3 dans les 60 jours
+    rows = []
+    vehicle_ids = list(Vehicle.objects.values_list('pk', flat=True))
+    for vehicle_id in vehicle_ids:
+        day = today
+        if rng.random() < 0.1:
+            end = today + timedelta(days=rng.randint(1, 4))
+            rows.append((client.pk, vehicle_id, today - timedelta(days=2), end, 'active'))
+            day = end
+        for _ in range(rng.randint(0, 3)):
+            start = day + timedelta(days=rng.randint(0, 15))
+            day = start + timedelta(days=rng.randint(1, 7))
+            rows.append((client.pk, vehicle_id, start, day, rng.choice(UPCOMING_STATUSES)))
+    insert_rentals(rows)
+    return client, vehicle_ids
+
+
+def grow_history(client, vehicle_ids, earliest, count, rng):
+    #----Historique passe ajoute vers l'arriere : 95 % terminees, 5 % annulees
+    rows = []
+    for vehicle_id in vehicle_ids:
+        day = earliest[vehicle_id]
+        for _ in range(count):
+            end = day - timedelta(days=rng.randint(0, 3))
+            day = end - timedelta(days=rng.randint(1, 5))
+            rows.append((client.pk, vehicle_id, day, end, 'cancelled' if rng.random() < 0.05 else 'completed'))
+        earliest[vehicle_id] = day
+    insert_rentals(rows)
+
+
+def per_vehicle_check(vehicle_ids, start, end):
+    from orders.availability import is_available
+
+    started = time.perf_counter()
+    for vehicle_id in vehicle_ids:
+        is_available(vehicle_id, start, end)
+    return (time.perf_counter() - started) * 1000 / len(vehicle_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--vehicles', type=int, default=2000)
+    parser.add_argument('--history', default='10,100,500', help="réservations passées par véhicule, par palier")
+    args = parser.parse_args()
+
+    _bench.setup()
+    from django.core.cache import caches
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+    from django.utils import timezone
+    from orders.models import Rental
+
+    rng = random.Random(1)
+    today = timezone.localdate()
+    client, vehicle_ids = populate(args.vehicles, today, rng)
+    earliest = dict.fromkeys(vehicle_ids, today - timedelta(days=3))
+    start, end = today + timedelta(days=10), today + timedelta(days=14)
+    period = f'available_from={start}&available_to={end}'
+
+    http = Client()
+    cache = caches['catalog']
+
+    def get(url):
+        cache.clear()
+        response = http.get(url)
+        assert response.status_code == 200, response.status_code
+        return response
+
+    history = 0
+    for target in [int(value) for value in args.history.split(',')]:
+        grow_history(client, vehicle_ids, earliest, target - history, rng)
+        history = target
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        print(f"\n{args.vehicles:,} véhicules, {history} réservations passées chacun, "
+              f"{Rental.objects.count():,} réservations")
+        _bench.report('is_available, par véhicule', per_vehicle_check(vehicle_ids, start, end))
+        for label, url in [
+            ('liste filtrée (page 1 + COUNT)', f'/api/catalog/vehicles/?{period}'),
+            ('liste filtrée triée par prix', f'/api/catalog/vehicles/?{period}&ordering=price'),
+            ('liste filtrée keyset (sans COUNT)', f'/api/catalog/vehicles/?{period}&pagination=cursor'),
+            ('facettes', f'/api/catalog/vehicles/facets/?{period}'),
+        ]:
+            _bench.report(label, _bench.measure(lambda: get(url)))
+
+    with CaptureQueriesContext(connection) as queries:
+        get(f'/api/catalog/vehicles/?{period}')
+    sql = next(query['sql'] for query in queries if 'orders_rental' in query['sql'])
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        print('\nPlan :')
+        for row in cursor.fetchall():
+            print('  ', row[-1])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Mesure de l'import en masse du catalogue (catalog.importer).
+
+Génère un CSV de véhicules (0,1 % de prix invalides, rejetés) et un JSONL de
+pièces compatibles, puis importe chaque fichier deux fois : première passe en
+création, seconde en mise à jour des mêmes external_ref.
+
+    python scripts/bench_import.py [--rows 100000]
+"""
+import argparse
+import json
+import os
+import random
+import time
+
+import _bench
+
+BRANDS = {
+    'Toyota': ['Corolla', 'Yaris', 'RAV4', 'Hilux'],
+    'Honda': ['Civic', 'CR-V'],
+    'Peugeot': ['208', '308', '3008'],
+    'Kia': ['Rio', 'Sportage'],
+}
+CITIES = ['Lomé', 'Kara', 'Sokodé']
+
+
+def write_vehicles(path, rows, rng):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        f.write('external_ref,brand,model,title,vehicle_type,listing_type,year,mileage,price,'
+                'fuel,transmission,condition,city,description\n')
+        for i in range(rows):
+            brand = rng.choice(list(BRANDS))
+            model = rng.choice(BRANDS[brand])
+            price = 'n/a' if i % 1000 == 0 else rng.randint(1, 30) * 500000
+            f.write(
+                f'V{i},{brand},{model},{brand} {model} {i},car,sale,{rng.randint(2000, 2024)},'
+                f'{rng.randint(0, 200000)},{price},petrol,manual,used,{rng.choice(CITIES)},Véhicule importé numéro {i}\n'
+            )
+
+
+def write_parts(path, rows, rng):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(rows):
+            brand = rng.choice(list(BRANDS))
+            f.write(json.dumps({
+                'external_ref': f'P{i}', 'title': f'Pièce {i}', 'reference': f'REF-{i}',
+                'price': str(rng.randint(1, 100) * 1000), 'stock_quantity': rng.randint(0, 5),
+                'condition': 'new', 'description': 'Pièce', 'compatible_brands': [brand],
+                'compatible_models': [f'{brand}/{BRANDS[brand][0]}'],
+            }) + '\n')
+
+
+def run(label, kind, path, fmt):
+    from catalog import importer
+
+    with open(path, newline='', encoding='utf-8') as stream:
+        started = time.monotonic()
+        report = importer.import_catalog(kind, stream, fmt).as_dict()
+        elapsed = time.monotonic() - started
+    _bench.report(label, report['rows'] / elapsed, 'lignes/s')
+    print(f"    {report['created']} créés, {report['updated']} mis à jour, {report['rejected']} rejetés en {elapsed:.1f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    workdir = _bench.setup()
+    rng = random.Random(1)
+    vehicles = os.path.join(workdir, 'vehicles.csv')
+    parts = os.path.join(workdir, 'parts.jsonl')
+    write_vehicles(vehicles, args.rows, rng)
+    write_parts(parts, args.rows, rng)
+
+    run('véhicules CSV, création', 'vehicles', vehicles, 'csv')
+    run('véhicules CSV, mise à jour', 'vehicles', vehicles, 'csv')
+    run('pièces JSONL, création', 'parts', parts, 'jsonl')
+    run('pièces JSONL, mise à jour', 'parts', parts, 'jsonl')
+
+
+if __name__ == '__main__':
+    main()
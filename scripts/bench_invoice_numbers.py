@@ -0,0 +1,84 @@
+"""
+Mesure de la numérotation des factures (payments.invoices) sur plusieurs processus.
+
+Deux passes, chaque processus ayant sa propre connexion et son propre cache de
+blocs, comme des workers gunicorn :
+- génération seule : --numbers numéros répartis sur --processes processus,
+  vérification qu'aucun numéro n'est distribué deux fois ;
+- insertion : --payments paiements créés (Payment.save tire le numéro), débit
+  en lignes/s et unicité vérifiée en base.
+
+    python scripts/bench_invoice_numbers.py [--processes 8] [--numbers 1000000] [--payments 20000]
+"""
+import argparse
+import multiprocessing
+import time
+
+import _bench
+
+
+def generate(count):
+    from django.db import connection
+    from payments.invoices import next_invoice_number
+
+    try:
+        return [next_invoice_number() for _ in range(count)]
+    finally:
+        connection.close()
+
+
+def insert(count):
+    from django.db import connection
+    from payments.models import Payment
+
+    try:
+        for _ in range(count):
+            Payment.objects.create(payment_type='rental', amount=1000, method='tmoney')
+        return count
+    finally:
+        connection.close()
+
+
+def run(target, total, processes):
+    #----fork : les fils heritent de la configuration Django (base temporaire) ; aucune connexion partagee
+    from django.db import connections
+
+    connections.close_all()
+    share, extra = divmod(total, processes)
+    counts = [share + (1 if i < extra else 0) for i in range(processes)]
+    started = time.perf_counter()
+    with multiprocessing.get_context('fork').Pool(processes) as pool:
+        results = pool.map(target, counts)
+    return results, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--numbers', type=int, default=1000000)
+    parser.add_argument('--payments', type=int, default=20000)
+    args = parser.parse_args()
+
+    _bench.setup()
+    from payments.invoices import INVOICE_BLOCK_SIZE
+    from payments.models import InvoiceSequence, Payment
+
+    print(f"{args.processes} processus, blocs de {INVOICE_BLOCK_SIZE} numéros")
+
+    results, elapsed = run(generate, args.numbers, args.processes)
+    numbers = [number for chunk in results for number in chunk]
+    duplicates = len(numbers) - len(set(numbers))
+    _bench.report(f'génération de {len(numbers):,} numéros', len(numbers) / elapsed, 'numéros/s')
+    print(f"    {duplicates} doublon(s) en {elapsed:.1f} s, séquence à {InvoiceSequence.objects.get().last_value:,}")
+    assert duplicates == 0
+
+    results, elapsed = run(insert, args.payments, args.processes)
+    created = sum(results)
+    distinct = Payment.objects.values('invoice_number').distinct().count()
+    _bench.report(f'insertion de {created:,} paiements', created / elapsed, 'lignes/s')
+    print(f"    {distinct:,} numéros distincts en base en {elapsed:.1f} s")
+    assert distinct == created
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Mesure des recherches de paiements sur le chemin critique (webhook Stripe,
+callbacks opérateurs, règlement d'une réservation) à volume croissant.
+
+La table est remplie par INSERT en masse jusqu'à chaque palier, puis ANALYZE ;
+chaque mesure est la moyenne de 1000 recherches sur des clés réparties.
+
+    python scripts/bench_payment_lookups.py [--sizes 10000,1000000,3000000]
+"""
+import argparse
+import time
+
+import _bench
+
+BATCH = 100000
+RENTALS = 50000
+
+
+def seed(upto):
+    from django.db import connection, transaction
+    from payments.models import Payment
+
+    count = Payment.objects.count()
+    #----INSERT brut : bulk_create est limite a ~70 lignes par requete sur SQLite (999 parametres)
+    sql = (
+        f"INSERT INTO {Payment._meta.db_table} (client_name, client_email, payment_type, rental_id, amount, "
+        f"currency, method, transaction_id, status, invoice_number, admin_note, created_at, updated_at) "
+        f"VALUES ('', '', 'rental', %s, 1000, 'XOF', 'stripe', %s, 'pending', %s, '', '2024-01-01', '2024-01-01')"
+    )
+    with connection.cursor() as cursor:
+        while count < upto:
+            size = min(BATCH, upto - count)
+            with transaction.atomic():
+                cursor.executemany(sql, [(i % RENTALS, f'pi_{i}', f'FAC-B-{i:09d}') for i in range(count, count + size)])
+            count += size
+        cursor.execute('ANALYZE')
+
+
+def per_lookup(fn, count=1000):
+    started = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    return (time.perf_counter() - started) * 1000 / count
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', default='10000,1000000,3000000')
+    args = parser.parse_args()
+
+    _bench.setup()
+    from django.db import connection
+    from payments.models import Payment
+
+    for size in [int(value) for value in args.sizes.split(',')]:
+        seed(size)
+        print(f"\n{size:,} paiements")
+        _bench.report('transaction_id (webhook / callback)', per_lookup(
+            lambda i: Payment.objects.filter(transaction_id=f'pi_{(i * 7919) % size}').only('pk').first()
+        ))
+        _bench.report('invoice_number (suivi du statut)', per_lookup(
+            lambda i: Payment.objects.filter(invoice_number=f'FAC-B-{(i * 7919) % size:09d}').only('pk').first()
+        ))
+        _bench.report('paiements d\'une réservation', per_lookup(
+            lambda i: list(Payment.objects.filter(payment_type='rental', rental_id=i % RENTALS).values_list('pk', flat=True))
+        ))
+
+    query = Payment.objects.filter(transaction_id='pi_1').only('pk')
+    print('\nPlan (transaction_id) :', query.explain())
+
+
+if __name__ == '__main__':
+    main()
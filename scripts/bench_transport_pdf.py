@@ -0,0 +1,103 @@
+"""
+Mesure du téléchargement de la fiche PDF d'une demande de transport.
+
+Trois cas : rendu ReportLab à la demande (fichier absent), fichier déjà rendu
+servi depuis le disque, et revalidation If-None-Match -> 304. Vérifie ensuite
+qu'une nouvelle étape de suivi produit une nouvelle version (ETag différent)
+et qu'une seule version reste sur disque.
+
+    python scripts/bench_transport_pdf.py [--steps 12]
+"""
+import argparse
+import glob
+import os
+import time
+
+import _bench
+
+
+def populate(steps):
+    from catalog.models import Brand, Vehicle, VehicleModel
+    from logistics.models import TransportRequest, TransportStep, TransportZone
+
+    brand = Brand.objects.create(name='Toyota')
+    model = VehicleModel.objects.create(brand=brand, name='Corolla')
+    vehicle = Vehicle.objects.create(
+        title='Corolla', vehicle_type='car', listing_type='sale', brand=brand, model=model,
+        year=2018, fuel='petrol', transmission='manual', condition='used', price=1000000,
+        city='Lomé', country='Togo',
+    )
+    zone = TransportZone.objects.create(
+        name='Europe', countries='France\nBelgique', base_price=500000, delay_days_min=20, delay_days_max=35,
+    )
+    transport = TransportRequest.objects.create(
+        vehicle=vehicle, client_name='Kossi Mensah', client_email='kossi@example.com',
+        origin_country='France', destination_city='Lomé', zone=zone, estimated_cost=800000,
+    )
+    for i in range(steps):
+        TransportStep.objects.create(
+            request=transport, status='in_transit', title=f'Étape {i}', description='Port de Lomé', location='Lomé',
+        )
+    return transport
+
+
+def wait_for_render(transport_id, previous=(), timeout=10):
+    #----Le rendu apres une nouvelle etape tourne dans le pool de threads de logistics.pdf
+    from logistics import pdf
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        files = glob.glob(pdf.pdf_path(transport_id, '*'))
+        if files and not set(files) & set(previous):
+            return files
+        time.sleep(0.05)
+    return glob.glob(pdf.pdf_path(transport_id, '*'))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--steps', type=int, default=12)
+    args = parser.parse_args()
+
+    _bench.setup()
+    from django.test import Client
+    from logistics import pdf
+    from logistics.models import TransportStep
+
+    try:
+        import reportlab  # noqa: F401
+    except ImportError:
+        raise SystemExit('ReportLab requis : pip install reportlab')
+
+    transport = populate(args.steps)
+    wait_for_render(transport.pk)
+    client = Client()
+    url = f'/api/logistics/requests/{transport.pk}/pdf/'
+
+    def download(**headers):
+        response = client.get(url, **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def cold():
+        for path in glob.glob(pdf.pdf_path(transport.pk, '*')):
+            os.remove(path)
+        download()
+
+    _bench.report('rendu ReportLab (fichier absent)', _bench.measure(cold, repeat=10))
+    response, body = download()
+    assert response.status_code == 200 and body.startswith(b'%PDF'), response.status_code
+    etag = response['ETag']
+    _bench.report('fichier déjà rendu', _bench.measure(download, repeat=50))
+    _bench.report('If-None-Match -> 304', _bench.measure(lambda: download(HTTP_IF_NONE_MATCH=etag), repeat=50))
+    _bench.report('taille du PDF', len(body) / 1024, 'Ko')
+
+    previous = glob.glob(pdf.pdf_path(transport.pk, '*'))
+    TransportStep.objects.create(request=transport, status='arrived', title='Arrivé', location='Lomé')
+    files = wait_for_render(transport.pk, previous)
+    response, _body = download()
+    print(f"\nNouvelle étape : {len(files)} version(s) sur disque, ETag changé : {response['ETag'] != etag}")
+
+
+if __name__ == '__main__':
+    main()
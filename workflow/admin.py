@@ -0,0 +1,44 @@
+from django.contrib import admin, messages
+
+from .models import StatusTransition
+
+
+class TransitionAdminMixin:
+    """
+    Actions admin de changement de statut via une StateMachine (attribut state_machine).
+    Les lignes dont le statut ne permet pas la transition sont signalées, pas modifiées.
+    """
+    state_machine = None
+
+    def transition(self, queryset, status, actor):
+        return self.state_machine.apply(queryset, status, actor=actor)
+
+    def apply_transition(self, request, queryset, status, message):
+        result = self.transition(queryset, status, request.user)
+        self.message_user(request, message.format(count=result.changed))
+        if result.rejected:
+            field = self.model._meta.get_field(self.state_machine.field)
+            labels = dict(field.choices)
+            current = sorted({labels.get(s, s) for _, s in result.rejected})
+            self.message_user(
+                request,
+                f"{len(result.rejected)} ignorée(s) : passage à « {labels.get(status, status)} » "
+                f"impossible depuis {', '.join(current)}.",
+                messages.WARNING,
+            )
+        return result
+
+
+@admin.register(StatusTransition)
+class StatusTransitionAdmin(admin.ModelAdmin):
+    list_display = ('content_type', 'object_id', 'from_status', 'to_status', 'actor', 'created_at')
+    list_filter = ('content_type', 'to_status')
+    search_fields = ('object_id',)
+    date_hierarchy = 'created_at'
+    readonly_fields = ('content_type', 'object_id', 'from_status', 'to_status', 'actor', 'created_at')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,41 @@
+"""
+Machines à états déclaratives : pour chaque modèle, les statuts d'arrivée et
+les statuts de départ qui y mènent. apply() délègue à bulk_transition() avec
+la garde correspondante.
+"""
+from .transitions import bulk_transition
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+class StateMachine:
+
+    def __init__(self, model, transitions, field='status'):
+        self.model = model
+        self.field = field
+        #-----statut d'arrivee -> statuts de depart autorises
+        self.transitions = {target: tuple(sources) for target, sources in transitions.items()}
+        choices = {value for value, _ in model._meta.get_field(field).choices}
+        unknown = (set(self.transitions) | {s for sources in self.transitions.values() for s in sources}) - choices
+        if unknown:
+            raise ValueError(f"{model.__name__} : statuts inconnus {sorted(unknown)}")
+
+    def allowed_from(self, status):
+        try:
+            return self.transitions[status]
+        except KeyError:
+            raise InvalidTransition(f"{self.model.__name__} : aucun passage vers « {status} » n'est déclaré.")
+
+    def can(self, current, status):
+        return current in self.transitions.get(status, ())
+
+    def apply(self, queryset, status, **kwargs):
+        """
+        Applique la transition à tout le queryset. Retourne un TransitionResult :
+        lignes modifiées, lignes écartées (statut de départ non autorisé).
+        """
+        return bulk_transition(
+            queryset, status, field=self.field, allowed_from=self.allowed_from(status), **kwargs
+        )
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.16 on 2026-10-17 21:12
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('contenttypes', '0002_remove_content_type_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID objet')),
+                ('from_status', models.CharField(max_length=30, verbose_name='Statut de départ')),
+                ('to_status', models.CharField(max_length=30, verbose_name='Nouveau statut')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='status_transitions', to=settings.AUTH_USER_MODEL, verbose_name='Effectué par')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype', verbose_name="Type d'objet")),
+            ],
+            options={
+                'verbose_name': 'Changement de statut',
+                'verbose_name_plural': 'Changements de statut',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['content_type', 'created_at'], name='transition_type_created_idx'), models.Index(fields=['content_type', 'object_id'], name='transition_object_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+
+
+class StatusTransitionQuerySet(models.QuerySet):
+
+    def for_model(self, model):
+        return self.filter(content_type=ContentType.objects.get_for_model(model))
+
+    def between(self, start=None, end=None):
+        #----Intervalle semi-ouvert [start, end) sur created_at (index)
+        queryset = self
+        if start is not None:
+            queryset = queryset.filter(created_at__gte=start)
+        if end is not None:
+            queryset = queryset.filter(created_at__lt=end)
+        return queryset
+
+
+class StatusTransition(models.Model):
+    """
+    Journal des changements de statut appliqués par workflow.transitions
+    (réservations, commandes de pièces, demandes de transport).
+    """
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, verbose_name="Type d'objet")
+    object_id = models.PositiveBigIntegerField(verbose_name="ID objet")
+    from_status = models.CharField(max_length=30, verbose_name="Statut de départ")
+    to_status = models.CharField(max_length=30, verbose_name="Nouveau statut")
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='status_transitions',
+        verbose_name="Effectué par"
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    objects = StatusTransitionQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Changement de statut"
+        verbose_name_plural = "Changements de statut"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['content_type', 'created_at'], name='transition_type_created_idx'),
+            models.Index(fields=['content_type', 'object_id'], name='transition_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type.model} #{self.object_id} : {self.from_status} → {self.to_status}"
@@ -0,0 +1,92 @@
+from django.test import TestCase
+
+from accounts.models import User
+from catalog.models import Brand, Vehicle, VehicleModel
+from logistics.models import TransportRequest, TransportStep
+
+from .models import StatusTransition
+from .transitions import bulk_transition, status_changed
+
+
+class BulkTransitionTests(TestCase):
+    """
+    Un lot : UPDATE gardé par les statuts de départ, journal StatusTransition,
+    étapes créées pour les seules lignes modifiées, status_changed après commit.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        brand = Brand.objects.create(name='Toyota')
+        model = VehicleModel.objects.create(brand=brand, name='Corolla')
+        vehicle = Vehicle.objects.create(
+            title='Corolla', vehicle_type='car', listing_type='sale', brand=brand, model=model,
+            year=2018, fuel='petrol', transmission='manual', condition='used', price=1000000,
+            city='Lomé', country='Togo',
+        )
+        cls.admin = User.objects.create_superuser(username='admin', email='admin@example.com', password='x')
+        cls.transports = {
+            status: TransportRequest.objects.create(
+                vehicle=vehicle, client_name='Kossi', client_email='kossi@example.com',
+                origin_country='France', status=status,
+            )
+            for status in ('advance_paid', 'loading', 'delivered', 'in_transit')
+        }
+
+    def setUp(self):
+        self.sent = []
+
+        def receiver(sender, **kwargs):
+            self.sent.append((sender, kwargs))
+
+        status_changed.connect(receiver)
+        self.addCleanup(status_changed.disconnect, receiver)
+
+    def test_guarded_transition(self):
+        moved = [self.transports['advance_paid'].pk, self.transports['loading'].pk]
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            result = bulk_transition(
+                TransportRequest.objects.all(), 'in_transit',
+                allowed_from=('advance_paid', 'loading'), actor=self.admin,
+                steps=lambda pks: [TransportStep(request_id=pk, status='in_transit', title='En transit') for pk in pks],
+            )
+            self.assertEqual(self.sent, [])
+
+        self.assertEqual(result.changed, 2)
+        self.assertEqual(result.rejected, [(self.transports['delivered'].pk, 'delivered')])
+        statuses = dict(TransportRequest.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses[self.transports['delivered'].pk], 'delivered')
+        self.assertEqual({pk for pk, status in statuses.items() if status == 'in_transit'}, set(moved) | {self.transports['in_transit'].pk})
+
+        self.assertEqual(sorted(TransportStep.objects.values_list('request_id', flat=True)), sorted(moved))
+        log = StatusTransition.objects.for_model(TransportRequest)
+        self.assertEqual(
+            sorted(log.values_list('object_id', 'from_status', 'to_status', 'actor_id')),
+            sorted([
+                (self.transports['advance_paid'].pk, 'advance_paid', 'in_transit', self.admin.pk),
+                (self.transports['loading'].pk, 'loading', 'in_transit', self.admin.pk),
+            ]),
+        )
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(len(self.sent), 1)
+        sender, kwargs = self.sent[0]
+        self.assertIs(sender, TransportRequest)
+        self.assertEqual(kwargs['status'], 'in_transit')
+        self.assertEqual(sorted(kwargs['transitions']), sorted([
+            (self.transports['advance_paid'].pk, 'advance_paid'),
+            (self.transports['loading'].pk, 'loading'),
+        ]))
+
+    def test_nothing_allowed_writes_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            result = bulk_transition(
+                TransportRequest.objects.filter(pk=self.transports['delivered'].pk), 'in_transit',
+                allowed_from=('advance_paid',),
+            )
+
+        self.assertEqual(result.changed, 0)
+        self.assertFalse(TransportStep.objects.exists())
+        self.assertFalse(StatusTransition.objects.exists())
+        self.assertEqual(self.sent, [])
@@ -0,0 +1,79 @@
+"""
+Changements de statut en masse (actions admin, règlements).
+
+Un lot de N lignes coûte un nombre fixe de requêtes, quel que soit N :
+- lecture (clé, statut actuel) des lignes à modifier ;
+- un UPDATE gardé : WHERE pk IN (...) AND statut IN (statuts de départ autorisés) ;
+- un bulk_create pour le journal (StatusTransition) et un pour les étapes de suivi.
+Le tout dans une transaction. Les lignes dont le statut actuel n'autorise pas
+la transition sont écartées en mémoire et renvoyées dans `rejected`.
+
+Après commit, le signal `status_changed` est envoyé une fois par lot (aussi par
+payments.services pour les paiements) :
+sender=modèle, status=nouveau statut, transitions=[(pk, ancien statut), ...], actor.
+"""
+from collections import namedtuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from .models import StatusTransition
+
+#-----changed : nombre de lignes modifiees ; rejected : [(pk, statut actuel), ...] des lignes ecartees
+TransitionResult = namedtuple('TransitionResult', ['changed', 'rejected'])
+
+status_changed = Signal()
+
+
+def bulk_transition(queryset, status, *, field='status', allowed_from=None, actor=None,
+                    steps=None, on_changed=None, **updates):
+    """
+    Passe les lignes de `queryset` au statut `status` ; celles qui y sont déjà sont ignorées.
+
+    allowed_from : statuts de départ autorisés (None = tous).
+    steps(pks) -> objets non sauvegardés (étapes de suivi), créés en un bulk_create.
+    on_changed(pks) est appelé dans la transaction, après l'UPDATE : bulk_create et
+    update() n'envoient pas post_save, c'est ici que les effets des signaux sont rejoués.
+    """
+    model = queryset.model
+    values = {field: status, **updates}
+    if 'updated_at' in {f.name for f in model._meta.concrete_fields}:
+        values.setdefault('updated_at', timezone.now())
+
+    with transaction.atomic():
+        rows = list(
+            queryset.exclude(**{field: status}).select_for_update().order_by().values_list('pk', field)
+        )
+        if allowed_from is None:
+            accepted, rejected = rows, []
+        else:
+            accepted = [row for row in rows if row[1] in allowed_from]
+            rejected = [row for row in rows if row[1] not in allowed_from]
+        if not accepted:
+            return TransitionResult(0, rejected)
+
+        pks = [pk for pk, _ in accepted]
+        guard = {'pk__in': pks}
+        if allowed_from is not None:
+            guard[f'{field}__in'] = list(allowed_from)
+        changed = model._base_manager.filter(**guard).update(**values)
+
+        content_type = ContentType.objects.get_for_model(model)
+        actor_id = actor.pk if actor is not None and actor.is_authenticated else None
+        StatusTransition.objects.bulk_create([
+            StatusTransition(content_type=content_type, object_id=pk, from_status=previous,
+                             to_status=status, actor_id=actor_id)
+            for pk, previous in accepted
+        ])
+        if steps is not None:
+            objs = steps(pks)
+            if objs:
+                type(objs[0]).objects.bulk_create(objs)
+        if on_changed is not None:
+            on_changed(pks)
+        transaction.on_commit(lambda: status_changed.send(
+            sender=model, status=status, transitions=accepted, actor=actor,
+        ))
+    return TransitionResult(changed, rejected)